@@ -0,0 +1,299 @@
+'''
+Artifact I/O
+
+Every output is written to a temporary file next to its destination and renamed over it once writing succeeds, so a
+crash or a parallel run never leaves a partial file. The codec is chosen by the extension of the path: .gz for gzip,
+.zst for zstandard, anything else is uncompressed. JSON is written compactly, with orjson when it is installed.
+Readers here decompress the same way, so an output such as the graph in the [files] section of a configuration can be
+renamed to adjlist.json.zst without changing the tasks that read it.
+
+with artifacts.stream_json(path) as out:
+    out.item('task', 'onehot')
+    out.items('features', features.items())
+'''
+import io
+import os
+import gzip
+import json
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# mkstemp creates files readable only by their owner, so new artifacts are given the permissions open() would give
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+'''
+inputs:
+path (str) Path to artifact
+
+outputs:
+codec (str) 'gzip', 'zstd', or None if the artifact is not compressed
+'''
+def codec(path):
+    if path.endswith('.gz'): return 'gzip'
+    if path.endswith('.zst'): return 'zstd'
+    return None
+
+
+'''
+Open a temporary file next to dst and replace dst with it only once writing succeeds, so an
+interrupted write never truncates dst
+
+inputs:
+dst  (str)           Path of file to write
+mode (str, optional) File mode
+
+outputs:
+file (file) Temporary file object
+'''
+@contextmanager
+def atomic_open(dst, mode='w'):
+    directory, name = os.path.split(os.path.abspath(dst))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f'.{name}.', suffix='.tmp')
+
+    try:
+        with os.fdopen(fd, mode) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+
+        if os.path.exists(dst): shutil.copymode(dst, tmp)
+        else: os.chmod(tmp, 0o666 & ~UMASK)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+
+'''
+inputs:
+file  (file)          Binary file to write compressed data to
+kind  (str)           Codec from codec()
+level (int, optional) Compression level
+
+outputs:
+stream (file) Binary stream that compresses into file. Closing it does not close file.
+'''
+def compressor(file, kind, level=None):
+    if kind == 'gzip':
+        return gzip.GzipFile(fileobj=file, mode='wb', compresslevel=level or GZIP_LEVEL, mtime=0)
+
+    if zstandard is None: raise Exception('zstandard must be installed to write .zst artifacts')
+    return zstandard.ZstdCompressor(level=level or ZSTD_LEVEL).stream_writer(file, closefd=False)
+
+
+'''
+Open an artifact for reading or writing, decompressing or compressing by extension. Writes are atomic unless atomic
+is False, which is only meant for logs that are read while they are written.
+
+inputs:
+path   (str)            Path to artifact
+mode   (str, optional)  'r', 'rb', 'w', or 'wb'
+level  (int, optional)  Compression level
+atomic (bool, optional) Write to a temporary file and rename it over path once writing succeeds
+
+outputs:
+file (file) Text or binary file object
+'''
+@contextmanager
+def open_artifact(path, mode='w', level=None, atomic=True):
+    kind = codec(path)
+    text = 'b' not in mode
+
+    if mode.startswith('r'):
+        if kind == 'gzip':
+            file = gzip.open(path, mode if not text else 'rt', encoding='utf-8' if text else None)
+        elif kind == 'zstd':
+            if zstandard is None: raise Exception('zstandard must be installed to read .zst artifacts')
+            file = zstandard.open(path, mode if not text else 'rt', encoding='utf-8' if text else None)
+        else:
+            file = open(path, mode)
+
+        with file:
+            yield file
+        return
+
+    if not mode.startswith('w'): raise Exception(f'unsupported artifact mode {mode}')
+
+    with (atomic_open(path, 'wb') if atomic else open(path, 'wb')) as raw:
+        stream = compressor(raw, kind, level) if kind else raw
+        file = io.TextIOWrapper(stream, encoding='utf-8') if text else stream
+
+        yield file
+
+        # detach so closing the wrapper does not close the file before it is synced and renamed
+        if text: file.detach()
+        if stream is not raw: stream.close()
+
+
+'''
+inputs:
+obj (object) Object json cannot serialize
+
+outputs:
+obj (object) Serializable version of numpy arrays and scalars, and sets
+'''
+def default(obj):
+    if hasattr(obj, 'tolist'): return obj.tolist()
+    if isinstance(obj, (set, frozenset)): return list(obj)
+    raise TypeError(f'{type(obj).__name__} is not json serializable')
+
+
+'''
+inputs:
+obj (object) Object to serialize
+
+outputs:
+data (bytes) Compact utf-8 json
+'''
+def dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=default).encode()
+
+
+'''
+inputs:
+data (bytes) utf-8 json
+
+outputs:
+obj (object) Deserialized object
+'''
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+'''
+inputs:
+path  (str)           Path to artifact
+obj   (object)        Object to serialize
+level (int, optional) Compression level
+'''
+def write_json(path, obj, level=None):
+    with open_artifact(path, 'wb', level) as file:
+        file.write(dumps(obj))
+
+
+'''
+inputs:
+path (str) Path to artifact
+
+outputs:
+obj (object) Deserialized object
+'''
+def read_json(path):
+    with open_artifact(path, 'rb') as file:
+        return loads(file.read())
+
+
+'''
+inputs:
+path  (str)           Path to artifact
+lines (iterable)      Items written one per line with str()
+level (int, optional) Compression level
+'''
+def write_lines(path, lines, level=None):
+    with open_artifact(path, 'w', level) as file:
+        for line in lines:
+            file.write(f'{line}\n')
+
+
+'''
+inputs:
+df     (pd.DataFrame)   Table to write
+path   (str)            Path to artifact
+sep    (str, optional)  Column separator
+index  (bool, optional) Write the index
+level  (int, optional)  Compression level
+kwargs (dict)           Other arguments of pd.DataFrame.to_csv()
+'''
+def write_table(df, path, sep='\t', index=False, level=None, **kwargs):
+    with open_artifact(path, 'w', level) as file:
+        df.to_csv(file, sep=sep, index=index, **kwargs)
+
+
+class JsonStream(object):
+
+    '''
+    Writes a json object one member at a time, so large outputs are never serialized into one string
+
+    inputs:
+    file (file) Binary file to write to
+    '''
+    def __init__(self, file):
+        self.file = file
+        self.count = 0
+        self.file.write(b'{')
+
+
+    '''
+    inputs:
+    key (str) Member name. Other types are converted with str().
+    '''
+    def key(self, key):
+        self.file.write(b',' if self.count else b'')
+        self.file.write(dumps(str(key)) + b':')
+        self.count += 1
+
+
+    '''
+    inputs:
+    key   (str)    Member name
+    value (object) Member value
+    '''
+    def item(self, key, value):
+        self.key(key)
+        self.file.write(dumps(value))
+
+
+    '''
+    Write a member whose value is an object, one pair at a time
+
+    inputs:
+    key   (str)      Member name
+    pairs (iterable) Key and value pairs of the nested object e.g. dict.items()
+    '''
+    def items(self, key, pairs):
+        self.key(key)
+        self.file.write(b'{')
+
+        for i, (k, v) in enumerate(pairs):
+            self.file.write((b',' if i else b'') + dumps(str(k)) + b':' + dumps(v))
+
+        self.file.write(b'}')
+
+
+    def close(self):
+        self.file.write(b'}')
+
+
+'''
+inputs:
+path  (str)           Path to artifact
+level (int, optional) Compression level
+
+outputs:
+stream (JsonStream) Writer of the top level json object
+'''
+@contextmanager
+def stream_json(path, level=None):
+    with open_artifact(path, 'wb', level) as file:
+        stream = JsonStream(file)
+        yield stream
+        stream.close()
@@ -0,0 +1,380 @@
+'''
+Benchmark the pipeline hot paths on synthetic tables of increasing size
+
+Each benchmark prepares its inputs once per size and returns a function to time. Results are saved as json
+and compared against a baseline to flag regressions.
+
+usage:
+python -m bench.benchmark --sizes 1000 10000 100000 --baseline bench/baseline.json
+
+Author: Justin Chen
+'''
+import os
+import sys
+import json
+import time
+import copy
+import shutil
+import argparse
+import platform
+import tempfile
+import configparser
+import pandas as pd
+import networkx as nx
+from collections import OrderedDict
+from datetime import datetime as dt
+
+import tasks
+import config
+from bench import synthetic as syn
+from preproc import relational as rel
+from preproc import diff
+from validate import engine as eng
+from validate.datacheck import DataCheck
+
+BENCHMARKS = OrderedDict()
+
+
+'''
+Decorator to register a benchmark. A benchmark takes a Context and returns a function to time.
+
+inputs:
+name     (str)           Name of benchmark used as key in the results
+max_size (int, optional) Skip sizes above this e.g. for quadratic functions
+'''
+def benchmark(name, max_size=None):
+    def register(func):
+        BENCHMARKS[name] = (func, max_size)
+        return func
+    return register
+
+
+class Context(object):
+
+    '''
+    Synthetic data of one size, and a configuration pointing tasks at it
+
+    inputs:
+    size (int)           Number of moves
+    dst  (str)           Directory for generated tables and task outputs
+    seed     (int, optional)   Random seed
+    mp4s     (int, optional)   Number of tiny mp4s to write for the video tasks
+    dangling (float, optional) Fraction of dangling edges. Tasks assume a validated table, so none by default.
+    '''
+    def __init__(self, size, dst, seed=0, mp4s=0, dangling=0.0):
+        self.size = size
+        self.dst = dst
+        self.mp4s = mp4s
+        self.moves, self.videos = syn.generate(dst, size, seed, mp4s, dangling=dangling)
+        self.move_csv = os.path.join(dst, 'moves.tsv')
+        self.video_csv = os.path.join(dst, 'videos.tsv')
+        self.cfg = self.configure()
+        self._graph = None
+
+
+    '''
+    Write a configuration based on test.ini with every path inside the benchmark directory
+
+    outputs:
+    cfg (config.Configuration) Configuration of generated data
+    '''
+    def configure(self):
+        cfg = configparser.ConfigParser(allow_no_value=True)
+        cfg.read(os.path.join('configs', 'test.ini'))
+
+        output = os.path.join(self.dst, 'output')
+        cfg['DEFAULT'].update({'warning': 'no', 'whitelist': 'no', 'parallel': 'no', 'output': output})
+        cfg['moves'].update({'csv': self.move_csv})
+        cfg['videos'].update({'src': os.path.join(self.dst, 'videos'), 'dst': os.path.join(self.dst, 'formatted'), 'csv': self.video_csv})
+        cfg['thumbnails'].update({'dst': os.path.join(self.dst, 'thumbnails')})
+
+        # PruneGraphMask only balances its masks without a test split
+        cfg['dataset'].update({'train_split': '.9', 'val_split': '.1', 'test_split': '0'})
+
+        path = os.path.join(self.dst, 'bench.ini')
+        with open(path, 'w') as file:
+            cfg.write(file)
+
+        return config.Configuration(path)
+
+
+    @property
+    def graph(self):
+        if self._graph is None: self._graph = rel.dataframe_to_graph(self.moves)
+        return self._graph
+
+
+    '''
+    inputs:
+    name (str) Task name
+
+    outputs:
+    run (function) run() of a new instance of the task
+    '''
+    def task(self, name):
+        return tasks.load(name)(self.cfg).run
+
+
+    '''
+    Video tasks read every row of the video table, so they are pointed at a table of only the generated mp4s
+
+    inputs:
+    name (str) Task name
+
+    outputs:
+    run (function) run() of a new instance of the task
+    '''
+    def video_task(self, name):
+        if not self.mp4s: raise Exception('no mp4s were generated, run with --mp4s')
+
+        cfg = copy.copy(self.cfg)
+        cfg.video_csv = os.path.join(self.dst, 'videos_mp4.tsv')
+        self.videos.dropna(subset=['embed'])[:self.mp4s].to_csv(cfg.video_csv, sep='\t', index=False)
+
+        return tasks.load(name)(cfg).run
+
+
+    '''
+    Time full rebuilds of tasks that otherwise apply deltas to their previous output
+
+    inputs:
+    name     (str) Task name
+    artifact (str) Artifact file name in the output directory
+
+    outputs:
+    run (function) run() of the task after dropping the snapshot of its artifact
+    '''
+    def rebuild(self, name, artifact):
+        run = self.task(name)
+        path = os.path.join(self.cfg.output_dir, artifact)
+
+        def rebuild():
+            diff.drop_snapshot(path)
+            run()
+
+        return rebuild
+
+
+@benchmark('dataframe_to_graph')
+def dataframe_to_graph(ctx):
+    return lambda: rel.dataframe_to_graph(ctx.moves)
+
+
+@benchmark('validate_graph', max_size=20000)
+def validate_graph(ctx):
+    moves = ctx.moves[ctx.moves['name'].isin(ctx.graph)]
+    return lambda: rel.validate_graph(ctx.graph, moves)
+
+
+@benchmark('get_adjacency', max_size=20000)
+def get_adjacency(ctx):
+    return lambda: DataCheck().get_adjacency(ctx.moves)
+
+
+@benchmark('table_to_graph')
+def table_to_graph(ctx):
+    return lambda: rel.table_to_graph(ctx.moves, 'moves')
+
+
+@benchmark('graph_to_table', max_size=100000)
+def graph_to_table(ctx):
+    G = rel.table_to_graph(ctx.moves, 'moves')
+    return lambda: rel.graph_to_table(G)
+
+
+@benchmark('validator')
+def validator(ctx):
+    return lambda: eng.Validator(ctx.moves).run()
+
+
+@benchmark('GenerateGraph')
+def generate_graph(ctx):
+    return ctx.rebuild('GenerateGraph', 'adjlist.json')
+
+
+@benchmark('BagOfWordsMultihot', max_size=100000)
+def bag_of_words_multihot(ctx):
+    ctx.task('PruneGraphMask')()
+    return ctx.task('BagOfWordsMultihot')
+
+
+@benchmark('BagOfWordsOnehot', max_size=100000)
+def bag_of_words_onehot(ctx):
+    ctx.task('PruneGraphMask')()
+    return ctx.task('BagOfWordsOnehot')
+
+
+@benchmark('PruneGraph')
+def prune_graph(ctx):
+    return ctx.rebuild('PruneGraph', 'adjlist')
+
+
+@benchmark('PruneGraphMask')
+def prune_graph_mask(ctx):
+    return ctx.task('PruneGraphMask')
+
+
+@benchmark('ExtrapolationMasks')
+def extrapolation_masks(ctx):
+    for t in ('Name2Int', 'GenerateGraph', 'RelabelGraph'): ctx.task(t)()
+    return ctx.task('ExtrapolationMasks')
+
+
+@benchmark('FormatVideos')
+def format_videos(ctx):
+    return ctx.video_task('FormatVideos')
+
+
+@benchmark('ExtractThumbnails')
+def extract_thumbnails(ctx):
+    return ctx.video_task('ExtractThumbnails')
+
+
+'''
+Time a function
+
+inputs:
+func    (function)      Function to time
+repeats (int, optional) Number of runs
+
+outputs:
+times (list) Wall time in seconds of each run
+'''
+def measure(func, repeats=3):
+    times = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+'''
+Run benchmarks over sizes
+
+inputs:
+sizes    (list)            Numbers of moves
+names    (list, optional)  Benchmarks to run. Runs all benchmarks if None.
+repeats  (int, optional)   Number of runs per benchmark and size. The minimum is reported.
+seed     (int, optional)   Random seed
+mp4s     (int, optional)   Number of tiny mp4s to write
+dangling (float, optional) Fraction of dangling edges
+
+outputs:
+results (dict) Environment and time or error of each benchmark and size
+'''
+def run(sizes, names=None, repeats=3, seed=0, mp4s=0, dangling=0.0):
+    names = list(BENCHMARKS) if names is None else names
+    results = {
+        'date': dt.now().isoformat(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'networkx': nx.__version__,
+        'machine': platform.machine(),
+        'repeats': repeats,
+        'benchmarks': OrderedDict((name, OrderedDict()) for name in names)
+    }
+
+    for size in sizes:
+        dst = tempfile.mkdtemp(prefix=f'bench_{size}_')
+        cwd = os.getcwd()
+
+        try:
+            ctx = Context(size, dst, seed, mp4s, dangling)
+
+            # tasks write logs relative to the working directory
+            os.makedirs(os.path.join(dst, 'logs'))
+            os.chdir(dst)
+
+            for name in names:
+                func, max_size = BENCHMARKS[name]
+                if max_size is not None and size > max_size: continue
+
+                try:
+                    times = measure(func(ctx), repeats)
+                    results['benchmarks'][name][str(size)] = {'time': min(times), 'times': times}
+                except Exception as e:
+                    results['benchmarks'][name][str(size)] = {'error': f'{type(e).__name__}: {e}'}
+
+                print(f'{name} {size}: {results["benchmarks"][name][str(size)]}')
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(dst, ignore_errors=True)
+
+    return results
+
+
+'''
+Compare results against a baseline
+
+inputs:
+results   (dict)            Results of run()
+baseline  (dict)            Results of a previous run()
+tolerance (float, optional) Allowed relative slowdown
+min_delta (float, optional) Ignore slowdowns under this many seconds, which are noise
+
+outputs:
+regressions (list) Benchmarks and sizes that are slower than the baseline or newly failing
+'''
+def compare(results, baseline, tolerance=0.2, min_delta=0.01):
+    regressions = []
+
+    for name, sizes in results['benchmarks'].items():
+        for size, current in sizes.items():
+            before = baseline.get('benchmarks', {}).get(name, {}).get(size)
+            if before is None or 'error' in before: continue
+
+            if 'error' in current:
+                regressions.append({'benchmark': name, 'size': int(size), 'error': current['error']})
+                continue
+
+            delta = current['time'] - before['time']
+            if delta > min_delta and current['time'] > before['time'] * (1 + tolerance):
+                regressions.append({
+                    'benchmark': name,
+                    'size': int(size),
+                    'baseline': before['time'],
+                    'time': current['time'],
+                    'ratio': round(current['time'] / before['time'], 3)
+                })
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pipeline hot paths on synthetic data')
+    parser.add_argument('--sizes', '-n', type=int, nargs='+', default=[1000, 10000, 100000], help='Numbers of moves')
+    parser.add_argument('--benchmarks', '-b', nargs='+', choices=list(BENCHMARKS), help='Benchmarks to run. Default all.')
+    parser.add_argument('--repeats', '-r', type=int, default=3, help='Runs per benchmark and size')
+    parser.add_argument('--seed', '-s', type=int, default=0, help='Random seed')
+    parser.add_argument('--mp4s', type=int, default=0, help='Number of tiny mp4s to write for video tasks')
+    parser.add_argument('--dangling', type=float, default=0.0, help='Fraction of dangling edges')
+    parser.add_argument('--out', '-o', default=os.path.join('logs', 'benchmark.json'), help='Results json')
+    parser.add_argument('--baseline', help='Baseline results json to compare against')
+    parser.add_argument('--tolerance', '-t', type=float, default=0.2, help='Allowed relative slowdown')
+    parser.add_argument('--save-baseline', action='store_true', help='Also save results as the baseline')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.benchmarks, args.repeats, args.seed, args.mp4s, args.dangling)
+
+    if args.baseline and os.path.isfile(args.baseline):
+        with open(args.baseline, 'r') as file:
+            results['regressions'] = compare(results, json.load(file), args.tolerance)
+
+        for r in results['regressions']:
+            print(f'REGRESSION {r}')
+
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    with open(args.out, 'w') as file:
+        json.dump(results, file, indent=4)
+
+    if args.save_baseline and args.baseline:
+        shutil.copyfile(args.out, args.baseline)
+
+    if results.get('regressions'): sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
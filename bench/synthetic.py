@@ -0,0 +1,230 @@
+'''
+Synthetic move and video tables for benchmarking
+
+Moves get names built from a parkour vocabulary, multi-label types, and subseq edges whose targets are drawn
+from a power-law popularity, so a few moves have many prereqs like in the real table. Prereqs mirror subseqs,
+and a fraction of edge targets are misspelled so they dangle.
+
+Author: Justin Chen
+'''
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+WORDS = ['Roll', 'Dive', 'Kong', 'Lache', 'Vault', 'Flip', 'Front', 'Back', 'Side', 'Gainer', 'Twist', 'Cork',
+         'Wall', 'Spin', 'Kick', 'Cat', 'Precision', 'Dash', 'Speed', 'Lazy', 'Reverse', 'Palm', 'Tic', 'Run',
+         'Underbar', 'Double', 'Full', 'Arabian', 'Webster', 'Aerial', 'Butterfly', 'Cartwheel', 'Handstand']
+PREFIXES = ['', '', '', '180', '360', '540', '720', 'Double', 'Standing', 'Running', 'Switch']
+TYPES = ['Roll', 'Flip', 'Twist', 'Vault', 'Wall', 'Bar', 'Kick', 'Balance', 'Jump', 'Swing', 'Climb', 'Landing']
+
+
+'''
+inputs:
+n   (int)             Number of names
+rng (RandomState)     Random number generator
+
+outputs:
+names (list) Unique move names
+'''
+def move_names(n, rng):
+    prefix = np.array(PREFIXES, dtype=object)[rng.randint(len(PREFIXES), size=n)]
+    words = np.array(WORDS, dtype=object)[rng.randint(len(WORDS), size=(n, 2))]
+    single = rng.rand(n) < 0.4
+
+    names, seen = [], {}
+    for p, (a, b), s in zip(prefix, words, single):
+        name = ' '.join(w for w in (p, a, '' if s else b) if w)
+
+        # disambiguate repeated names the way the table does, with a numbered variation
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        names.append(name if count == 0 else f'{name} {count+1}')
+
+    return names
+
+
+'''
+inputs:
+n   (int)         Number of moves
+rng (RandomState) Random number generator
+
+outputs:
+types (list) Types of one to three labels separated by "/". Some have a trailing plural as in the real table.
+'''
+def move_types(n, rng):
+    weights = 1 / np.arange(1, len(TYPES)+1)
+    labels = np.array(TYPES, dtype=object)[rng.choice(len(TYPES), size=(n, 3), p=weights/weights.sum())]
+    sizes = rng.choice([1, 2, 3], size=n, p=[0.6, 0.3, 0.1])
+    plural = rng.rand(n) < 0.05
+
+    return ['/'.join(sorted(set(row[:k]))) + ('s' if p else '') for row, k, p in zip(labels, sizes, plural)]
+
+
+'''
+Join edges into value-separated cells
+
+inputs:
+src   (ndarray) Row of each edge
+tgt   (ndarray) Target name of each edge
+n     (int)     Number of rows
+
+outputs:
+cells (ndarray) Edge cell of each row, NaN for rows without edges
+'''
+def edge_cells(src, tgt, n):
+    cells = np.full(n, np.nan, dtype=object)
+    if len(src) == 0: return cells
+
+    edges = pd.DataFrame({'src': src, 'tgt': tgt}).drop_duplicates().sort_values(['src', 'tgt'])
+    src, tgt = edges['src'].to_numpy(), edges['tgt'].to_numpy().tolist()
+
+    # edges of a row are adjacent after sorting
+    start = np.flatnonzero(np.r_[True, src[1:] != src[:-1]])
+    end = np.r_[start[1:], len(src)]
+    cells[src[start]] = [', '.join(tgt[a:b]) for a, b in zip(start, end)]
+
+    return cells
+
+
+'''
+Generate a move table
+
+inputs:
+n        (int)             Number of moves
+seed     (int, optional)   Random seed
+degree   (float, optional) Mean number of subseqs per move
+alpha    (float, optional) Power-law exponent of target popularity. Larger is more skewed.
+dangling (float, optional) Fraction of edges with a misspelled target
+missing  (float, optional) Fraction of descriptions left empty
+
+outputs:
+df (pd.DataFrame) Table of moves with the columns of moves.tsv
+'''
+def moves(n, seed=0, degree=1.0, alpha=0.6, dangling=0.01, missing=0.01):
+    rng = np.random.RandomState(seed)
+    names = np.array(move_names(n, rng), dtype=object)
+
+    # out-degree is geometric, targets are chosen by a power law over a random popularity order
+    out = rng.geometric(1 / (degree+1), size=n) - 1
+    src = np.repeat(np.arange(n), out)
+    popularity = 1 / np.arange(1, n+1) ** alpha
+    tgt = rng.permutation(n)[rng.choice(n, size=len(src), p=popularity/popularity.sum())]
+
+    keep = src != tgt
+    src, tgt = src[keep], tgt[keep]
+
+    # misspell a fraction of subseq targets so they dangle and break symmetry
+    subseq = names[tgt].copy()
+    typo = np.flatnonzero(rng.rand(len(src)) < dangling)
+    subseq[typo] = [f'{s[:-1]}{s[-1].swapcase()}x' for s in subseq[typo]]
+
+    mirrored = np.setdiff1d(np.arange(len(src)), typo)
+
+    df = pd.DataFrame({
+        'id': np.arange(1, n+1),
+        'name': names,
+        'prereq': edge_cells(tgt[mirrored], names[src[mirrored]], n),
+        'subseq': edge_cells(src, subseq, n),
+        'type': move_types(n, rng),
+        'alias': pd.Series(names + ' Variation').where(rng.rand(n) < 0.2),
+        'description': [f'A {m} performed from a {t.lower()} position.' for m, t in zip(names, rng.choice(WORDS, size=n))]
+    })
+    df.loc[rng.rand(n) < missing, 'description'] = np.nan
+
+    return df
+
+
+'''
+Generate a video table for a move table
+
+inputs:
+df       (pd.DataFrame)    Table of moves
+seed     (int, optional)   Random seed
+coverage (float, optional) Fraction of moves with a video
+
+outputs:
+videos (pd.DataFrame) Table of videos with the columns of videos.tsv. Moves without a video have an empty embed.
+'''
+def videos(df, seed=0, coverage=0.7):
+    rng = np.random.RandomState(seed)
+    n = len(df)
+    has = rng.rand(n) < coverage
+    files = df['name'].str.lower().str.strip().str.replace(' ', '_') + '.mp4'
+
+    videos = pd.DataFrame({
+        'id': df['id'].to_numpy(),
+        'title': (df['name'] + ' Tutorial').to_numpy(),
+        'channel': [f'channel{i}' for i in rng.randint(100, size=n)],
+        'link': [f'https://www.youtube.com/watch?v={i:011d}' for i in range(n)],
+        'time': rng.randint(0, 300, size=n),
+        'embed': files.to_numpy()
+    })
+
+    return videos.where(pd.Series(has, index=videos.index), axis=0).assign(id=videos['id'])
+
+
+'''
+Write tiny mp4s of random noise for the video tasks. Requires OpenCV.
+
+inputs:
+files  (iterable)      Video file names
+dst    (str)           Directory to write videos to
+frames (int, optional) Number of frames per video
+size   (int, optional) Height and width of frames
+seed   (int, optional) Random seed
+'''
+def write_videos(files, dst, frames=10, size=32, seed=0):
+    import cv2
+
+    os.makedirs(dst, exist_ok=True)
+    rng = np.random.RandomState(seed)
+    fourcc = cv2.VideoWriter_fourcc(*'MP4V')
+
+    for f in files:
+        out = cv2.VideoWriter(os.path.join(dst, f), fourcc, 10, (size, size))
+        for _ in range(frames):
+            out.write(rng.randint(0, 256, size=(size, size, 3), dtype=np.uint8))
+        out.release()
+
+
+'''
+Write moves.tsv, videos.tsv, and optionally mp4s
+
+inputs:
+dst    (str)           Output directory
+n      (int)           Number of moves
+seed   (int, optional) Random seed
+mp4s   (int, optional) Number of videos to write to dst/videos
+kwargs (dict)          Parameters of moves()
+
+outputs:
+moves  (pd.DataFrame) Table of moves
+videos (pd.DataFrame) Table of videos
+'''
+def generate(dst, n, seed=0, mp4s=0, **kwargs):
+    os.makedirs(dst, exist_ok=True)
+
+    m = moves(n, seed, **kwargs)
+    v = videos(m, seed)
+
+    m.to_csv(os.path.join(dst, 'moves.tsv'), sep='\t', index=False)
+    v.to_csv(os.path.join(dst, 'videos.tsv'), sep='\t', index=False)
+
+    if mp4s: write_videos(v['embed'].dropna()[:mp4s], os.path.join(dst, 'videos'), seed=seed)
+
+    return m, v
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic moves.tsv and videos.tsv')
+    parser.add_argument('dst', help='Output directory')
+    parser.add_argument('--size', '-n', type=int, default=1000, help='Number of moves')
+    parser.add_argument('--seed', '-s', type=int, default=0, help='Random seed')
+    parser.add_argument('--mp4s', type=int, default=0, help='Number of tiny mp4s to write')
+    parser.add_argument('--degree', type=float, default=1.0, help='Mean number of subseqs per move')
+    parser.add_argument('--alpha', type=float, default=0.6, help='Power-law exponent of edge target popularity')
+    parser.add_argument('--dangling', type=float, default=0.01, help='Fraction of misspelled edge targets')
+    args = parser.parse_args()
+
+    generate(args.dst, args.size, args.seed, args.mp4s, degree=args.degree, alpha=args.alpha, dangling=args.dangling)
@@ -0,0 +1,175 @@
+'''
+Checkpoints of long running tasks
+
+A task appends each completed work unit, its record, and the files it wrote to a journal in the output directory.
+Flushes append whole lines with a single write followed by fsync, so an interrupted run leaves at most a torn last
+line, which is dropped when the journal is read. When a run is resumed with main.py --resume, the task skips units
+whose outputs still exist with the size in the journal and redoes the rest. Otherwise the journal starts empty.
+
+with checkpoint.journal(self) as journal:
+    done = journal.completed()
+    for unit in units:
+        if str(unit) in done: continue
+        ...
+        journal.append(unit, record, outputs=[path])
+
+The journal is removed once the task finishes without an error.
+'''
+import os
+import json
+import threading
+from collections import OrderedDict
+
+from utils import make_dir
+
+CHECKPOINT_DIR = 'checkpoints'
+
+
+class Journal(object):
+
+    '''
+    inputs:
+    path        (str)            Path to journal
+    resume      (bool, optional) Keep the entries of a previous run, else start empty
+    flush_every (int, optional)  Number of appended entries buffered before they are flushed
+    '''
+    def __init__(self, path, resume=False, flush_every=1):
+        self.path = path
+        self.flush_every = max(flush_every, 1)
+        self.buffer = []
+        self.lock = threading.RLock()
+
+        make_dir(os.path.dirname(path) or '.')
+
+        if not resume and os.path.isfile(path): os.remove(path)
+        self.entries = self.read()
+
+
+    '''
+    Read the entries of the journal and truncate a torn last line so later appends start on a new line
+
+    outputs:
+    entries (OrderedDict) Dictionary mapping unit to its entry
+    '''
+    def read(self):
+        entries = OrderedDict()
+        if not os.path.isfile(self.path): return entries
+
+        good = 0
+
+        with open(self.path, 'rb') as file:
+            for line in file:
+                if not line.endswith(b'\n'): break
+
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+
+                entries[entry['unit']] = entry
+                good += len(line)
+
+        if good < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as file:
+                file.truncate(good)
+
+        return entries
+
+
+    '''
+    inputs:
+    entry (dict) Journal entry
+
+    outputs:
+    valid (bool) True if every output of the unit still exists with the same size
+    '''
+    def verify(self, entry):
+        for path, size in entry['outputs']:
+            if size is None or not os.path.isfile(path) or os.path.getsize(path) != size: return False
+
+        return True
+
+
+    '''
+    outputs:
+    completed (OrderedDict) Dictionary mapping unit to its record, only for units whose outputs are intact
+    '''
+    def completed(self):
+        with self.lock:
+            return OrderedDict((u, e['record']) for u, e in self.entries.items() if self.verify(e))
+
+
+    '''
+    Record a completed unit. Safe to call from several threads.
+
+    inputs:
+    unit    (str)            Unit id. Other types are converted with str().
+    record  (json, optional) Result of the unit
+    outputs (list, optional) Paths of files the unit wrote
+    '''
+    def append(self, unit, record=None, outputs=()):
+        entry = {
+            'unit': str(unit),
+            'record': record,
+            'outputs': [[p, os.path.getsize(p) if os.path.isfile(p) else None] for p in outputs]
+        }
+
+        with self.lock:
+            self.entries[entry['unit']] = entry
+            self.buffer.append(json.dumps(entry) + '\n')
+            if len(self.buffer) >= self.flush_every: self.flush()
+
+
+    '''
+    Append buffered entries with one write and fsync
+    '''
+    def flush(self):
+        with self.lock:
+            if not self.buffer: return
+
+            data = ''.join(self.buffer).encode()
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+            try:
+                view = memoryview(data)
+                while view: view = view[os.write(fd, view):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+            self.buffer = []
+
+
+    '''
+    Remove the journal once the task is done
+    '''
+    def clear(self):
+        with self.lock:
+            self.buffer = []
+            self.entries = OrderedDict()
+            if os.path.isfile(self.path): os.remove(self.path)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, kind, value, tb):
+        if kind is None: self.clear()
+        else: self.flush()
+
+
+'''
+Journal of a task in the output directory
+
+inputs:
+task        (object)        Task with a cfg
+flush_every (int, optional) Number of appended entries buffered before they are flushed
+
+outputs:
+journal (Journal) Journal that keeps previous entries if the run is resumed
+'''
+def journal(task, flush_every=1):
+    cfg = task.cfg
+    path = os.path.join(cfg.output_dir, CHECKPOINT_DIR, f'{type(task).__name__}.jsonl')
+    return Journal(path, resume=getattr(cfg, 'resume', False), flush_every=flush_every)
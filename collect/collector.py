@@ -9,6 +9,8 @@ sys.path.insert(1, '/media/ch3njus/Seagate4TB/projects/pystagram')
 from pystagram import Instagram
 from colorama import Fore, Style
 
+import artifacts
+
 
 '''
 Output csvs of missing moves without videos
@@ -31,14 +33,14 @@ def find_missing(moves_path, videos_path, csv_out):
     una = clips.loc[clips['embed'] == 'unavailable.mp4']
     una = pd.merge(moves, una, on='id')
     una = una.drop(['prereq', 'subseq', 'type', 'alias', 'description'], axis=1)
-    una.to_csv(os.path.join(csv_out, 'all_missing.csv'), index=False, sep='\t')
+    artifacts.write_table(una, os.path.join(csv_out, 'all_missing.csv'))
 
     miss = una.loc[una['link'].notnull()]
-    miss.to_csv(os.path.join(csv_out, 'missing_with_link.csv'), index=False, sep='\t')
+    artifacts.write_table(miss, os.path.join(csv_out, 'missing_with_link.csv'))
 
     cta = una.loc[una['link'].isna()]
     cta = cta.drop(['title', 'channel', 'link', 'time', 'embed'], axis=1)
-    cta.to_csv(os.path.join(csv_out, 'call_to_action.csv'), index=False, sep='\t')
+    artifacts.write_table(cta, os.path.join(csv_out, 'call_to_action.csv'))
 
     return una, miss, cta
 
@@ -47,18 +49,20 @@ def find_missing(moves_path, videos_path, csv_out):
 Collect missing videos that have links
 
 inputs:
-df      (pd.DataFrame) DataFrame of videos and moves
-dst     (str)          Directory to save videos into
-csv_out (str)          CSV output directory
+df      (pd.DataFrame)       DataFrame of videos and moves
+dst     (str)                Directory to save videos into
+csv_out (str)                CSV output directory
+journal (Journal, optional)  Checkpoint journal. Videos it already downloaded are skipped.
 
 outputs:
 failed (pd.DataFrame) DataFrame of videos that could not be downloaded. These should be merged with
                       the cta (call to action) dataframe later on.
 df     (pd.DataFrame) DataFrame of videos that were able to be downloaded.
 '''
-def collect(df, dst, csv_out):
+def collect(df, dst, csv_out, journal=None):
     failed = pd.DataFrame(columns=['id', 'name', 'vid', 'channel', 'link', 'time', 'embed'])
     failed.reset_index()
+    done = journal.completed() if journal else {}
 
     if not os.path.exists(dst):
         os.makedirs(dst)
@@ -68,6 +72,10 @@ def collect(df, dst, csv_out):
         name = row['name'].lower().replace(' ', '_')
         link = row['link']
 
+        if name in done:
+            df.at[i, 'embed'] = done[name]
+            continue
+
         try:
             if 'youtube' in link:
                 vid = YouTube(link)
@@ -76,13 +84,14 @@ def collect(df, dst, csv_out):
                 gram = Instagram(link)
                 gram.download(dst=dst, filename=name)
             df.at[i, 'embed'] = name+'.mp4'
+            if journal: journal.append(name, name+'.mp4', outputs=[os.path.join(dst, name+'.mp4')])
         except Exception:
             failed = failed.append(row, ignore_index=True)
 
     # create a dataframe of successfully downloaded videos, which are moves not in failed
     df = df[~df.id.isin(failed.id)]
-    failed.to_csv('unavailable.csv', index=False, sep='\t')
-    df.to_csv('found.csv', index=False, sep='\t')
+    artifacts.write_table(failed, os.path.join(csv_out, 'unavailable.csv'))
+    artifacts.write_table(df, os.path.join(csv_out, 'found.csv'))
 
     return failed, df
 
@@ -186,7 +195,7 @@ def update_videos(move_tsv, video_tsv, update, video_src, save_path):
             update.drop(columns=col)
 
     df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-    df.to_csv(save_path, index=False, sep='\t')
+    artifacts.write_table(df, save_path)
 
     return df, err
 
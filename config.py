@@ -7,6 +7,7 @@ import sys
 import configparser
 
 from utils import *
+from resources import total_memory
 
 class Configuration(object):
     def __init__(self, config):
@@ -18,13 +19,21 @@ class Configuration(object):
         self.warning = default['warning']
         self.whitelist = self.get_whitelist() if default.getboolean('whitelist') else []
         self.parallel = default.getboolean('parallel')
+        self.workers = int(default['workers']) if default.get('workers') else 0
+        self.timeout = float(default['timeout']) if default.get('timeout') else 0
+        self.cpus = int(default['cpus']) if default.get('cpus') else os.cpu_count()
+        self.memory = int(default['memory']) if default.get('memory') else total_memory()
         self.pipe = default['pipe']
+        # set by main.py --resume so tasks keep their checkpoints
+        self.resume = False
         self.output_dir = default['output']
 
         # move configuration
         move = cfg['moves']
         self.move_csv = move['csv']
         self.node_map = move['map']
+        self.move_chunksize = int(move['chunksize']) if move['chunksize'] else 0
+        self.move_workers = int(move['workers']) if move['workers'] else 0
 
         # video configuration
         video = cfg['videos']
@@ -50,6 +59,13 @@ class Configuration(object):
 
         if self.train_split or self.val_split or self.test_split: assert self.is_split
 
+        # spreadsheet to graph configuration
+        tables = cfg['tables']
+        self.table_src = tables['src']
+        self.table_dst = tables['dst']
+        self.table_workers = int(tables['workers']) if tables['workers'] else 0
+        self.table_chunksize = int(tables['chunksize']) if tables['chunksize'] else 0
+
         # files used across tasks
         files = cfg['files']
         self.graph = files['graph']
@@ -58,6 +74,8 @@ class Configuration(object):
         self.train_mask = files['train_mask']
         self.val_mask = files['val_mask']
         self.test_mask = files['test_mask']
+        self.label_cache = os.path.join(default['output'], files['label_cache'])
+        self.history = os.path.join(default['output'], files['history'])
         
         if default['output']: make_dir(default['output'])
         if video['src']: make_dir(video['src'])
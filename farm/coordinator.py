@@ -0,0 +1,290 @@
+'''
+Coordinator of the task farm
+
+Splits a task into work units and hands them to workers that connect over TCP. A worker that closes its
+connection or misses heartbeats is presumed dead, and the unit it held is requeued for another worker. Once
+every unit has a result, the task collects the results on the coordinator.
+
+A task can be farmed if it defines:
+units()          List of json serializable work units
+process(unit)    Process one unit on a worker and return a json serializable record
+collect(records) Combine the records of all successful units, in unit order
+
+Workers read and write the data paths of the configuration, so every node needs the same paths, e.g. a
+shared mount. To test on one machine, start the coordinator with --local to also start workers on localhost.
+
+The coordinator only listens on localhost unless --host is given. Workers must send the shared token in their
+hello, from --token or the FARM_TOKEN environment variable. If neither is set, a token is generated and printed.
+
+usage:
+python -m farm.coordinator --config production --task FormatVideos --host 0.0.0.0 --port 5555 --token <token>
+python -m farm.worker --host <coordinator> --port 5555 --token <token> --processes 4
+
+Author: Justin Chen
+'''
+import os
+import hmac
+import time
+import socket
+import secrets
+import argparse
+import threading
+import socketserver
+from collections import deque, OrderedDict
+
+import config
+import tasks as registry
+from farm.protocol import Channel
+from farm import worker as wkr
+from utils import is_config, make_dir, write
+
+
+class Coordinator(object):
+
+    '''
+    inputs:
+    task      (object)          Task defining units(), process(), and collect()
+    text      (str)             Text of the configuration file sent to workers
+    host      (str, optional)   Address to listen on. Only localhost by default.
+    port      (int, optional)   Port to listen on. Any free port if 0.
+    heartbeat (float, optional) Seconds between worker heartbeats
+    timeout   (float, optional) Seconds without any message before a worker is presumed dead
+    attempts  (int, optional)   Times a unit is handed out before it fails because its workers keep dying
+    token     (str, optional)   Shared token workers must send in their hello. Generated if None.
+    '''
+    def __init__(self, task, text, host='127.0.0.1', port=0, heartbeat=5.0, timeout=30.0, attempts=3, token=None):
+        if not all(hasattr(task, f) for f in ('units', 'process', 'collect')):
+            raise Exception(f'{type(task).__name__} does not define units(), process(), and collect()')
+
+        self.task = task
+        self.name = type(task).__name__
+        self.text = text
+        self.heartbeat = heartbeat
+        self.timeout = timeout
+        self.attempts = attempts
+        self.token = token or secrets.token_hex(16)
+
+        self.units = list(task.units())
+        self.queue = deque(range(len(self.units)))
+        self.tries = [0] * len(self.units)
+        self.results = {}
+        self.workers = OrderedDict()
+        self.connected = 0
+        self.lock = threading.Condition()
+
+        coordinator = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                coordinator.handle(self.request, self.client_address)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.address = self.server.server_address
+
+
+    @property
+    def finished(self):
+        return len(self.results) == len(self.units)
+
+
+    '''
+    Next unit for a worker
+
+    inputs:
+    worker (str) Worker id
+
+    outputs:
+    i (int) Index of unit or None if none are queued
+    '''
+    def assign(self, worker):
+        with self.lock:
+            if not self.queue: return None
+
+            i = self.queue.popleft()
+            self.tries[i] += 1
+            self.workers[worker]['unit'] = i
+
+            return i
+
+
+    '''
+    inputs:
+    worker (str)  Worker id
+    i      (int)  Index of unit
+    record (json) Output of process() or None if it failed
+    error  (str)  Traceback if process() raised
+    '''
+    def complete(self, worker, i, record, error):
+        with self.lock:
+            state = self.workers[worker]
+            state['unit'] = None
+
+            if i not in self.results:
+                self.results[i] = {'record': record, 'error': error, 'worker': worker}
+                state['done' if error is None else 'failed'] += 1
+
+            self.lock.notify_all()
+
+
+    '''
+    Requeue the unit of a dead worker, or fail it once it has been handed out too often
+
+    inputs:
+    worker (str) Worker id
+    reason (str) Why the worker is presumed dead
+    '''
+    def lost(self, worker, reason):
+        with self.lock:
+            state = self.workers[worker]
+            state['alive'] = False
+            state['reason'] = reason
+            i, state['unit'] = state['unit'], None
+
+            if i is not None and i not in self.results:
+                if self.tries[i] < self.attempts:
+                    self.queue.appendleft(i)
+                    print(f'{worker} lost ({reason}), requeued unit {i}')
+                else:
+                    self.results[i] = {'record': None, 'error': f'workers lost {self.tries[i]} times: {reason}', 'worker': worker}
+
+            self.lock.notify_all()
+
+
+    '''
+    Serve one worker connection. Runs in a thread per worker.
+
+    inputs:
+    sock    (socket.socket) Connection to worker
+    address (tuple)         Address of worker
+    '''
+    def handle(self, sock, address):
+        sock.settimeout(self.timeout)
+        channel = Channel(sock)
+        worker = None
+
+        with self.lock: self.connected += 1
+
+        try:
+            hello = channel.receive()
+
+            # unknown hosts must not receive the configuration or write results into task outputs
+            if not hmac.compare_digest(str(hello.get('token', '')), self.token):
+                print(f'rejected worker at {address[0]}:{address[1]}: invalid token')
+                channel.send('denied', reason='invalid token')
+                return
+
+            worker = f'{hello.get("worker") or address[0]}:{address[1]}'
+
+            with self.lock:
+                self.workers[worker] = {'host': address[0], 'pid': hello.get('pid'), 'unit': None,
+                                        'done': 0, 'failed': 0, 'alive': True, 'reason': None}
+
+            channel.send('config', task=self.name, config=self.text, heartbeat=self.heartbeat)
+
+            while True:
+                msg = channel.receive()
+
+                if msg['type'] == 'request':
+                    i = self.assign(worker)
+
+                    if i is not None: channel.send('unit', id=i, unit=self.units[i])
+                    elif self.finished: channel.send('done')
+                    else: channel.send('wait', delay=self.heartbeat)
+
+                elif msg['type'] == 'result':
+                    self.complete(worker, msg['id'], msg.get('record'), msg.get('error'))
+
+        except socket.timeout:
+            if worker: self.lost(worker, f'no heartbeat for {self.timeout} s')
+        except (ConnectionError, OSError, ValueError) as e:
+            if worker:
+                with self.lock: busy = self.workers[worker]['unit'] is not None
+                if busy or not self.finished: self.lost(worker, str(e) or type(e).__name__)
+        finally:
+            channel.close()
+
+            with self.lock:
+                self.connected -= 1
+                self.lock.notify_all()
+
+
+    '''
+    Serve workers until every unit has a result, then collect the results with the task
+
+    inputs:
+    local (int, optional) Number of worker processes to start on localhost
+
+    outputs:
+    log (dict) Units, failures, workers, and time in seconds
+    '''
+    def run(self, local=0):
+        start = time.perf_counter()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f'{self.name}: {len(self.units)} units on {self.address[0]}:{self.address[1]}')
+
+        procs = wkr.spawn('127.0.0.1', self.address[1], local, self.token) if local else []
+
+        try:
+            with self.lock:
+                while not self.finished:
+                    self.lock.wait(timeout=self.heartbeat)
+
+                # let waiting workers ask again and receive done before the server closes
+                deadline = time.perf_counter() + 2*self.heartbeat
+                while self.connected and time.perf_counter() < deadline:
+                    self.lock.wait(timeout=deadline - time.perf_counter())
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+
+            for p in procs: p.join(timeout=self.timeout)
+
+        records = [self.results[i]['record'] for i in range(len(self.units)) if self.results[i]['error'] is None]
+        failures = [{'unit': self.units[i], 'worker': r['worker'], 'error': r['error']}
+                    for i, r in sorted(self.results.items()) if r['error'] is not None]
+
+        self.task.collect(records)
+
+        return {
+            'task': self.name,
+            'units': len(self.units),
+            'succeeded': len(records),
+            'failed': failures,
+            'workers': dict(self.workers),
+            'time': time.perf_counter() - start
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Split a task into units and serve them to workers')
+    parser.add_argument('--config', '-cfg', type=is_config, required=True, help='Configuration file in config')
+    parser.add_argument('--task', required=True, choices=registry.TASKS, help='Task to farm')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on. Use 0.0.0.0 to accept remote workers.')
+    parser.add_argument('--port', type=int, default=5555, help='Port to listen on')
+    parser.add_argument('--heartbeat', type=float, default=5.0, help='Seconds between worker heartbeats')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Seconds without a heartbeat before a worker is presumed dead')
+    parser.add_argument('--attempts', type=int, default=3, help='Times a unit is handed out before it fails')
+    parser.add_argument('--local', type=int, default=0, help='Number of workers to also start on localhost')
+    parser.add_argument('--token', default=os.environ.get('FARM_TOKEN'), help='Shared token of workers. Generated if not set.')
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.config):
+        raise Exception(f'{args.config} does not exist')
+
+    with open(args.config, 'r') as file:
+        text = file.read()
+
+    make_dir('logs')
+    task = registry.load(args.task)(config.Configuration(args.config))
+    coordinator = Coordinator(task, text, args.host, args.port, args.heartbeat, args.timeout, args.attempts, args.token)
+    if not args.token: print(f'worker token: {coordinator.token}')
+
+    log = coordinator.run(args.local)
+    print(f'{log["succeeded"]}/{log["units"]} units succeeded - time: {log["time"]:.4f} s')
+    write(f'farm_{args.task.lower()}.json', log)
+
+
+if __name__ == '__main__':
+    main()
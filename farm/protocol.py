@@ -0,0 +1,70 @@
+'''
+Messages between the coordinator and workers of the task farm
+
+Every message is one line of json with a type:
+
+worker      -> coordinator
+hello       {'worker': str, 'host': str, 'pid': int, 'token': str}
+request     Ask for the next unit
+result      {'id': int, 'record': json, 'error': str or None}
+heartbeat   Sent every interval, also while a unit is processed
+
+coordinator -> worker
+config      {'task': str, 'config': str, 'heartbeat': float} Task name and text of the ini file
+denied      {'reason': str} The token of the worker was wrong, and the connection is closed
+unit        {'id': int, 'unit': json}
+wait        {'delay': float} Every unit is assigned, but may still be requeued
+done        Every unit has a result
+
+Author: Justin Chen
+'''
+import json
+import threading
+
+
+class Channel(object):
+
+    '''
+    inputs:
+    sock (socket.socket) Connected socket
+    '''
+    def __init__(self, sock):
+        self.sock = sock
+        self.file = sock.makefile('rb')
+        self.lock = threading.Lock()
+
+
+    '''
+    Send a message. Safe to call from a heartbeat thread while another thread sends results.
+
+    inputs:
+    kind (str) Message type
+    body (dict) Fields of the message
+    '''
+    def send(self, kind, **body):
+        body['type'] = kind
+        data = (json.dumps(body) + '\n').encode()
+
+        with self.lock:
+            self.sock.sendall(data)
+
+
+    '''
+    outputs:
+    msg (dict) Next message
+
+    Raises ConnectionError if the other end closed the connection, or socket.timeout if nothing arrived within
+    the timeout of the socket.
+    '''
+    def receive(self):
+        line = self.file.readline()
+        if not line: raise ConnectionError('connection closed')
+        return json.loads(line)
+
+
+    def close(self):
+        try:
+            self.file.close()
+            self.sock.close()
+        except OSError:
+            pass
@@ -0,0 +1,158 @@
+'''
+Worker of the task farm
+
+Connects to a coordinator, receives the configuration and task name, and processes one unit at a time until
+the coordinator is done. Heartbeats are sent from a background thread so long units do not look like dead
+workers. Several workers on one machine are started with --processes.
+
+usage:
+python -m farm.worker --host <coordinator> --port 5555 --token <token> --processes 4
+
+Author: Justin Chen
+'''
+import os
+import socket
+import argparse
+import tempfile
+import threading
+import traceback
+import multiprocessing as mp
+
+import config
+import tasks as registry
+from farm.protocol import Channel
+from utils import make_dir
+
+
+'''
+Build the task from the configuration text sent by the coordinator
+
+inputs:
+name (str) Task name
+text (str) Text of the configuration file
+
+outputs:
+task (object) Task instance
+'''
+def load_task(name, text):
+    fd, path = tempfile.mkstemp(suffix='.ini')
+
+    try:
+        with os.fdopen(fd, 'w') as file:
+            file.write(text)
+
+        return registry.load(name)(config.Configuration(path))
+    finally:
+        os.remove(path)
+
+
+'''
+Send heartbeats until stopped
+
+inputs:
+channel  (Channel)         Connection to coordinator
+interval (float)           Seconds between heartbeats
+stop     (threading.Event) Set to stop
+'''
+def beat(channel, interval, stop):
+    while not stop.wait(interval):
+        try:
+            channel.send('heartbeat')
+        except OSError:
+            return
+
+
+'''
+Process units from a coordinator until it is done
+
+inputs:
+host  (str)           Address of coordinator
+port  (int)           Port of coordinator
+token (str, optional) Shared token of the coordinator. FARM_TOKEN if None.
+name  (str, optional) Worker id. Host name and pid if None.
+
+outputs:
+done (int) Number of units processed
+'''
+def work(host, port, token=None, name=None):
+    name = name or f'{socket.gethostname()}-{os.getpid()}'
+    token = token or os.environ.get('FARM_TOKEN', '')
+    channel = Channel(socket.create_connection((host, port)))
+    stop = threading.Event()
+    done = 0
+
+    # tasks write their logs relative to the working directory
+    make_dir('logs')
+
+    try:
+        channel.send('hello', worker=name, host=socket.gethostname(), pid=os.getpid(), token=token)
+        setup = channel.receive()
+
+        if setup['type'] == 'denied': raise Exception(f'coordinator {host}:{port} denied worker: {setup["reason"]}')
+        task = load_task(setup['task'], setup['config'])
+
+        threading.Thread(target=beat, args=(channel, setup['heartbeat'], stop), daemon=True).start()
+
+        while True:
+            channel.send('request')
+            msg = channel.receive()
+
+            if msg['type'] == 'done': break
+
+            if msg['type'] == 'wait':
+                stop.wait(msg['delay'])
+                continue
+
+            try:
+                record, error = task.process(msg['unit']), None
+            except Exception:
+                record, error = None, traceback.format_exc()
+
+            channel.send('result', id=msg['id'], record=record, error=error)
+            done += 1
+
+    except ConnectionError:
+        # the coordinator closes connections once it is done
+        pass
+    finally:
+        stop.set()
+        channel.close()
+
+    return done
+
+
+'''
+Start worker processes
+
+inputs:
+host      (str)           Address of coordinator
+port      (int)           Port of coordinator
+processes (int)           Number of workers
+token     (str, optional) Shared token of the coordinator
+
+outputs:
+procs (list) Started processes
+'''
+def spawn(host, port, processes, token=None):
+    procs = [mp.Process(target=work, args=(host, port, token), daemon=True) for _ in range(processes)]
+    for p in procs: p.start()
+    return procs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Process units of a task served by a coordinator')
+    parser.add_argument('--host', default='127.0.0.1', help='Address of coordinator')
+    parser.add_argument('--port', type=int, default=5555, help='Port of coordinator')
+    parser.add_argument('--processes', '-n', type=int, default=1, help='Number of workers on this machine')
+    parser.add_argument('--token', default=os.environ.get('FARM_TOKEN'), help='Shared token of the coordinator')
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        print(f'processed {work(args.host, args.port, args.token)} units')
+        return
+
+    for p in spawn(args.host, args.port, args.processes, args.token): p.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+'''
+Run history
+
+Every run appends its inputs and one record per task to a SQLite database in the output directory, so task
+times can be compared across data and code changes. Tasks may set a cache attribute of {'hits': int, 'misses': int}
+to record how much of their work was reused.
+'''
+import os
+import time
+import sqlite3
+import hashlib
+import subprocess
+from datetime import datetime as dt
+from statistics import median
+
+from colorama import Fore, Style
+
+import profiler
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    started TEXT,
+    config  TEXT,
+    pipe    TEXT,
+    git     TEXT
+);
+CREATE TABLE IF NOT EXISTS inputs (
+    run_id INTEGER REFERENCES runs(id),
+    path   TEXT,
+    bytes  INTEGER,
+    rows   INTEGER,
+    hash   TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    run_id       INTEGER REFERENCES runs(id),
+    task         TEXT,
+    started      TEXT,
+    wall         REAL,
+    cpu          REAL,
+    peak_rss     INTEGER,
+    peak_traced  INTEGER,
+    rows         INTEGER,
+    source       TEXT,
+    output_files INTEGER,
+    output_bytes INTEGER,
+    cache_hits   INTEGER,
+    cache_misses INTEGER,
+    failed       INTEGER
+);
+CREATE INDEX IF NOT EXISTS tasks_task ON tasks(task, run_id);
+'''
+
+
+'''
+inputs:
+path (str) Path to database
+
+outputs:
+conn (sqlite3.Connection) Connection with the schema created
+'''
+def connect(path):
+    conn = sqlite3.connect(path, timeout=60)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+'''
+inputs:
+path (str) Path to file
+
+outputs:
+digest (str) blake2b hash of the file
+'''
+def file_hash(path, block=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(block), b''):
+            h.update(chunk)
+
+    return h.hexdigest()
+
+
+'''
+inputs:
+path (str) Path to tsv
+
+outputs:
+rows (int) Number of lines excluding the header
+'''
+def count_rows(path, block=1 << 20):
+    lines = 0
+
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(block), b''):
+            lines += chunk.count(b'\n')
+
+    return max(lines - 1, 0)
+
+
+'''
+outputs:
+commit (str) Current git commit or None outside of a git checkout
+'''
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+'''
+inputs:
+thread (bool, optional) Measure only the calling thread, for tasks that share the process with others
+
+outputs:
+cpu (float) User and system time of the calling thread, or of this process and its finished children
+'''
+def cpu_time(thread=False):
+    if thread: return time.thread_time()
+
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+'''
+Files in directories changed since a time. Temporary files of atomic writes are skipped, and files removed during
+the scan are ignored. The counts are approximate in parallel mode, because files written by tasks running at the same
+time are counted too.
+
+inputs:
+dirs  (list)  Directories to scan
+since (float) Time in seconds since the epoch
+
+outputs:
+files (int) Number of changed files
+size  (int) Total bytes of changed files
+'''
+def changed_files(dirs, since):
+    files, size = 0, 0
+
+    for d in dirs:
+        if not d or not os.path.isdir(d): continue
+
+        for root, _, names in os.walk(d):
+            for name in names:
+                if name.endswith('.tmp'): continue
+
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+
+                if stat.st_mtime >= since:
+                    files += 1
+                    size += stat.st_size
+
+    return files, size
+
+
+'''
+Record the inputs of a new run
+
+inputs:
+cfg  (config.Configuration) Configuration of the run
+path (str)                  Path to config file
+
+outputs:
+run_id (int) Id of the run
+'''
+def start_run(cfg, path):
+    with connect(cfg.history) as conn:
+        cur = conn.execute('INSERT INTO runs (started, config, pipe, git) VALUES (?, ?, ?, ?)',
+                           (dt.now().isoformat(), path, cfg.pipe, git_commit()))
+        run_id = cur.lastrowid
+
+        for src in (cfg.move_csv, cfg.video_csv):
+            if not os.path.isfile(src): continue
+            conn.execute('INSERT INTO inputs VALUES (?, ?, ?, ?, ?)',
+                         (run_id, src, os.path.getsize(src), count_rows(src), file_hash(src)))
+
+    conn.close()
+    return run_id
+
+
+'''
+Latest run and the tasks of it that succeeded
+
+inputs:
+path (str) Path to database
+
+outputs:
+run (dict) Id, config, pipe, and succeeded tasks of the latest run or None if there are no runs
+'''
+def last_run(path):
+    if not os.path.isfile(path): return None
+
+    conn = connect(path)
+    run = conn.execute('SELECT id, config, pipe FROM runs ORDER BY id DESC LIMIT 1').fetchone()
+    succeeded = [r[0] for r in conn.execute('SELECT task FROM tasks WHERE run_id = ? AND failed = 0', (run[0],))] if run else []
+    conn.close()
+
+    if run is None: return None
+
+    return {'id': run[0], 'config': run[1], 'pipe': run[2], 'succeeded': succeeded}
+
+
+'''
+Run a task and append its record to the run history. Runs inside child processes in parallel mode, or in threads for
+tasks with executor = 'thread', whose CPU time is that of their thread and whose peak RSS is not recorded because the
+process is shared.
+
+inputs:
+task    (object)         Task with a run() and a cfg
+run_id  (int)            Id of the run from start_run()
+profile (bool, optional) Profile the task with profiler.profile()
+
+outputs:
+record (dict) Time, CPU time, and outputs of the task
+'''
+def track(task, run_id, profile=False):
+    cfg = task.cfg
+    thread = profiler.in_thread()
+    start, wall, cpu = time.time(), time.perf_counter(), cpu_time(thread)
+    summary, error = {}, None
+
+    try:
+        if profile: summary = profiler.profile(task)
+        else: task.run()
+    except Exception as e:
+        error = e
+
+    wall, cpu = time.perf_counter() - wall, cpu_time(thread) - cpu
+    files, size = changed_files([cfg.output_dir, 'logs'], start)
+    cache = getattr(task, 'cache', None) or {}
+    name = type(task).__name__
+
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tasks', f'{name}.py')
+
+    with connect(cfg.history) as conn:
+        rows = conn.execute('SELECT rows FROM inputs WHERE run_id = ? AND path = ?', (run_id, cfg.move_csv)).fetchone()
+        conn.execute('INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+            run_id, name, dt.fromtimestamp(start).isoformat(), wall, cpu, None if thread else profiler.peak_rss(),
+            summary.get('peak_traced'), rows[0] if rows else None,
+            file_hash(source) if os.path.isfile(source) else None,
+            files, size, cache.get('hits'), cache.get('misses'), int(error is not None)))
+
+    conn.close()
+
+    if error is not None: raise error
+
+    return {'time': wall, 'cpu_time': cpu, 'output_files': files, 'output_bytes': size}
+
+
+'''
+CPU and memory demand of each task learned from its recent successful runs
+
+inputs:
+path   (str)           Path to database
+window (int, optional) Number of recent runs per task
+
+outputs:
+demands (dict) Dictionary mapping task to median CPUs busy (CPU time over wall time) and median peak RSS in MB
+'''
+def demands(path, window=5):
+    if not os.path.isfile(path): return {}
+
+    conn = connect(path)
+    rows = conn.execute('''
+        SELECT task, wall, cpu, peak_rss FROM tasks
+        WHERE failed = 0 AND wall > 0
+        ORDER BY task, run_id
+    ''').fetchall()
+    conn.close()
+
+    runs = {}
+    for task, wall, cpu, rss in rows:
+        runs.setdefault(task, []).append((cpu / wall if cpu is not None else None, rss))
+
+    result = {}
+    for task, r in runs.items():
+        busy = [b for b, _ in r[-window:] if b is not None]
+        rss = [m for _, m in r[-window:] if m]
+
+        result[task] = {
+            'cpus': median(busy) if busy else None,
+            'memory': int(median(rss)) // (1 << 20) if rss else None
+        }
+
+    return result
+
+
+'''
+Flag tasks whose latest time per input row is slower than the median of their previous runs
+
+inputs:
+path      (str)             Path to database
+threshold (float, optional) Allowed relative slowdown
+window    (int, optional)   Number of previous runs to compare against
+min_time  (float, optional) Ignore tasks faster than this many seconds, which are noise
+
+outputs:
+report (dict) Dictionary mapping task to its recent runs and regression status
+'''
+def report(path, threshold=0.25, window=5, min_time=0.05):
+    if not os.path.isfile(path): return {}
+
+    conn = connect(path)
+    rows = conn.execute('''
+        SELECT t.task, t.run_id, r.started, t.wall, t.cpu, t.peak_rss, t.rows, t.source, t.cache_hits, t.cache_misses
+        FROM tasks t JOIN runs r ON r.id = t.run_id
+        WHERE t.failed = 0
+        ORDER BY t.task, t.run_id
+    ''').fetchall()
+    conn.close()
+
+    history = {}
+    for task, run_id, started, wall, cpu, rss, n, source, hits, misses in rows:
+        history.setdefault(task, []).append({
+            'run': run_id, 'started': started, 'wall': wall, 'cpu': cpu, 'peak_rss': rss, 'rows': n,
+            'per_row': wall / n if n else wall, 'source': source, 'cache_hits': hits, 'cache_misses': misses
+        })
+
+    result = {}
+    for task, runs in history.items():
+        latest, previous = runs[-1], runs[-window-1:-1]
+        baseline = median([r['per_row'] for r in previous]) if previous else None
+        ratio = latest['per_row'] / baseline if baseline else None
+
+        result[task] = {
+            'runs': runs[-window-1:],
+            'baseline_per_row': baseline,
+            'ratio': ratio,
+            'code_changed': bool(previous) and latest['source'] != previous[-1]['source'],
+            'regressed': ratio is not None and ratio > 1 + threshold and latest['wall'] > min_time
+        }
+
+    return result
+
+
+'''
+Print trends of each task
+
+inputs:
+result (dict) Output of report()
+'''
+def show(result):
+    if not result:
+        print('no run history')
+        return
+
+    print(f'{"task":<32}{"runs":>6}{"latest (s)":>12}{"rows":>10}{"us/row":>10}{"vs median":>11}')
+
+    for task, r in sorted(result.items()):
+        latest = r['runs'][-1]
+        ratio = f'{r["ratio"]:.2f}x' if r['ratio'] is not None else '-'
+        color = Fore.RED if r['regressed'] else ''
+        note = ' (code changed)' if r['code_changed'] else ''
+
+        print(f'{color}{task:<32}{len(r["runs"]):>6}{latest["wall"]:>12.4f}{latest["rows"] or 0:>10}'
+              f'{latest["per_row"]*1e6:>10.2f}{ratio:>11}{note}{Style.RESET_ALL}')
+
+    regressed = [t for t, r in result.items() if r['regressed']]
+    if regressed: print(f'{Fore.RED}regressed: {", ".join(sorted(regressed))}{Style.RESET_ALL}')
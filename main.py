@@ -5,6 +5,9 @@ main module
 '''
 import argparse
 import config
+import profiler
+import history
+import resources
 
 from pipeline import parallel, sequential, build, notice
 from utils import *
@@ -16,23 +19,69 @@ def main():
     parser.add_argument('--config', '-cfg', type=is_config, help='Configuration file in config')
     parser.add_argument('--clean', '-c', action='store_true', help='Clean out old logs')
     parser.add_argument('--verbose', '-v', action='store_true', help='Display stack trace if errors occur')
+    parser.add_argument('--profile', '-p', action='store_true', help='Profile time and memory of each task')
+    parser.add_argument('--report', '-r', action='store_true', help='Show task time trends from the run history and exit')
+    parser.add_argument('--threshold', '-t', type=float, default=0.25, help='Relative slowdown per input row flagged by --report')
+    parser.add_argument('--resume', action='store_true', help='Continue the last run, skipping its succeeded tasks and completed units')
+    parser.add_argument('--watch', '-w', action='store_true', help='Keep running and re-run tasks whose inputs change')
+    parser.add_argument('--interval', type=float, default=0.5, help='Seconds between polls of the inputs in --watch')
+    parser.add_argument('--serve', '-s', action='store_true', help='Serve move graph queries over HTTP on localhost')
+    parser.add_argument('--port', type=int, default=8765, help='Port of --serve')
     args = parser.parse_args()
 
     make_dir('logs')
     if args.clean: clean_logs()
+    if args.profile: profiler.clear()
 
     if not os.path.isfile(os.path.join(os.getcwd(), args.config)):
         raise Exception(f'{args.config} does not exist')
 
     cfg = config.Configuration(args.config)
+
+    if args.report:
+        result = history.report(cfg.history, args.threshold)
+        history.show(result)
+        write('report.json', result)
+        return
+
+    if args.serve:
+        # loads pandas and numpy, so only when serving
+        import server
+        server.GraphServer(cfg, port=args.port).run()
+        return
+
+    if args.resume:
+        last = history.last_run(cfg.history)
+        remaining = [t for t in last['pipe'].split(', ') if t not in last['succeeded']] if last else []
+
+        if not remaining:
+            print('nothing to resume')
+            return
+
+        print(f'resuming run {last["id"]}: {", ".join(remaining)}')
+        cfg.pipe = ', '.join(remaining)
+        cfg.resume = True
+
     pipe = build(cfg)
 
+    if args.watch:
+        # loads pandas and networkx, so only when watching
+        import watch
+        watch.Watcher(cfg, args.config, pipe, args.interval, args.verbose).run()
+        return
+
+    run_id = history.start_run(cfg, args.config)
+
     log = {}
-    if cfg.parallel: parallel(pipe)
-    else: sequential(pipe, log, verbose=args.verbose)
+    if cfg.parallel:
+        budget = resources.Budget(cfg.cpus, cfg.memory)
+        parallel(pipe, log, run_id, verbose=args.verbose, profile=args.profile, workers=cfg.workers, timeout=cfg.timeout,
+                 budget=budget, learned=history.demands(cfg.history))
+    else: sequential(pipe, log, run_id, verbose=args.verbose, profile=args.profile)
 
     accuracy(log, pipe)
     write('datapipe.json', log)
+    if args.profile: write('profile.json', profiler.summarize())
     notice()
 
 
@@ -4,55 +4,242 @@ Data pipeline API
 import os
 import sys
 import time
-import inspect
+import threading
 import traceback
 import multiprocessing as mp
+from multiprocessing.connection import wait
 from collections import OrderedDict
 
-from tasks import *
+import tasks as registry
+import resources
 
 from colorama import Fore, Style
 from utils import timer
+import history
 
 '''
-Parallel task execution
+Result of a task in the log
+
+inputs:
+status   (str)            One of succeeded, failed, timeout, or cancelled
+executor (str, optional)  process or thread
+runtime  (float, optional) Wall time in seconds
+error    (str, optional)  Traceback or reason
+record   (dict, optional) Record from history.track()
+
+outputs:
+result (dict) Structured result
+'''
+def result(status, executor=None, runtime=None, error=None, record=None):
+    res = {'status': status, 'executor': executor, 'time': runtime, 'traceback': error}
+    if record: res.update({k: v for k, v in record.items() if k != 'time'})
+    return res
+
+
+'''
+Run a task and send its result through a pipe. Target of worker processes and threads.
+
+inputs:
+task    (object)                     Task to execute
+run_id  (int)                        Id of the run in the run history
+profile (bool)                       Profile the task
+conn    (multiprocessing.Connection) Sending end of pipe
+'''
+def execute(task, run_id, profile, conn):
+    try:
+        res = ('succeeded', history.track(task, run_id, profile))
+    except Exception:
+        res = ('failed', traceback.format_exc())
+
+    # the pipe is closed if the task already timed out
+    try:
+        conn.send(res)
+    except OSError:
+        pass
+    finally:
+        conn.close()
+
+
+'''
+Print the result of a task
+
+inputs:
+i       (int)  Position of task in pipe
+task    (str)  Task name
+res     (dict) Result of task
+verbose (bool) Print stack trace of failed tasks
+'''
+def report(i, task, res, verbose=True):
+    if res['status'] == 'succeeded':
+        print(f'{Fore.GREEN}[{i}] {task} succeeded - time: {res["time"]:.4f} s{Style.RESET_ALL}')
+        return
+
+    print(f'{Fore.RED}[{i}] {task}.py {res["status"]}{Style.RESET_ALL}')
+
+    err = res['traceback'] or ''
+    if not verbose and res['status'] == 'failed': err = err.strip().split('\n')[-1]
+    print(f'{err}\n')
+
+
+'''
+Dependencies of each task on other tasks in the pipe. Tasks declare them with a requires class attribute.
 
 inputs:
 pipe (list) Tasks to execute
+
+outputs:
+deps (dict) Dictionary mapping task name to names of tasks it requires
+'''
+def dependencies(pipe):
+    names = set(type(t).__name__ for t in pipe)
+    return {type(t).__name__: [d for d in getattr(t, 'requires', ()) if d in names] for t in pipe}
+
+
+'''
+Names of failed dependencies of a task
+
+inputs:
+name (str)  Task name
+deps (dict) Output of dependencies()
+log  (dict) Results of finished tasks
+
+outputs:
+failed (list) Dependencies that did not succeed
+'''
+def failed_dependencies(name, deps, log):
+    return [d for d in deps[name] if d in log and log[d]['status'] != 'succeeded']
+
+
+'''
+Parallel task execution. Up to workers tasks run at once, each in its own process, or in a thread if the task
+sets executor = 'thread' because it is I/O bound. A task starts once the tasks it requires have succeeded, and
+is cancelled if any of them fail. Tasks running longer than their timeout are terminated. A task also waits until
+its CPU and memory demand fits in the budget left by the running tasks, and is granted those CPUs for its inner pools.
+
+inputs:
+pipe    (list)                       Tasks to execute
+log     (dict)                       Results of each task
+run_id  (int)                        Id of the run in the run history
+verbose (bool, optional)             Print stack trace of failed tasks
+profile (bool, optional)             Profile each task in its own process
+workers (int, optional)              Maximum number of tasks running at once. Number of CPUs if 0.
+timeout (float, optional)            Default timeout in seconds of tasks without a timeout attribute. No timeout if 0.
+budget  (resources.Budget, optional) CPUs and memory shared by running tasks. One CPU per worker if None.
+learned (dict, optional)             Demands of tasks without static hints from history.demands()
 '''
 @timer
-def parallel(pipe):
-    pipe = [mp.Process(target=t.run) for t in pipe]
+def parallel(pipe, log, run_id, verbose=True, profile=False, workers=0, timeout=0, budget=None, learned=None):
+    workers = workers or mp.cpu_count()
+    budget = budget or resources.Budget(workers)
+    deps = dependencies(pipe)
+    order = {type(t).__name__: i for i, t in enumerate(pipe)}
+    pending = OrderedDict((type(t).__name__, t) for t in pipe)
+    running = {}
+
+    def finish(name, res):
+        log[name] = res
+        report(order[name], name, res, verbose)
+
+    while pending or running:
+        for name in list(pending):
+            failed = failed_dependencies(name, deps, log)
+            if failed:
+                pending.pop(name)
+                finish(name, result('cancelled', error=f'required tasks did not succeed: {", ".join(failed)}'))
+
+        for name in list(pending):
+            if len(running) >= workers: break
+            if not all(d in log for d in deps[name]): continue
+
+            # smaller tasks later in the pipe are not held back by a task waiting for room
+            demand = budget.demand(pending[name], learned)
+            if not budget.fits(demand): continue
+
+            t = pending.pop(name)
+            t.granted_cpus = demand[0]
+            budget.acquire(demand)
+            executor = getattr(t, 'executor', 'process')
+            recv, send = mp.Pipe(duplex=False)
+
+            if executor == 'thread':
+                worker = threading.Thread(target=execute, args=(t, run_id, profile, send), daemon=True)
+            else:
+                worker = mp.Process(target=execute, args=(t, run_id, profile, send))
+
+            worker.start()
+            if executor == 'process': send.close()
+
+            limit = getattr(t, 'timeout', None) or timeout
+            running[name] = (worker, recv, executor, time.perf_counter(), limit, demand)
+
+        if not running:
+            # nothing is running to free room or finish a dependency, so the pending tasks require each other
+            for name in list(pending):
+                pending.pop(name)
+                finish(name, result('cancelled', error=f'dependency cycle through required tasks: {", ".join(deps[name])}'))
+            continue
+
+        ready = wait([r[1] for r in running.values()], timeout=0.1)
+
+        for name, (worker, recv, executor, start, limit, demand) in list(running.items()):
+            runtime = time.perf_counter() - start
 
-    for t in pipe: t.start()
-    for t in pipe: t.join()
+            if recv in ready:
+                try:
+                    status, payload = recv.recv()
+                except EOFError:
+                    status, payload = 'failed', f'worker exited with code {getattr(worker, "exitcode", None)}'
+
+                if status == 'succeeded': res = result(status, executor, runtime, record=payload)
+                else: res = result(status, executor, runtime, error=payload)
+
+            elif limit and runtime > limit:
+                # threads cannot be killed, so a timed out thread is left to finish in the background
+                if executor == 'process': worker.terminate()
+                res = result('timeout', executor, runtime, error=f'exceeded timeout of {limit} s')
+
+            else:
+                continue
+
+            if executor == 'process': worker.join()
+            recv.close()
+            budget.release(demand)
+
+            running.pop(name)
+            res.update({'cpus': demand[0], 'memory': demand[1]})
+            finish(name, res)
 
 
 '''
-Sequential execution of pipeline
+Sequential execution of pipeline. A task is skipped if a task it requires failed.
 
 inputs:
-pipe (list) Tasks to execute
-log  (dict) Log for failed tasks
+pipe    (list)           Tasks to execute
+log     (dict)           Results of each task
+run_id  (int)            Id of the run in the run history
+verbose (bool, optional) Print stack trace of failed tasks
+profile (bool, optional) Profile each task
 '''
 @timer
-def sequential(pipe, log, verbose=True):
+def sequential(pipe, log, run_id, verbose=True, profile=False):
+    deps = dependencies(pipe)
+
     for i, t in enumerate(pipe):
         task = type(t).__name__
+        failed = failed_dependencies(task, deps, log)
+        start = time.perf_counter()
 
-        try: 
-            start = time.perf_counter()
-            t.run()
-            runtime = time.perf_counter() - start
-            print(f'{Fore.GREEN}[{i}] {task} succeeded - time: {runtime:.4f} s{Style.RESET_ALL}')
-        except Exception as e:
-            tb = traceback.format_exc()
-            err = tb if verbose else str(e)
-            
-            print(f'{Fore.RED}[{i}] {task}.py failed{Style.RESET_ALL}')
-            print(f'{err}\n')
+        if failed:
+            res = result('cancelled', error=f'required tasks did not succeed: {", ".join(failed)}')
+        else:
+            try:
+                record = history.track(t, run_id, profile)
+                res = result('succeeded', 'main', time.perf_counter() - start, record=record)
+            except Exception:
+                res = result('failed', 'main', time.perf_counter() - start, error=traceback.format_exc())
 
-            log[type(t).__name__] = tb
+        log[task] = res
+        report(i, task, res, verbose)
 
 
 '''
@@ -77,10 +264,9 @@ inputs:
 pipe (list) List of tasks
 '''
 def exists(pipe):
-    tasks = [t.split('.')[0] for t in os.listdir('tasks') if t.endswith('.py')]
     errs = []
     for t in pipe:
-        if t not in tasks: errs.append(t)
+        if t not in registry.TASKS: errs.append(t)
 
     if len(errs) > 0: 
         print(f'Invalid tasks: {Fore.RED}{", ".join(errs)}{Style.RESET_ALL}')
@@ -105,7 +291,29 @@ def prompt(cfg, tasks):
 
 
 '''
-Dynamically import tasks and build pipeline
+Stand-in for a task that could not be imported, e.g. because an optional dependency is missing. It fails when run,
+so the tasks that require it are cancelled and the rest of the pipe still runs.
+'''
+class Unavailable(object):
+    executor = 'thread'
+
+    '''
+    inputs:
+    cfg   (config.Configuration) Configuration instance of config file
+    error (str)                  Reason the task could not be imported
+    '''
+    def __init__(self, cfg, error):
+        self.cfg = cfg
+        self.error = error
+
+
+    def run(self):
+        raise Exception(self.error)
+
+
+'''
+Import only the tasks in the pipe and build pipeline. Tasks that cannot be imported are replaced by Unavailable
+stand-ins of the same name.
 
 inputs:
 cfg (config.Configuration) Configuration instance of config file
@@ -121,7 +329,10 @@ def build(cfg):
     pipe = []
 
     for t in tasks:
-        cl = inspect.getmembers(globals()[t], inspect.isclass) # cl is a tuple
-        pipe.append(cl[0][1](cfg)) # index 0 is class name and index 1 is object
+        try:
+            pipe.append(registry.load(t)(cfg))
+        except Exception as e:
+            print(f'{Fore.RED}{e}{Style.RESET_ALL}')
+            pipe.append(type(t, (Unavailable,), {})(cfg, str(e)))
 
     return pipe
\ No newline at end of file
@@ -0,0 +1,262 @@
+'''
+Compact index of the undirected move graph in compressed sparse row arrays
+
+Neighbors of node i are indices[indptr[i]:indptr[i+1]]. Names map to ids once at load time, and components,
+degrees, and the name search index are computed once, so queries never touch networkx.
+
+Author: Justin Chen
+'''
+import numpy as np
+import pandas as pd
+from collections import deque
+
+import artifacts
+from validate import resolve as rsv
+
+
+class GraphIndex(object):
+
+	'''
+	inputs:
+	adj   (dict)                   Adjacency lists of move names e.g. nx.to_dict_of_lists() written by GenerateGraph
+	moves (pd.DataFrame, optional) Move table for the type of each move
+	'''
+	def __init__(self, adj, moves=None):
+		self.names = list(adj.keys())
+		self.name2id = {n: i for i, n in enumerate(self.names)}
+
+		lists = [[self.name2id[m] for m in adj[n] if m in self.name2id] for n in self.names]
+		self.degree = np.fromiter((len(l) for l in lists), dtype=np.int64, count=len(lists))
+		self.indptr = np.zeros(len(self.names)+1, dtype=np.int64)
+		np.cumsum(self.degree, out=self.indptr[1:])
+		self.indices = np.fromiter((j for l in lists for j in l), dtype=np.int32, count=int(self.indptr[-1]))
+
+		self.types = {}
+		if moves is not None:
+			self.types = dict(zip(moves['name'].str.strip(), moves['type'].where(moves['type'].notnull(), None)))
+
+		self.component = self.components()
+		self.sizes = np.bincount(self.component) if len(self.names) else np.zeros(0, dtype=np.int64)
+		self.search_index = rsv.NameIndex(self.names)
+
+
+	'''
+	inputs:
+	i (int) Node id
+
+	outputs:
+	ids (np.ndarray) Ids of neighbors
+	'''
+	def adjacent(self, i):
+		return self.indices[self.indptr[i]:self.indptr[i+1]]
+
+
+	'''
+	Neighbors of many nodes at once without a loop over the nodes
+
+	inputs:
+	frontier (np.ndarray) Node ids
+
+	outputs:
+	ids (np.ndarray) Ids of neighbors of every node, with repeats
+	'''
+	def expand(self, frontier):
+		starts = self.indptr[frontier]
+		counts = self.indptr[frontier+1] - starts
+		offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+
+		return self.indices[offsets + np.arange(offsets.size)]
+
+
+	'''
+	Label connected components with breadth-first search over the arrays
+
+	outputs:
+	component (np.ndarray) Component id of each node, numbered by first node
+	'''
+	def components(self):
+		component = np.full(len(self.names), -1, dtype=np.int32)
+		c = 0
+
+		for start in range(len(self.names)):
+			if component[start] >= 0: continue
+
+			component[start] = c
+			frontier = np.array([start])
+
+			while len(frontier):
+				nbrs = self.expand(frontier)
+				nbrs = np.unique(nbrs[component[nbrs] < 0])
+				component[nbrs] = c
+				frontier = nbrs
+
+			c += 1
+
+		return component
+
+
+	'''
+	inputs:
+	name (str) Move name
+
+	outputs:
+	i (int) Node id
+
+	Raises KeyError if the move is not in the graph
+	'''
+	def id(self, name):
+		return self.name2id[name.strip()]
+
+
+	'''
+	inputs:
+	name (str) Move name
+
+	outputs:
+	neighbors (list) Names of adjacent moves
+	'''
+	def neighbors(self, name):
+		return [self.names[j] for j in self.adjacent(self.id(name))]
+
+
+	'''
+	Moves within k hops
+
+	inputs:
+	name (str)           Move name
+	k    (int, optional) Maximum number of hops
+
+	outputs:
+	hops (list) Names of moves at each distance from 1 to k
+	'''
+	def khop(self, name, k=2):
+		seen = np.zeros(len(self.names), dtype=bool)
+		frontier = np.array([self.id(name)])
+		seen[frontier] = True
+		hops = []
+
+		for _ in range(k):
+			if not len(frontier): break
+
+			nbrs = self.expand(frontier)
+			nbrs = np.unique(nbrs[~seen[nbrs]])
+			seen[nbrs] = True
+			hops.append([self.names[j] for j in nbrs])
+			frontier = nbrs
+
+		return hops
+
+
+	'''
+	Shortest path by breadth-first search
+
+	inputs:
+	src (str) Start move
+	tgt (str) End move
+
+	outputs:
+	path (list) Move names from src to tgt or None if they are in different components
+	'''
+	def path(self, src, tgt):
+		a, b = self.id(src), self.id(tgt)
+		if self.component[a] != self.component[b]: return None
+
+		parents = {a: None}
+		queue = deque([a])
+
+		while queue and b not in parents:
+			node = queue.popleft()
+
+			for nbr in self.adjacent(node).tolist():
+				if nbr not in parents:
+					parents[nbr] = node
+					queue.append(nbr)
+
+		path = []
+		node = b
+
+		while node is not None:
+			path.append(self.names[node])
+			node = parents[node]
+
+		path.reverse()
+		return path
+
+
+	'''
+	inputs:
+	name  (str)           Move name
+	limit (int, optional) Maximum number of members to return
+
+	outputs:
+	component (dict) Component id, size, and members
+	'''
+	def component_of(self, name, limit=1000):
+		c = int(self.component[self.id(name)])
+		members = np.flatnonzero(self.component == c)[:limit]
+
+		return {'component': c, 'size': int(self.sizes[c]), 'members': [self.names[j] for j in members]}
+
+
+	'''
+	inputs:
+	name (str) Move name
+
+	outputs:
+	move (dict) Name, type, degree, and component of a move
+	'''
+	def move(self, name):
+		i = self.id(name)
+		return {'name': self.names[i], 'type': self.types.get(self.names[i]), 'degree': int(self.degree[i]),
+				'component': int(self.component[i])}
+
+
+	'''
+	inputs:
+	query (str)           Possibly misspelled move name
+	k     (int, optional) Number of results
+
+	outputs:
+	results (list) Names and similarity scores
+	'''
+	def search(self, query, k=10):
+		return [{'name': n, 'score': s} for n, s in self.search_index.query(query, k)]
+
+
+	'''
+	outputs:
+	stats (dict) Counts of nodes, edges, and components, and degree statistics
+	'''
+	def stats(self, top=10):
+		degree = self.degree
+		hubs = np.argsort(-degree, kind='mergesort')[:top]
+
+		return {
+			'nodes': len(self.names),
+			'edges': int(degree.sum() // 2),
+			'components': len(self.sizes),
+			'largest_component': int(self.sizes.max()) if len(self.sizes) else 0,
+			'isolated': int((degree == 0).sum()),
+			'degree': {
+				'min': int(degree.min()) if len(degree) else 0,
+				'mean': float(degree.mean()) if len(degree) else 0.0,
+				'max': int(degree.max()) if len(degree) else 0
+			},
+			'hubs': [{'name': self.names[i], 'degree': int(degree[i])} for i in hubs]
+		}
+
+
+'''
+inputs:
+adj_path  (str)           Path to adjlist.json written by GenerateGraph
+move_path (str, optional) Path to move table
+
+outputs:
+index (GraphIndex) Graph index
+'''
+def load(adj_path, move_path=None):
+
+	adj = artifacts.read_json(adj_path)
+	moves = pd.read_csv(move_path, header=0, sep='\t') if move_path else None
+
+	return GraphIndex(adj, moves)
@@ -0,0 +1,202 @@
+'''
+Row-level diff between two versions of the move table, and delta updates of the move graph
+
+Rows are matched by id and compared by row hash, so a diff is linear in the size of the tables and only
+the changed rows are parsed for edges.
+
+Author: Justin Chen
+'''
+import os
+import pandas as pd
+
+import artifacts
+from preproc import relational as rel
+
+
+'''
+inputs:
+df (pd.DataFrame) Table of moves
+
+outputs:
+hashes (pd.Series) Hash of each row indexed by id
+'''
+def row_hashes(df):
+
+	return pd.util.hash_pandas_object(df.set_index('id'), index=False)
+
+
+'''
+inputs:
+df       (pd.DataFrame) Rows of the move table
+directed (bool)         If False, edges are stored with their endpoints sorted
+
+outputs:
+edges (set) Set of edge tuples listed by the rows
+'''
+def row_edges(df, directed=False):
+
+	edges = rel.dataframe_to_edges(df, delim=', ')
+	return set(edges) if directed else set(tuple(sorted(e)) for e in edges)
+
+
+'''
+Keep only edges that are not listed by any row of a table
+
+inputs:
+edges    (set)          Candidate edges
+df       (pd.DataFrame) Table of moves
+directed (bool)         True if directed edges, else undirected
+
+outputs:
+edges (set) Edges not listed by df
+'''
+def unsupported(edges, df, directed=False):
+
+	if not edges: return edges
+
+	# an edge can only be listed by the rows of its two endpoints
+	endpoints = set(n for e in edges for n in e)
+	listed = row_edges(df[df['name'].str.strip().isin(endpoints)], directed)
+
+	return edges - listed
+
+
+'''
+inputs:
+df (pd.DataFrame) Table of moves
+
+outputs:
+diffable (bool) True if rows can be matched by id
+'''
+def diffable(df):
+
+	return df['id'].is_unique
+
+
+'''
+Diff two versions of the move table
+
+inputs:
+old      (pd.DataFrame)   Previous table of moves
+new      (pd.DataFrame)   Current table of moves
+directed (bool, optional) True if the graph is directed, else undirected
+
+outputs:
+delta (dict) Ids of added, removed, and modified rows, and nodes and edges to add and remove
+'''
+def table_diff(old, new, directed=False):
+
+	old_hash, new_hash = row_hashes(old), row_hashes(new)
+
+	added = new_hash.index.difference(old_hash.index)
+	removed = old_hash.index.difference(new_hash.index)
+	common = new_hash.index.intersection(old_hash.index)
+	modified = common[old_hash[common].to_numpy() != new_hash[common].to_numpy()]
+
+	old_rows = old[old['id'].isin(removed.union(modified))]
+	new_rows = new[new['id'].isin(added.union(modified))]
+	old_edges = row_edges(old_rows, directed)
+	new_edges = row_edges(new_rows, directed)
+
+	# an edge changes only if no unchanged row still lists it
+	removed_edges = unsupported(old_edges - new_edges, new, directed)
+	added_edges = unsupported(new_edges - old_edges, old, directed)
+
+	new_names = set(new['name'].str.strip())
+	old_names = set(old['name'].str.strip())
+
+	return {
+		'added': [int(i) for i in added],
+		'removed': [int(i) for i in removed],
+		'modified': [int(i) for i in modified],
+		'added_nodes': sorted(set(new_rows['name'].str.strip()) - old_names),
+		'removed_nodes': sorted(set(old_rows['name'].str.strip()) - new_names),
+		'added_edges': sorted(list(e) for e in added_edges),
+		'removed_edges': sorted(list(e) for e in removed_edges)
+	}
+
+
+'''
+inputs:
+delta (dict) Delta from table_diff()
+
+outputs:
+empty (bool) True if the tables are identical
+'''
+def is_empty(delta):
+
+	return not (delta['added'] or delta['removed'] or delta['modified'])
+
+
+'''
+Apply a delta to a graph built with relational.dataframe_to_graph() from the previous table, in place
+
+inputs:
+G     (nx.Graph) Graph of the previous table
+delta (dict)     Delta from table_diff()
+
+outputs:
+G (nx.Graph) Graph of the current table
+'''
+def apply_delta(G, delta):
+
+	G.remove_edges_from(delta['removed_edges'])
+
+	# removed moves stay in the graph as long as another move still points to them
+	G.remove_nodes_from([n for n in delta['removed_nodes'] if n in G and G.degree(n) == 0])
+
+	G.add_nodes_from(delta['added_nodes'])
+	G.add_edges_from(delta['added_edges'])
+
+	return G
+
+
+'''
+Snapshot of the table an artifact was built from, stored next to the artifact
+
+inputs:
+artifact (str) Path to artifact
+
+outputs:
+path (str) Path to snapshot
+'''
+def snapshot_path(artifact):
+
+	return f'{artifact}.snapshot.tsv'
+
+
+'''
+inputs:
+artifact (str) Path to artifact
+
+outputs:
+df (pd.DataFrame) Table the artifact was built from or None if there is no snapshot or artifact
+'''
+def load_snapshot(artifact):
+
+	path = snapshot_path(artifact)
+
+	if not (os.path.isfile(path) and os.path.isfile(artifact)): return None
+	return pd.read_csv(path, header=0, sep='\t')
+
+
+'''
+inputs:
+artifact (str)          Path to artifact
+df       (pd.DataFrame) Table the artifact was built from
+'''
+def save_snapshot(artifact, df):
+
+	artifacts.write_table(df, snapshot_path(artifact))
+
+
+'''
+Invalidate the snapshot of an artifact that was changed by something other than a delta
+
+inputs:
+artifact (str) Path to artifact
+'''
+def drop_snapshot(artifact):
+
+	path = snapshot_path(artifact)
+	if os.path.isfile(path): os.remove(path)
@@ -0,0 +1,27 @@
+'''
+Parsing of the prereq and subseq edge columns
+
+Only needs pandas, so validation can parse edges without importing networkx and matplotlib through relational.
+
+Author: Justin Chen
+'''
+import pandas as pd
+
+
+'''
+Parse an edge column of value-separated strings into one row per edge. Rows without edges are dropped
+and the index of each edge is the index of the row it came from.
+
+inputs:
+series (pd.Series)     Edge column e.g. prereq or subseq
+delim  (str, optional) Delimiter for edge values
+
+outputs:
+edges (pd.Series) Series of edge targets indexed by row
+'''
+def explode_edges(series, delim=', '):
+
+	series = series.dropna()
+	if series.empty: return pd.Series([], dtype=object)
+
+	return series.astype(str).str.split(delim).explode()
@@ -0,0 +1,115 @@
+'''
+Canonical move type labels
+
+There are only a few hundred distinct type strings, so each distinct raw label is cleaned once and the
+raw -> canonical table is cached on disk between runs.
+
+Author: Justin Chen
+'''
+import os
+import inspect
+import hashlib
+import numpy as np
+import pandas as pd
+
+import artifacts
+
+
+'''
+Check for plural types and misc white spaces
+e.g. Parallel Bars versus Parallel Bar
+
+inputs:
+types (str) String of move types separated by "/"
+
+outputs:
+clean (str) Clean and sorted move type
+'''
+def clean_label(types):
+
+	clean = [t[:-1].rstrip() if t.endswith('s') else t.rstrip() for t in types.split('/') if len(t) > 0]
+	clean.sort()
+	return '/'.join(clean)
+
+
+# fingerprint of the cleaning rules. Caches written with other rules are discarded.
+VERSION = hashlib.sha1(inspect.getsource(clean_label).encode()).hexdigest()[:12]
+
+
+class LabelCache(object):
+
+	'''
+	inputs:
+	path (str, optional) Path to json cache of raw to canonical labels. Not persisted if None.
+	'''
+	def __init__(self, path=None):
+		self.path = path
+		self.table = {}
+		self.dirty = False
+		self.hits = 0
+		self.misses = 0
+
+		if path and os.path.isfile(path):
+			cached = artifacts.read_json(path)
+			if isinstance(cached, dict) and cached.get('version') == VERSION: self.table = cached['labels']
+
+
+	'''
+	inputs:
+	raw (str) Raw label
+
+	outputs:
+	clean (str) Canonical label
+	'''
+	def get(self, raw):
+		if raw in self.table:
+			self.hits += 1
+		else:
+			self.table[raw] = clean_label(raw)
+			self.dirty = True
+			self.misses += 1
+
+		return self.table[raw]
+
+
+	'''
+	Canonicalize a column of raw labels. Each distinct label is looked up once and mapped back onto the rows.
+
+	inputs:
+	labels (pd.Series) Raw labels e.g. the type column of the move table
+
+	outputs:
+	canonical (pd.Series) Canonical labels. Missing labels stay missing.
+	'''
+	def canonical(self, labels):
+		codes, uniques = pd.factorize(labels)
+		clean = []
+
+		for raw in uniques:
+			if not isinstance(raw, str):
+				clean.append(np.nan)
+				continue
+
+			clean.append(self.get(raw))
+
+		clean = np.array(clean + [np.nan], dtype=object)
+		return pd.Series(clean[codes], index=labels.index, name=labels.name)
+
+
+	'''
+	outputs:
+	stats (dict) Number of distinct labels found in and missing from the cache
+	'''
+	def stats(self):
+		return {'hits': self.hits, 'misses': self.misses}
+
+
+	'''
+	Write the cache if new labels were cleaned
+	'''
+	def save(self):
+		if not self.path or not self.dirty: return
+
+		artifacts.write_json(self.path, {'version': VERSION, 'labels': self.table})
+
+		self.dirty = False
@@ -0,0 +1,198 @@
+'''
+Reachability index over the directed move graph for constant time prerequisite queries
+
+The graph is condensed into a DAG of strongly connected components. Every component stores the set
+of components reachable from it, and the set it is reachable from, as an integer bitset computed once
+in topological order.
+
+Author: Justin Chen
+'''
+import networkx as nx
+from collections import deque
+
+import artifacts
+
+
+'''
+Build serializable reachability index of a directed graph
+
+inputs:
+G (nx.DiGraph) Directed move graph e.g. relational.dataframe_to_graph(df, directed=True)
+
+outputs:
+index (dict) Dictionary of nodes, component of each node, topological order of components,
+             successor lists, and hex encoded descendant and ancestor bitsets of each component
+'''
+def build_index(G):
+
+	nodes = list(G.nodes())
+	node2id = {n: i for i, n in enumerate(nodes)}
+
+	C = nx.condensation(G)
+	mapping = C.graph['mapping']
+	topo = list(nx.topological_sort(C))
+
+	# components in reverse topological order have all of their successors computed already
+	desc = [0] * len(C)
+	for c in reversed(topo):
+		bits = 1 << c
+		for s in C.successors(c): bits |= desc[s]
+		desc[c] = bits
+
+	anc = [0] * len(C)
+	for c in topo:
+		bits = 1 << c
+		for p in C.predecessors(c): bits |= anc[p]
+		anc[c] = bits
+
+	return {
+		'nodes': nodes,
+		'component': [mapping[n] for n in nodes],
+		'topo': topo,
+		'succ': [[node2id[s] for s in G.successors(n)] for n in nodes],
+		'descendants': [format(b, 'x') for b in desc],
+		'ancestors': [format(b, 'x') for b in anc]
+	}
+
+
+class ReachabilityIndex(object):
+
+	'''
+	inputs:
+	index (dict) Index generated by build_index() or loaded from json
+	'''
+	def __init__(self, index):
+		self.nodes = index['nodes']
+		self.node2id = {n: i for i, n in enumerate(self.nodes)}
+		self.component = index['component']
+		self.succ = index['succ']
+		self.descendant_bits = [int(b, 16) for b in index['descendants']]
+		self.ancestor_bits = [int(b, 16) for b in index['ancestors']]
+
+		self.rank = [0] * len(index['topo'])
+		for i, c in enumerate(index['topo']): self.rank[c] = i
+
+		self.members = [[] for _ in index['topo']]
+		for i, c in enumerate(self.component): self.members[c].append(i)
+
+
+	'''
+	inputs:
+	src (str) Move name
+	tgt (str) Move name
+
+	outputs:
+	reachable (bool) True if tgt can be reached from src following prereq to subseq edges
+	'''
+	def reachable(self, src, tgt):
+		a = self.component[self.node2id[src]]
+		b = self.component[self.node2id[tgt]]
+
+		if self.rank[a] > self.rank[b]: return False
+		return bool(self.descendant_bits[a] >> b & 1)
+
+
+	'''
+	Decode a component bitset into move names
+
+	inputs:
+	bits (int) Bitset of components
+
+	outputs:
+	moves (list) Move names in the components
+	'''
+	def decode(self, bits):
+		moves = []
+		c = 0
+
+		while bits:
+			if bits & 1: moves.extend(self.nodes[i] for i in self.members[c])
+			bits >>= 1
+			c += 1
+
+		return moves
+
+
+	'''
+	inputs:
+	move (str) Move name
+
+	outputs:
+	moves (list) All moves reachable from move, excluding itself
+	'''
+	def descendants(self, move):
+		i = self.node2id[move]
+		return [m for m in self.decode(self.descendant_bits[self.component[i]]) if m != move]
+
+
+	'''
+	inputs:
+	move (str) Move name
+
+	outputs:
+	moves (list) All moves that move can be reached from, excluding itself
+	'''
+	def ancestors(self, move):
+		i = self.node2id[move]
+		return [m for m in self.decode(self.ancestor_bits[self.component[i]]) if m != move]
+
+
+	'''
+	inputs:
+	move (str) Move name
+
+	outputs:
+	moves (list) Moves in the same strongly connected component i.e. moves in a prereq cycle with move
+	'''
+	def cycle(self, move):
+		return [self.nodes[i] for i in self.members[self.component[self.node2id[move]]]]
+
+
+	'''
+	Shortest progression from src to tgt. Breadth-first search only expands moves that can still reach tgt.
+
+	inputs:
+	src (str) Start move
+	tgt (str) End move
+
+	outputs:
+	path (list) List of move names or None if tgt is not reachable
+	'''
+	def shortest_path(self, src, tgt):
+		if not self.reachable(src, tgt): return None
+
+		a, b = self.node2id[src], self.node2id[tgt]
+		target_bit = self.component[b]
+		parents = {a: None}
+		queue = deque([a])
+
+		while queue:
+			node = queue.popleft()
+			if node == b: break
+
+			for nbr in self.succ[node]:
+				if nbr not in parents and self.descendant_bits[self.component[nbr]] >> target_bit & 1:
+					parents[nbr] = node
+					queue.append(nbr)
+
+		path = []
+		node = b
+
+		while node is not None:
+			path.append(self.nodes[node])
+			node = parents[node]
+
+		path.reverse()
+		return path
+
+
+'''
+inputs:
+path (str) Path to index json written by the PrereqIndex task
+
+outputs:
+index (ReachabilityIndex) Reachability index
+'''
+def load(path):
+
+	return ReachabilityIndex(artifacts.read_json(path))
@@ -15,6 +15,9 @@ from matplotlib import pylab
 from collections import Counter, defaultdict
 from itertools import chain, combinations
 
+from preproc import traversal as trv
+from preproc.edges import explode_edges
+
 
 '''
 Creates map for nodes and corresponding labels from a pandas DataFrame
@@ -117,12 +120,13 @@ Check that graph was correctly created from the dataframe by iterating over ever
 Then get the edges and compare to the edges in the dataframe.
 
 inputs:
-G  (nx.Graph)     Networkx graph of given dataframe
-df (pd.DataFrame) Dataframe of entities and relations
+G     (nx.Graph)           Networkx graph of given dataframe
+df    (pd.DataFrame)       Dataframe of entities and relations
+moves (iterable, optional) Only compare the edges of these moves e.g. the moves changed by a delta. All moves if None.
 '''
-def validate_graph(G, df):
+def validate_graph(G, df, moves=None):
 
-	moves = list(df['name'])
+	moves = list(df['name']) if moves is None else list(moves)
 
 	for m in moves:
 		assert G.has_node(m)
@@ -142,6 +146,32 @@ def validate_graph(G, df):
 	assert all([G.has_edge(*i) for i in count_edges(df, True)[-1]])
 
 
+'''
+Remove moves from the table and from every prereq and subseq edge that points to them. Edges are parsed once,
+filtered against the whole set of moves in one pass, and joined back into strings.
+
+inputs:
+df    (pd.DataFrame)   DataFrame of moves
+names (iterable)       Names of moves to remove
+edges (tuple)          Edge columns
+delim (str, optional)  Delimiter for edge values
+
+outputs:
+df (pd.DataFrame) DataFrame without the moves
+'''
+def remove_moves(df, names, edges=('prereq', 'subseq'), delim=', '):
+
+	names = set(names)
+	df = df[~df['name'].isin(names)].copy()
+
+	for col in edges:
+		exploded = explode_edges(df[col], delim)
+		exploded = exploded[~exploded.isin(names)]
+		df[col] = exploded.groupby(level=0).agg(delim.join).reindex(df.index)
+
+	return df
+
+
 '''
 Create undirected networkx Graph from pandas DataFrame
 
@@ -226,6 +256,9 @@ def set_relation(G, edge, relation=''):
 	else:
 		G.edges[edge][key].append(relation)
 
+	# types of an existing edge may change without changing the number of edges
+	G.graph.pop('traversal', None)
+
 
 '''
 Create single data src root node. Should only be called once for each table.
@@ -327,6 +360,102 @@ def connect_row_to_col(G, df):
 			set_relation(G, e, col)
 
 
+'''
+Get relation names of an edge. Graphs built with table_to_graph() store relations as small int
+codes into G.graph['relations'] instead of lists of strings.
+
+inputs:
+G     (nx.Graph) Networkx graph
+attrs (dict)     Edge attributes
+
+outputs:
+relations (list) Relation names of the edge
+'''
+def edge_relations(G, attrs):
+
+	types = attrs.get('types', ())
+	relations = G.graph.get('relations')
+
+	return [relations[t] for t in types] if relations else types
+
+
+'''
+Convert a table into typed edge arrays in a single pass. Each cell becomes one
+(row id, value id, relation code) triple, where value ids index into the interned cell values
+and relation codes index into the columns.
+
+inputs:
+df (pd.DataFrame) Source table to be converted into graph
+
+outputs:
+rows      (ndarray) Row id of each cell
+cells     (ndarray) Interned value id of each cell
+relations (ndarray) Relation code i.e. column index of each cell
+values    (ndarray) Interned cell values as strings
+missing   (ndarray) True for cells without a value
+'''
+def table_to_edges(df):
+
+	num_rows, num_cols = df.shape
+
+	# same string conversion as connect_row_to_col() i.e. NaN becomes 'nan'
+	strs = np.stack([df[col].to_numpy().astype(str) for col in df.columns], axis=1).ravel()
+	missing = np.stack([df[col].isna().to_numpy() for col in df.columns], axis=1).ravel()
+	missing |= np.isin(strs, ['', 'nan'])
+
+	cells, values = pd.factorize(strs)
+	rows = np.repeat(np.arange(num_rows), num_cols)
+	relations = np.tile(np.arange(num_cols), num_rows)
+
+	return rows, cells, relations, np.asarray(values, dtype=object), missing
+
+
+'''
+Bulk version of create_src_node(), create_row_nodes(), create_col_nodes() and connect_row_to_col().
+Edge types are stored as tuples of relation codes into G.graph['relations'].
+
+inputs:
+df     (pd.DataFrame) Source table to be converted into graph
+source (str) 		  Name of table
+
+outputs:
+G (nx.Graph) Graph of the table
+'''
+def table_to_graph(df, source):
+
+	columns = [str(col) for col in df.columns]
+	rows, cells, relations, values, missing = table_to_edges(df)
+
+	G = nx.Graph(relations=[column_to_relation(col) for col in columns])
+	G.add_node(source)
+
+	# named by index like connect_row_to_col() so chunks of one table do not collide
+	row_names = [f'row_{i}' for i in df.index]
+	edges = [(source, row, {}) for row in row_names]
+
+	# column nodes only connect to cells that exist, and to each value once
+	pairs = np.unique(np.stack([relations[~missing], cells[~missing]], axis=1), axis=0)
+	edges.extend((columns[r], values[c], {'types': (int(r),)}) for r, c in pairs)
+
+	# merge relations of a row containing the same value in several columns
+	keys = pd.Series(rows * len(values) + cells)
+	dup = keys.duplicated(keep=False).to_numpy()
+	edges.extend((row_names[r], values[c], {'types': (int(t),)})
+		for r, c, t in zip(rows[~dup], cells[~dup], relations[~dup]))
+
+	merged = defaultdict(list)
+
+	for r, c, t in zip(rows[dup], cells[dup], relations[dup]):
+		merged[(r, c)].append(int(t))
+
+	edges.extend((row_names[r], values[c], {'types': tuple(t)}) for (r, c), t in merged.items())
+
+	G.add_nodes_from((columns[i], {'column': i, 'dtype': df[col].dtypes}) for i, col in enumerate(df.columns))
+	G.add_edges_from(edges)
+
+	return G
+
+
 '''
 Check if an entire path exists
 
@@ -343,52 +472,45 @@ def accepts(G, path):
 
 
 '''
-TODO:
-1. Repeats intermediate values e.g [row, cell, cell, cell, ..., col]
-
-Breadth-first find paths from source to target that strictly have relation using standard breadth-first search
+Traversal of G cached in G.graph, so repeated searches do not rebuild its adjacency lists. The cache is
+rebuilt when the number of nodes or edges changes, and set_relation() drops it.
 
 inputs:
-G        (nx.Graph) Graph to modify
-source   (str) 		Start node of path
-target   (str) 		End node of path
-relation (str) 		Type of edges to traverse
+G (nx.Graph) Graph to traverse
 
 outputs:
-path (list) List of nodes as strings or None if no path exists
+traversal (trv.Traversal) Traversal of G
 '''
-def bfs(G, source, target, relation):
+def traversal(G):
 
-	queue = [source]
-	path = []
-	visited = set()
+	key = (G.number_of_nodes(), G.number_of_edges())
+	cached = G.graph.get('traversal')
 
-	while queue:
-		node = queue.pop(0)
+	if cached is None or cached[0] != key:
+		cached = G.graph['traversal'] = (key, trv.Traversal(G))
 
-		if node not in visited:
-			visited.add(node)
+	return cached[1]
 
-		for e in G.edges(node):
-			attrs = G.get_edge_data(*e)
 
-			if attrs and relation in attrs['types']:
-				if e[1] not in visited:
-					path.append(node)
+'''
+Breadth-first find the shortest path from source to target that strictly has relation
 
-				if e[1] == target:
-					path.append(e[1])
-					break
+inputs:
+G        (nx.Graph) Graph to modify
+source   (str) 		Start node of path
+target   (str) 		End node of path
+relation (str) 		Type of edges to traverse
 
-				if e[1] not in visited:
-					queue.append(e[1])
+outputs:
+path (list) List of nodes as strings or empty list if no path exists
+'''
+def bfs(G, source, target, relation):
 
-	return path
+	return traversal(G).bfs(source, target, relation) or []
 
 
 '''
-Depth-first finds paths from source to target that strictly have relation using standard depth-first search
-Solution based on: https://stackoverflow.com/a/39376201/3158028 by XueYu
+Depth-first finds paths from source to target that strictly have relation
 
 inputs:
 G        (nx.Graph) Graph to modify
@@ -401,23 +523,46 @@ path (list) List of nodes as strings or None if no path exists
 '''
 def dfs(G, source, target, relation):
 
-	stack = [(source, [source])]
-	visited = set()
+	return traversal(G).dfs(source, target, relation)
 
-	while stack:
-		node, path = stack.pop()
 
-		if node not in visited:
+'''
+Index the cell neighbours of each row node by relation. Exploits the fixed two-hop structure
+row -> cell -> column, so each row only looks at its own edges instead of searching the graph.
+A cell is only indexed if it is also connected to the column with the same relation.
 
-			if node == target: return path
-			visited.add(node)
+inputs:
+G            (nx.Graph) Networkx graph
+row_nodes    (list)     Row node names
+column_nodes (list)     Column node names
 
-			for e in G.edges(node):
-				attrs = G.get_edge_data(*e)
+outputs:
+index (dict) Dictionary mapping row node to a dictionary of relation to cell value
+'''
+def row_cell_index(G, row_nodes, column_nodes):
+
+	rel2col = {column_to_relation(col): col for col in column_nodes}
+
+	# cell -> column relations as sets, so the second hop is a constant time lookup
+	cell_relations = {}
+
+	for col in column_nodes:
+		for cell, attrs in G.adj[col].items():
+			cell_relations.setdefault(cell, set()).update(edge_relations(G, attrs))
 
-				if attrs and relation in attrs['types']:
-					if e[1] not in visited:
-						stack.append((e[1], path+[e[1]]))
+	index = {}
+
+	for row in row_nodes:
+		cells = {}
+
+		for cell, attrs in G.adj[row].items():
+			for relation in edge_relations(G, attrs):
+				if relation in rel2col and relation in cell_relations.get(cell, ()):
+					cells[relation] = cell
+
+		index[row] = cells
+
+	return index
 
 
 '''
@@ -432,7 +577,7 @@ df (pd.DataFrame) DataFrame originally used to generated given graph
 def graph_to_table(G):
 
 	# ensure that edges are symmetric
-	G = G.to_undirected()
+	if G.is_directed(): G = G.to_undirected()
 
 	column_nodes = []
 	row_nodes = []
@@ -443,14 +588,14 @@ def graph_to_table(G):
 		if isinstance(n, str) and n.startswith('row_'):
 			row_nodes.append(n)
 
-	data = defaultdict(list)
+	relations = [column_to_relation(col) for col in column_nodes]
+	index = row_cell_index(G, row_nodes, column_nodes)
+	data = {}
 
+	# always 2-hop from row node to column node i.e. [row, cell, col]
 	for i, row in enumerate(row_nodes):
-		for  col in column_nodes:
-			path = dfs(G, source=row, target=col, relation=column_to_relation(col))
-
-			# always 2-hop from row node to column node i.e. [row, cell, col]
-			data[i].append(np.nan if not path else path[1])
+		cells = index[row]
+		data[i] = [cells.get(r, np.nan) for r in relations]
 
 	recovered = pd.DataFrame.from_dict(data, orient='index', columns=column_nodes)
 
@@ -468,19 +613,21 @@ def graph_to_table(G):
 Get files in directory
 
 inputs:
-directory    (str)  Directory containing files
-sort_by_size (bool) If True, sort the files in the directory by their size
-last_index   (int)  Only return the files up until this index
+directory     (str)   Directory containing files
+sort_by_size  (bool)  If True, sort the files in the directory by their size
+last_index    (int)   Only return the files up until this index
+largest_first (bool)  If True, sort the largest files first
+extensions    (tuple) File extensions to include
 
 outputs:
 files (list) List of names
 '''
-def get_files(directory, sort_by_size=True, last_index=None):
+def get_files(directory, sort_by_size=True, last_index=None, largest_first=False, extensions=('.xlsx',)):
 
-	files = [os.path.join(directory, f) for f in os.listdir(directory) if f.endswith('.xlsx')]
-	sizes = [(path.split('/')[-1], os.stat(path).st_size) for path in files]
-	sizes = sorted(sizes, key=lambda x:x[1])
-	files = list(zip(*sizes))[0]
+	files = [os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(extensions)]
+	sizes = [(os.path.basename(path), os.stat(path).st_size) for path in files]
+	if sort_by_size: sizes = sorted(sizes, key=lambda x:x[1], reverse=largest_first)
+	files = [name for name, _ in sizes]
 	return files[:last_index]
 
 
@@ -0,0 +1,89 @@
+'''
+In-process cache of tables and the move graph
+
+Tables are cached by path along with their modification time and size, so a long running process such as
+main.py --watch only reads a table again after it changes. When the move table changes, the cached move graph is
+updated with the row-level delta instead of being rebuilt. Callers get copies and may modify them.
+
+Author: Justin Chen
+'''
+import os
+import pandas as pd
+
+TABLES = {}
+GRAPHS = {}
+
+
+'''
+inputs:
+path (str) Path to file
+
+outputs:
+stamp (tuple) Modification time in nanoseconds and size in bytes
+'''
+def stamp(path):
+
+	st = os.stat(path)
+	return (st.st_mtime_ns, st.st_size)
+
+
+'''
+Read a tsv, from the cache if it did not change since it was last read
+
+inputs:
+path (str) Path to tsv
+
+outputs:
+df (pd.DataFrame) Copy of table
+'''
+def read(path):
+
+	key = stamp(path)
+	cached = TABLES.get(path)
+
+	if cached is None or cached[0] != key:
+		cached = (key, pd.read_csv(path, header=0, sep='\t'))
+		TABLES[path] = cached
+
+	return cached[1].copy()
+
+
+'''
+Move graph of a table as built by relational.dataframe_to_graph()
+
+inputs:
+path     (str)            Path to move table
+directed (bool, optional) True for a directed graph
+
+outputs:
+G (nx.Graph) Copy of graph
+'''
+def graph(path, directed=False):
+
+	# imported here so tasks that only read tables do not load networkx and matplotlib
+	from preproc import relational as rel
+	from preproc import diff
+
+	moves = read(path)
+	key = stamp(path)
+	cached = GRAPHS.get((path, directed))
+
+	if cached is not None and cached[0] == key: return cached[2].copy()
+
+	if cached is None or not (diff.diffable(cached[1]) and diff.diffable(moves)):
+		G = rel.dataframe_to_graph(moves, directed=directed)
+	else:
+		G = diff.apply_delta(cached[2], diff.table_diff(cached[1], moves, directed))
+
+	GRAPHS[(path, directed)] = (key, moves, G)
+
+	return G.copy()
+
+
+'''
+Drop all cached tables and graphs
+'''
+def clear():
+
+	TABLES.clear()
+	GRAPHS.clear()
@@ -0,0 +1,182 @@
+'''
+Relation-typed graph traversal over precomputed adjacency lists
+
+Author: Justin Chen
+'''
+from collections import deque, defaultdict
+
+
+class Traversal(object):
+
+	'''
+	Precompute adjacency lists for every relation once, so traversals neither look up edge data nor
+	scan lists of edge types per edge. Edges without types are only traversed when relation is None.
+
+	inputs:
+	G       (nx.Graph)       Graph to traverse
+	reverse (bool, optional) If True and G is directed, traverse edges backwards e.g. from a move to its prereqs
+	'''
+	def __init__(self, G, reverse=False):
+		adj = G.pred if reverse and G.is_directed() else G.adj
+		codes = G.graph.get('relations')
+
+		self.adj = {None: {n: list(nbrs) for n, nbrs in adj.items()}}
+
+		for u, nbrs in adj.items():
+			for v, attrs in nbrs.items():
+				for t in attrs.get('types', ()):
+					relation = codes[t] if codes else t
+					self.adj.setdefault(relation, defaultdict(list))[u].append(v)
+
+
+	'''
+	inputs:
+	relation (str, optional) Type of edges to traverse. All edges if None.
+
+	outputs:
+	adj (dict) Dictionary mapping node to list of neighbors
+	'''
+	def neighbors(self, relation=None):
+		return self.adj.get(relation, {})
+
+
+	'''
+	Reconstruct a path from parent pointers
+
+	inputs:
+	parents (dict) Dictionary mapping node to the node it was reached from. Sources map to None.
+	target  (str)  End node of path
+
+	outputs:
+	path (list) List of nodes from a source to target or None if target was not reached
+	'''
+	def path(self, parents, target):
+		if target not in parents: return None
+
+		path = []
+		node = target
+
+		while node is not None:
+			path.append(node)
+			node = parents[node]
+
+		path.reverse()
+		return path
+
+
+	'''
+	Breadth-first search from one or more sources
+
+	inputs:
+	sources  (iterable)      Start nodes
+	relation (str, optional) Type of edges to traverse. All edges if None.
+	target   (str, optional) Stop as soon as this node is reached
+
+	outputs:
+	parents (dict) Dictionary mapping each reached node to its parent on a shortest path
+	'''
+	def bfs_parents(self, sources, relation=None, target=None):
+		adj = self.neighbors(relation)
+		parents = {s: None for s in sources}
+		queue = deque(parents)
+
+		if target in parents: return parents
+
+		while queue:
+			node = queue.popleft()
+
+			for nbr in adj.get(node, ()):
+				if nbr not in parents:
+					parents[nbr] = node
+					if nbr == target: return parents
+					queue.append(nbr)
+
+		return parents
+
+
+	'''
+	Shortest path from source to target that strictly has relation
+
+	inputs:
+	source   (str)           Start node of path
+	target   (str)           End node of path
+	relation (str, optional) Type of edges to traverse. All edges if None.
+
+	outputs:
+	path (list) List of nodes or None if no path exists
+	'''
+	def bfs(self, source, target, relation=None):
+		return self.path(self.bfs_parents([source], relation, target), target)
+
+
+	'''
+	Shortest path to target from the closest of several sources
+
+	inputs:
+	sources  (iterable)      Start nodes
+	target   (str)           End node of path
+	relation (str, optional) Type of edges to traverse. All edges if None.
+
+	outputs:
+	path (list) List of nodes or None if no path exists
+	'''
+	def multi_source_bfs(self, sources, target, relation=None):
+		return self.path(self.bfs_parents(sources, relation, target), target)
+
+
+	'''
+	Shortest paths from sources to every reachable node
+
+	inputs:
+	sources  (iterable)      Start nodes
+	relation (str, optional) Type of edges to traverse. All edges if None.
+
+	outputs:
+	paths (dict) Dictionary mapping each reachable node to its shortest path
+	'''
+	def all_targets(self, sources, relation=None):
+		parents = self.bfs_parents(sources, relation)
+		return {n: self.path(parents, n) for n in parents}
+
+
+	'''
+	inputs:
+	sources  (iterable)      Start nodes
+	relation (str, optional) Type of edges to traverse. All edges if None.
+
+	outputs:
+	reachable (set) Nodes reachable from sources, including the sources
+	'''
+	def reachable(self, sources, relation=None):
+		return set(self.bfs_parents(sources, relation))
+
+
+	'''
+	Depth-first path from source to target that strictly has relation. The path is not necessarily
+	the shortest.
+
+	inputs:
+	source   (str)           Start node of path
+	target   (str)           End node of path
+	relation (str, optional) Type of edges to traverse. All edges if None.
+
+	outputs:
+	path (list) List of nodes or None if no path exists
+	'''
+	def dfs(self, source, target, relation=None):
+		adj = self.neighbors(relation)
+		parents = {}
+		stack = [(source, None)]
+
+		while stack:
+			node, parent = stack.pop()
+			if node in parents: continue
+
+			parents[node] = parent
+			if node == target: return self.path(parents, target)
+
+			for nbr in adj.get(node, ()):
+				if nbr not in parents:
+					stack.append((nbr, node))
+
+		return None
@@ -101,18 +101,21 @@ class Video(object):
 
 
     inputs:
-    src    (str)            Source directory containing videos
-    dst    (str)            Save directory
-    height (int)            Crop height
-    width  (int)            Crop width
-    save   (bool, optional) True to write image files (default: True).
+    src      (str)                Source directory containing videos
+    dst      (str)                Save directory
+    height   (int)                Crop height
+    width    (int)                Crop width
+    save     (bool, optional)     True to write image files (default: True).
+    cpus     (int, optional)      Number of processes at once (default: number of CPUs).
+    files    (list, optional)     File names to process (default: all files in src).
+    callback (function, optional) Called with each finished block of file names and the results so far.
 
     outputs:
     res (dict) Dictionary with file name as key and serialized thumbnail as value
     '''
-    def extract_thumbnails(self, src, dst, height, width, save=True):
-        files = [i for i in os.listdir(src)]
-        cpus = cpu_count()
+    def extract_thumbnails(self, src, dst, height, width, save=True, cpus=None, files=None, callback=None):
+        files = [i for i in os.listdir(src)] if files is None else files
+        cpus = cpus or cpu_count()
         mgmt = Manager()
         res = mgmt.dict()
 
@@ -126,4 +129,6 @@ class Video(object):
             for p in procs: p.start()
             for p in procs: p.join()
 
+            if callback: callback(block, res)
+
         return res
\ No newline at end of file
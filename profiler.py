@@ -0,0 +1,235 @@
+'''
+Per-task profiling
+
+Each task's run() is wrapped with cProfile and tracemalloc. Every task writes its own files, so profiling
+also works inside the child processes of parallel mode:
+
+logs/profile/<task>.prof   cProfile stats for snakeviz, pstats, etc.
+logs/profile/<task>.folded Collapsed stacks in microseconds for flamegraph.pl or speedscope
+logs/profile/<task>.json   Time, CPU time, peak memory, and top allocation sites
+logs/profile.json          Summary of all tasks
+
+Tasks with executor = 'thread' share the main process in parallel mode, so tracemalloc is started by the first
+profiled task and stopped by the last one, and their memory numbers cover every thread of the process. Their
+summaries are marked with thread and leave out peak_rss.
+'''
+import os
+import sys
+import time
+import pstats
+import shutil
+import cProfile
+import threading
+import tracemalloc
+
+import artifacts
+from utils import make_dir
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PROFILE_DIR = os.path.join('logs', 'profile')
+
+# number of running profiled tasks that need tracemalloc, and whether this module started it
+TRACING = {'users': 0, 'started': False}
+TRACING_LOCK = threading.Lock()
+
+
+'''
+Start tracemalloc unless it is already tracing for another task
+'''
+def start_tracing():
+    with TRACING_LOCK:
+        if TRACING['users'] == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            TRACING['started'] = True
+
+        TRACING['users'] += 1
+
+
+'''
+Stop tracemalloc once the last profiled task is done, unless it was started outside this module
+'''
+def stop_tracing():
+    with TRACING_LOCK:
+        TRACING['users'] -= 1
+
+        if TRACING['users'] == 0 and TRACING['started']:
+            tracemalloc.stop()
+            TRACING['started'] = False
+
+
+'''
+outputs:
+thread (bool) True if running in a thread other than the main thread, which shares the process with other tasks
+'''
+def in_thread():
+    return threading.current_thread() is not threading.main_thread()
+
+
+'''
+outputs:
+rss (int) Peak resident set size of this process in bytes or None if unavailable
+'''
+def peak_rss():
+    if resource is None: return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+'''
+Remove profiles of previous runs
+
+inputs:
+dst (str, optional) Directory of profile files
+'''
+def clear(dst=PROFILE_DIR):
+    if os.path.isdir(dst): shutil.rmtree(dst)
+
+
+'''
+Label of a function in pstats
+
+inputs:
+func (tuple) (file, line, name)
+
+outputs:
+label (str) Frame label without semicolons
+'''
+def frame(func):
+    file, line, name = func
+    label = name if file == '~' else f'{name} ({os.path.basename(file)}:{line})'
+    return label.replace(';', ',')
+
+
+'''
+Collapse cProfile stats into stacks. cProfile only records caller and callee pairs, so the time of a
+function is split across its callers in proportion to the time spent under each caller.
+
+inputs:
+stats     (pstats.Stats) Profile stats
+max_depth (int, optional) Maximum stack depth
+
+outputs:
+stacks (dict) Dictionary mapping semicolon separated stack to microseconds
+'''
+def collapse(stats, max_depth=64):
+    children = {}
+    roots = []
+
+    for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+        if not callers: roots.append(func)
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((func, edge[3]))
+
+    stacks = {}
+
+    def walk(func, path, scale):
+        path = path + [frame(func)]
+        tt, ct = stats.stats[func][2], stats.stats[func][3]
+
+        us = int(tt * scale * 1e6)
+        if us > 0:
+            key = ';'.join(path)
+            stacks[key] = stacks.get(key, 0) + us
+
+        if len(path) >= max_depth: return
+
+        for child, edge_ct in children.get(func, []):
+            child_ct = stats.stats[child][3]
+
+            # skip recursion and paths under a microsecond, which also bounds the number of paths
+            if frame(child) in path or child_ct <= 0 or edge_ct * scale < 1e-6: continue
+            walk(child, path, scale * edge_ct / child_ct)
+
+    for func in roots:
+        walk(func, [], 1.0)
+
+    return stacks
+
+
+'''
+Run a task under cProfile and tracemalloc and write its profile
+
+inputs:
+task (object)        Task with a run()
+dst  (str, optional) Directory for profile files
+top  (int, optional) Number of allocation sites to keep
+
+outputs:
+summary (dict) Time, CPU time, peak memory, and top allocation sites
+'''
+def profile(task, dst=PROFILE_DIR, top=10):
+    name = type(task).__name__
+    thread = in_thread()
+    clock = time.thread_time if thread else time.process_time
+    make_dir(dst)
+
+    profiler = cProfile.Profile()
+    start_tracing()
+    start, cpu = time.perf_counter(), clock()
+    error = None
+
+    profiler.enable()
+    try:
+        task.run()
+    except Exception as e:
+        error = e
+    finally:
+        profiler.disable()
+
+    runtime, cpu = time.perf_counter() - start, clock() - cpu
+
+    try:
+        _, peak = tracemalloc.get_traced_memory()
+        sites = tracemalloc.take_snapshot().statistics('lineno')[:top]
+    finally:
+        stop_tracing()
+
+    profiler.dump_stats(os.path.join(dst, f'{name}.prof'))
+
+    stacks = collapse(pstats.Stats(profiler))
+    artifacts.write_lines(os.path.join(dst, f'{name}.folded'), (f'{stack} {us}' for stack, us in sorted(stacks.items())))
+
+    summary = {
+        'task': name,
+        'pid': os.getpid(),
+        'time': runtime,
+        'cpu_time': cpu,
+        'peak_traced': peak,
+        'peak_rss': None if thread else peak_rss(),
+        'thread': thread,
+        'failed': error is not None,
+        'allocations': [{'site': str(s.traceback[0]), 'size': s.size, 'count': s.count} for s in sites]
+    }
+
+    artifacts.write_json(os.path.join(dst, f'{name}.json'), summary)
+
+    if error is not None: raise error
+
+    return summary
+
+
+'''
+Combine the per-task summaries written by profile(), including those of child processes
+
+inputs:
+dst (str, optional) Directory of profile files
+
+outputs:
+summary (dict) Dictionary mapping task to its summary
+'''
+def summarize(dst=PROFILE_DIR):
+    summary = {}
+    if not os.path.isdir(dst): return summary
+
+    for f in sorted(os.listdir(dst)):
+        if not f.endswith('.json'): continue
+
+        s = artifacts.read_json(os.path.join(dst, f))
+        summary[s['task']] = s
+
+    return summary
@@ -0,0 +1,105 @@
+'''
+CPU and memory budget shared by the tasks of a run
+
+Tasks may declare their demand with class attributes, otherwise it is learned from the run history:
+
+cpus   (int) Number of CPUs the task keeps busy, including its own worker pools
+memory (int) Peak memory of the task in MB
+
+In parallel mode a task only starts once its demand fits in what is left of the budget, and a task larger than the
+whole budget runs alone. Tasks with inner process pools size them with cpus(task), which is the number of CPUs the
+task was granted rather than the number of CPUs of the machine.
+'''
+import os
+import multiprocessing as mp
+
+
+'''
+outputs:
+memory (int) Physical memory of the machine in MB or None if unavailable
+'''
+def total_memory():
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1 << 20)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+'''
+Number of CPUs a task may use for its inner worker pools
+
+inputs:
+task (object) Task with a cfg
+
+outputs:
+cpus (int) CPUs granted by the scheduler, else the CPU budget of the configuration
+'''
+def cpus(task):
+    granted = getattr(task, 'granted_cpus', None)
+    if granted: return granted
+
+    cfg = getattr(task, 'cfg', None)
+    return getattr(cfg, 'cpus', None) or mp.cpu_count()
+
+
+class Budget(object):
+
+    '''
+    inputs:
+    cpus   (int)           Number of CPUs shared by running tasks
+    memory (int, optional) Memory in MB shared by running tasks. Unlimited if None.
+    '''
+    def __init__(self, cpus, memory=None):
+        self.cpus = cpus
+        self.memory = memory
+        self.used_cpus = 0
+        self.used_memory = 0
+
+
+    '''
+    Demand of a task, from its class attributes, else from its run history, clipped to the budget
+
+    inputs:
+    task    (object)         Task instance
+    learned (dict, optional) Output of history.demands()
+
+    outputs:
+    cpus   (int) Number of CPUs
+    memory (int) Memory in MB
+    '''
+    def demand(self, task, learned=None):
+        past = (learned or {}).get(type(task).__name__, {})
+
+        cpus = getattr(task, 'cpus', None) or past.get('cpus') or 1
+        memory = getattr(task, 'memory', None) or past.get('memory') or 0
+
+        cpus = min(max(int(round(cpus)), 1), self.cpus)
+        if self.memory: memory = min(int(memory), self.memory)
+
+        return cpus, memory
+
+
+    '''
+    inputs:
+    demand (tuple) Output of demand()
+
+    outputs:
+    fits (bool) True if the demand fits in what is left of the budget
+    '''
+    def fits(self, demand):
+        cpus, memory = demand
+
+        if self.used_cpus + cpus > self.cpus: return False
+        if self.memory and self.used_memory + memory > self.memory: return False
+
+        return True
+
+
+    def acquire(self, demand):
+        self.used_cpus += demand[0]
+        self.used_memory += demand[1]
+
+
+    def release(self, demand):
+        self.used_cpus -= demand[0]
+        self.used_memory -= demand[1]
@@ -0,0 +1,168 @@
+'''
+Local query server for the move graph
+
+Loads adjlist.json and the move table once into a preproc.csr.GraphIndex and answers queries over HTTP on localhost
+with json. The index is rebuilt in the background when GenerateGraph publishes a new adjlist.json or the move table
+changes, and swapped in once it is complete, so queries are never served from a partial index.
+
+GET /neighbors?name=<move>
+GET /khop?name=<move>&k=2
+GET /path?src=<move>&tgt=<move>
+GET /component?name=<move>&limit=1000
+GET /move?name=<move>
+GET /search?q=<text>&k=10
+GET /stats
+'''
+import os
+import json
+import time
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from preproc import csr
+
+
+class GraphServer(object):
+
+    '''
+    inputs:
+    cfg      (config.Configuration) Configuration with the output directory and move table
+    host     (str, optional)        Address to listen on
+    port     (int, optional)        Port to listen on. Any free port if 0.
+    interval (float, optional)      Seconds between checks for new artifacts
+    '''
+    def __init__(self, cfg, host='127.0.0.1', port=8765, interval=2.0):
+        self.adj_path = os.path.join(cfg.output_dir, cfg.graph)
+        self.move_path = cfg.move_csv
+        self.interval = interval
+        self.stamps = None
+        self.index = None
+        self.loaded = None
+        self.stop = threading.Event()
+        self.reload()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.address = self.httpd.server_address
+
+
+    '''
+    outputs:
+    stamps (tuple) Modification time and size of the artifacts, None for missing files
+    '''
+    def poll(self):
+        stamps = []
+
+        for path in (self.adj_path, self.move_path):
+            try:
+                st = os.stat(path)
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+
+        return tuple(stamps)
+
+
+    '''
+    Rebuild the index if the artifacts changed. The previous index is kept if they cannot be read.
+
+    outputs:
+    reloaded (bool) True if a new index was swapped in
+    '''
+    def reload(self):
+        stamps = self.poll()
+        if stamps == self.stamps or stamps[0] is None: return False
+
+        start = time.perf_counter()
+
+        try:
+            index = csr.load(self.adj_path, self.move_path if stamps[1] else None)
+        except (ValueError, OSError, KeyError) as e:
+            print(f'could not load {self.adj_path}: {e}')
+            return False
+
+        self.index, self.stamps, self.loaded = index, stamps, time.time()
+        print(f'loaded {len(index.names)} moves in {time.perf_counter() - start:.4f} s')
+
+        return True
+
+
+    def watch(self):
+        while not self.stop.wait(self.interval):
+            self.reload()
+
+
+    '''
+    Answer a query
+
+    inputs:
+    route  (str)        Path of the request
+    params (dict)       Query parameters
+    index  (GraphIndex) Index to answer from
+
+    outputs:
+    body (dict) Response
+    '''
+    def query(self, route, params, index):
+        get = lambda key, default=None: params.get(key, [default])[0]
+
+        if route == '/neighbors': return {'name': get('name'), 'neighbors': index.neighbors(get('name'))}
+        if route == '/khop': return {'name': get('name'), 'hops': index.khop(get('name'), int(get('k', 2)))}
+        if route == '/path': return {'src': get('src'), 'tgt': get('tgt'), 'path': index.path(get('src'), get('tgt'))}
+        if route == '/component': return index.component_of(get('name'), int(get('limit', 1000)))
+        if route == '/move': return index.move(get('name'))
+        if route == '/search': return {'q': get('q'), 'results': index.search(get('q', ''), int(get('k', 10)))}
+        if route == '/stats': return dict(index.stats(), loaded=self.loaded)
+
+        raise LookupError(f'unknown route {route}')
+
+
+    '''
+    inputs:
+    request (BaseHTTPRequestHandler) Request to respond to
+    '''
+    def handle(self, request):
+        url = urlparse(request.path)
+        index = self.index
+
+        try:
+            if index is None: status, body = 503, {'error': f'{self.adj_path} is not available'}
+            else: status, body = 200, self.query(url.path, parse_qs(url.query), index)
+        except LookupError as e:
+            # KeyError of a move name is also a LookupError
+            status, body = 404, {'error': f'not found: {e}'}
+        except (TypeError, ValueError, AttributeError) as e:
+            status, body = 400, {'error': f'bad request: {e}'}
+
+        data = json.dumps(body, ensure_ascii=False).encode()
+        request.send_response(status)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+
+    '''
+    Serve until interrupted
+    '''
+    def run(self):
+        threading.Thread(target=self.watch, daemon=True).start()
+        print(f'serving {self.adj_path} on http://{self.address[0]}:{self.address[1]}')
+
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            print('stopped serving')
+        finally:
+            self.stop.set()
+            self.httpd.server_close()
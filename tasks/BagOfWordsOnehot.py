@@ -2,19 +2,29 @@
 Bag of words
 '''
 import os
-import json
 import pandas as pd
 from collections import defaultdict
 
+import artifacts
 from preproc import relational as rel
+from preproc import labels as lbl
+from preproc import tables
 
 class BagOfWordsOnehot(object):
+	requires = ('PruneGraphMask',)
+
 	def __init__(self, config):
 		self.cfg = config
 
 
 	def run(self):
-		df = pd.read_csv(self.cfg.move_csv, sep='\t', header=0)
+		df = tables.read(self.cfg.move_csv)
+
+		labels = lbl.LabelCache(self.cfg.label_cache)
+		df['type'] = labels.canonical(df['type'])
+		labels.save()
+		self.cache = labels.stats()
+
 		features = defaultdict(list)
 
 		# build bag-of-words map
@@ -34,18 +44,21 @@ class BagOfWordsOnehot(object):
 		desc = 'One-hot classification of move types using bag-of-words of move names as features.'
 		filename = 'bag-of-words-onehot-split.json' if self.cfg.is_split else 'bag-of-words-onehot.json'
 
-		with open(os.path.join(self.cfg.output_dir, filename), 'w') as file:
-			data = {'task': 'onehot', 'label_map': type2id, 'desc': desc}
-			
-			train_mask_path = os.path.join(self.cfg.output_dir, self.cfg.train_mask)
-			val_mask_path = os.path.join(self.cfg.output_dir, self.cfg.val_mask)
-			test_mask_path = os.path.join(self.cfg.output_dir, self.cfg.test_mask)
+		train_mask_path = os.path.join(self.cfg.output_dir, self.cfg.train_mask)
+		val_mask_path = os.path.join(self.cfg.output_dir, self.cfg.val_mask)
+		test_mask_path = os.path.join(self.cfg.output_dir, self.cfg.test_mask)
+
+		train_set, val_set, test_set = rel.split_dataset_on_masks(features, train_mask_path, val_mask_path, test_mask_path)
 
-			train_set, val_set, test_set = rel.split_dataset_on_masks(features, train_mask_path, val_mask_path, test_mask_path)
+		# features are written one sample at a time rather than serialized into one string
+		with artifacts.stream_json(os.path.join(self.cfg.output_dir, filename)) as out:
+			out.item('task', 'onehot')
+			out.item('label_map', type2id)
+			out.item('desc', desc)
 
 			if self.cfg.is_split:
-				data.update({'train': train_set, 'validation': val_set, 'test': test_set})
-			else:	
-				data['features'] = features
-			
-			json.dump(data, file, ensure_ascii=False, indent=4)
\ No newline at end of file
+				out.items('train', train_set.items())
+				out.items('validation', val_set.items())
+				out.items('test', test_set.items())
+			else:
+				out.items('features', features.items())
@@ -2,10 +2,15 @@
 '''
 import os
 import pandas as pd
+
+import artifacts
+import checkpoint
 from collect import collector as clt
 from utils import write
 
 class CollectVideos(object):
+    executor = 'thread'
+
     def __init__(self, config):
         self.cfg = config
 
@@ -22,16 +27,18 @@ class CollectVideos(object):
             'call_to_action': len(cta)
         }
 
-        miss.to_csv(os.path.join(self.cfg.output_dir, 'missing.csv'), sep='\t')
-        una, found = clt.collect(miss, self.cfg.video_dst, self.cfg.output_dir)
+        artifacts.write_table(miss, os.path.join(self.cfg.output_dir, 'missing.csv'), index=True)
 
-        log['collect'] = {
-            'unavailable': len(una),
-            'found': len(found)
-        }
+        with checkpoint.journal(self) as journal:
+            una, found = clt.collect(miss, self.cfg.video_dst, self.cfg.output_dir, journal)
+
+            log['collect'] = {
+                'unavailable': len(una),
+                'found': len(found)
+            }
 
-        update_path = os.path.join(self.cfg.output_dir, 'updated.csv')
-        updated, err = clt.update_videos(self.cfg.move_csv, self.cfg.video_csv, found, 
-                                         self.cfg.video_src, update_path)
-        write('no_videos_clt.txt', err)
-        write('collect_videos.json', log)
\ No newline at end of file
+            update_path = os.path.join(self.cfg.output_dir, 'updated.csv')
+            updated, err = clt.update_videos(self.cfg.move_csv, self.cfg.video_csv, found, 
+                                             self.cfg.video_src, update_path)
+            write('no_videos_clt.txt', err)
+            write('collect_videos.json', log)
\ No newline at end of file
@@ -4,11 +4,14 @@ import numbers
 import numpy as np
 import networkx as nx
 import pandas as pd
+import multiprocessing as mp
 import matplotlib.pyplot as plt
 
 from time import time
 from colorama import Fore, Back, Style
 
+import artifacts
+from utils import make_dir, write
 from preproc import relational as rel
 
 class CsvToGraph(object):
@@ -43,44 +46,139 @@ class CsvToGraph(object):
 		return df
 
 
-	def run(self):
+	'''
+	Read in a table file in chunks of rows. Spreadsheets cannot be read in chunks and are read whole.
+
+	inputs:
+	data_dir  (str) Directory containing files
+	src 	  (str) Name of file
+	chunksize (int) Number of rows per chunk. Read whole table if 0.
+
+	outputs:
+	df (pd.DataFrame) Generator of DataFrame chunks
+	'''
+	def read_table(self, data_dir, src, chunksize=0):
+
+		if not chunksize or not src.endswith(('.csv', '.tsv')):
+			yield self.open_table(data_dir, src)
+			return
+
+		sep = '\t' if src.endswith('.tsv') else ','
+		yield from pd.read_csv(os.path.join(data_dir, src), sep=sep, chunksize=chunksize)
+
+
+	'''
+	Convert a single table into a graph, check that the table is recoverable, and save the edgelist.
+	Executed in worker processes.
+
+	inputs:
+	src (str) Name of file
+
+	outputs:
+	record (dict) File name, status, number of rows, and time in seconds
+	'''
+	def convert(self, src):
+
+		start = time()
+		source = src.split('.')[0]
+		graph_dir = os.path.join(self.cfg.table_dst, source.lower())
+		edgelist = os.path.join(graph_dir, 'edgelist.gz')
+		make_dir(graph_dir)
+
+		passed = True
+		error = None
+		rows = 0
+		relations = []
+
+		try:
+			with artifacts.open_artifact(edgelist, 'wb') as file:
+				for df in self.read_table(self.cfg.table_src, src, self.cfg.table_chunksize):
+					# column headers have trailing spaces
+					df.rename(columns={c:c.strip() for c in df.columns}, inplace=True)
+
+					G = rel.table_to_graph(df, source)
+
+					# Recover original table
+					recovered = rel.graph_to_table(G)
+					passed = df.reset_index(drop=True).equals(recovered)
+					if not passed: break
+
+					nx.write_edgelist(G, file)
+					relations = G.graph['relations']
+					rows += len(df)
+		except Exception as e:
+			passed = False
+			error = str(e)
 
-		batch_time = time()
-		data_dir = 'remaining'
-		save_dir = 'output'
+		if passed:
+			# save the relation names that edge types index into
+			artifacts.write_json(os.path.join(graph_dir, 'relations.json'), relations)
+		elif os.path.exists(edgelist):
+			os.remove(edgelist)
 
-		if not os.path.exists(save_dir):
-			os.mkdir(save_dir)
+		return {'file': src, 'passed': passed, 'error': error, 'rows': rows, 'time': time()-start}
 
-		for src in get_files(data_dir, last_index=None):
-			single_src_time = time()
 
-			print(f'{src}...')
-			df = self.open_table(data_dir, src)
-			source = src.split('.')[0]
+	'''
+	Work units for the task farm. Listing the units starts the batch.
+
+	outputs:
+	files (list) Table file names, largest first so the longest files do not start last and leave workers idle
+	'''
+	def units(self):
+
+		self.batch_time = time()
+		make_dir(self.cfg.table_dst)
+
+		return rel.get_files(self.cfg.table_src, largest_first=True, extensions=('.xls', '.xlsx', '.csv', '.tsv'))
 
-			# column headers have trailing spaces
-			df.rename(columns={c:c.strip() for c in df.columns}, inplace=True)
 
-			G = nx.Graph()
+	'''
+	inputs:
+	src (str) Name of file
+
+	outputs:
+	record (dict) Output of convert()
+	'''
+	def process(self, src):
+
+		return self.convert(src)
 
-			rel.create_src_node(G, source)
-			rel.create_row_nodes(G, df, source)
-			rel.create_col_nodes(G, df)
-			rel.connect_row_to_col(G, df)
 
-			# Recover original table
-			try:
-				recovered = rel.graph_to_table(G)
-				assert df.equals(recovered)
+	'''
+	Log the records of all files
+
+	inputs:
+	records (list) Outputs of convert()
+	'''
+	def collect(self, records):
+
+		log = {'files': records, 'passed': 0, 'failed': 0}
+
+		for record in records:
+			log['passed' if record['passed'] else 'failed'] += 1
+
+		log['time'] = time() - self.batch_time
+		print(f"total time: {log['time']}")
+		write('csv_to_graph.json', log)
+
+
+	def run(self):
+
+		files = self.units()
+		workers = min(self.cfg.table_workers or mp.cpu_count(), max(len(files), 1))
+		records = []
 
+		log_path = os.path.join('logs', 'csv_to_graph.jsonl')
 
-				# save graph
-				nx.write_edgelist(G, f'{save_dir}/{source.lower()}/edgelist.gz')
+		# not atomic so progress can be followed while the tables convert
+		with mp.Pool(workers) as pool, artifacts.open_artifact(log_path, 'wb', atomic=False) as stream:
+			for record in pool.imap_unordered(self.convert, files):
+				stream.write(artifacts.dumps(record)+b'\n')
+				stream.flush()
+				records.append(record)
 
-				print(f'{source} completed')
-			except AssertionError:
-				print(f'{source} {Fore.RED}failed{Style.RESET_ALL}')
+				status = 'completed' if record['passed'] else f'{Fore.RED}failed{Style.RESET_ALL}'
+				print(f"{record['file']} {status} - {record['time']:.4f} s")
 
-			print(f'{time()-single_src_time} - {src}')
-		print(f'total time: {time() - batch_time}')
\ No newline at end of file
+		self.collect(records)
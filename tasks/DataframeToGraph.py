@@ -6,17 +6,19 @@ import numpy as np
 import pandas as pd
 import networkx as nx
 
+import artifacts
 from preproc import relational as rel
+from preproc import tables
 
 class DataframeToGraph(object):
 	def __init__(self, config):
 		self.cfg = config
 
 	def run(self):
-		moves = pd.read_csv(self.cfg.move_csv, header=0, sep='\t')
+		moves = tables.read(self.cfg.move_csv)
 		
 		G = rel.dataframe_to_graph(moves)
 		binary = nx.to_numpy_matrix(G, dtype=np.int64)
 		df = pd.DataFrame(data=binary)
 
-		df.to_csv('logs/edge_features.csv', index=False)
\ No newline at end of file
+		artifacts.write_table(df, 'logs/edge_features.csv', sep=',')
\ No newline at end of file
@@ -3,8 +3,9 @@
 import pandas as pd
 
 from utils import write
-from validate import datacheck as dck
+from validate import engine as eng
 from preproc import relational as rel
+from preproc import tables
 
 class DuplicateEdges(object):
 
@@ -21,10 +22,12 @@ class DuplicateEdges(object):
         
         # check over move table
         src = self.cfg.move_csv
-        df = pd.read_csv(src, header=0, sep='\t')
+        df = tables.read(src)
 
-        G = rel.dataframe_to_graph(df)
-        edges, duplicates = rel.count_edges(df)
+        G = tables.graph(src)
+        report = eng.Validator(df, whitelist=self.cfg.whitelist).run(['duplicate_edges'])
+        edges = report['results']['duplicate_edges']['edges']
+        duplicates = report['results']['duplicate_edges']['duplicates']
         ground_truth = edges//2
         graph_count = len(G.edges())
 
@@ -1,11 +1,13 @@
 '''
-TODO:
+Find near-duplicate moves for manual correction. Candidate pairs come from MinHash/LSH over normalized names,
+aliases, and descriptions, and are scored together with the Jaccard similarity of their prereqs and subseqs.
 Refer to https://github.com/parkourtheory-admin/datapipe/issues/67
 '''
 import pandas as pd
 
 from utils import write
-from preproc import relational as rel
+from validate import duplicates as dup
+from preproc import tables
 
 class DuplicateNodes(object):
 	def __init__(self, config):
@@ -13,4 +15,7 @@ class DuplicateNodes(object):
 
 
 	def run(self):
-		pass
\ No newline at end of file
+		moves = tables.read(self.cfg.move_csv)
+
+		log = {'duplicate_nodes': dup.near_duplicates(moves)}
+		write('duplicate_nodes.json', log)
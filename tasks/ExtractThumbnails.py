@@ -3,22 +3,55 @@ This task should only be executed after RenameVideos.
 '''
 import os
 import pandas as pd
+import multiprocessing as mp
 
+import artifacts
+import resources
+import checkpoint
 from preproc import video as vid
 from collect import collector as clt
 
 class ExtractThumbnails(object):
+    # one process per video, up to the whole CPU budget
+    cpus = mp.cpu_count()
+    memory = 2048
+
     def __init__(self, config):
         self.cfg = config
 
 
-    def run(self):        
-        v = vid.Video()
-        
+    '''
+    outputs:
+    files (list) Video file names for the task farm
+    '''
+    def units(self):
+        return sorted(os.listdir(self.cfg.video_src))
+
+
+    '''
+    inputs:
+    video (str) Video file name
+
+    outputs:
+    res (dict) Dictionary mapping file name to 1 once its thumbnail is saved
+    '''
+    def process(self, video):
+        res = {}
+        vid.Video().thumbnail(res, os.path.join(self.cfg.video_src, video), self.cfg.thumb_dst, 300, 168)
+        return res
+
+
+    '''
+    Update the video table with the thumbnails
+
+    inputs:
+    records (list) Thumbnails of each video
+    '''
+    def collect(self, records):
+        res = {k: v for r in records for k, v in r.items()}
         df = pd.read_csv(self.cfg.video_csv, header=0, sep='\t')
-        res = v.extract_thumbnails(self.cfg.video_src, self.cfg.thumb_dst, 300, 168)
 
-        files = [i for i in os.listdir(self.cfg.video_src)]
+        files = self.units()
         assert len(res) == len(files), f'videos: {len(files)}\textracted: {len(res)}'
 
         df, err = clt.update_thumbnail(df, res)
@@ -28,5 +61,33 @@ class ExtractThumbnails(object):
 
         print(f'thumbnails:\nmissing: {len(missing_dst)}\nupdated: {len(updated_dst)}')
 
-        err.to_csv(missing_dst, index=False, sep='\t')
-        df.to_csv(updated_dst, index=False, sep='\t')
\ No newline at end of file
+        artifacts.write_table(err, missing_dst)
+        artifacts.write_table(df, updated_dst)
+
+
+    '''
+    inputs:
+    video (str) Video file name
+
+    outputs:
+    path (str) Path of thumbnail
+    '''
+    def output(self, video):
+        return os.path.join(self.cfg.thumb_dst, f"{video.split('.')[0]}.jpg")
+
+
+    def run(self):
+        v = vid.Video()
+
+        with checkpoint.journal(self) as journal:
+            done = journal.completed()
+            todo = [f for f in self.units() if f not in done]
+
+            def save(block, res):
+                for f in block:
+                    if f in res: journal.append(f, {f: res[f]}, outputs=[self.output(f)])
+
+            res = v.extract_thumbnails(self.cfg.video_src, self.cfg.thumb_dst, 300, 168, cpus=resources.cpus(self),
+                                       files=todo, callback=save)
+
+            self.collect(list(done.values()) + [dict(res)])
@@ -8,11 +8,14 @@ Note:
 '''
 import os
 import sys
-import json
 import numpy as np
 import networkx as nx
 
+import artifacts
+
 class ExtrapolationMask(object):
+	requires = ('RelabelGraph', 'Name2Int')
+
 	def __init__(self, config):
 		self.cfg = config
 
@@ -32,12 +35,8 @@ class ExtrapolationMask(object):
 	test_mask   (ndarray) Binary mask containing 1 at positions correpsonding to nodes to test on
 	'''
 	def run(self):
-		G, node_map = None, None
-		with open(os.path.join(self.cfg.output_dir, 'adjlist.json'), 'r') as file:
-			G = nx.Graph(json.load(file))
-
-		with open(os.path.join(self.cfg.output_dir, self.cfg.node_map), 'r') as file:
-			node_map = {k: v for k, v in json.load(file).items()}
+		G = nx.Graph(artifacts.read_json(os.path.join(self.cfg.output_dir, self.cfg.graph)))
+		node_map = artifacts.read_json(os.path.join(self.cfg.output_dir, self.cfg.node_map))
 
 		'''
 		nx.relabel is converting keys in adjacency list to string integer ids and edges to integer ids,
@@ -5,7 +5,13 @@ https://github.com/parkourtheory-admin/datapipe/issues/55
 import os
 import pandas as pd
 
+import artifacts
+from preproc import tables
+
 class FixEmbed(object):
+	executor = 'thread'
+	writes = ('video_csv',)
+
 	def __init__(self, config):
 		self.cfg = config
 
@@ -13,8 +19,8 @@ class FixEmbed(object):
 	def run(self):
 		files = [f.strip() for f in os.listdir(self.cfg.video_src)]
 		
-		moves = pd.read_csv(self.cfg.move_csv, header=0, sep='\t')
-		videos = pd.read_csv(self.cfg.video_csv, header=0, sep='\t')
+		moves = tables.read(self.cfg.move_csv)
+		videos = tables.read(self.cfg.video_csv)
 		df = pd.merge(moves, videos, on='id')
 
 		for i, row in df.iterrows():
@@ -22,4 +28,4 @@ class FixEmbed(object):
 			df.at[i, 'embed'] = f if f in files else 'unavailable.mp4'
 
 		df = df.drop(list(moves)[1:], axis=1)
-		df.to_csv(self.cfg.video_csv, index=False, sep='\t')
\ No newline at end of file
+		artifacts.write_table(df, self.cfg.video_csv)
\ No newline at end of file
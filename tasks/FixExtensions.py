@@ -3,6 +3,8 @@
 from collect import collector as clt
 
 class FixExtensions(object):
+    executor = 'thread'
+
     def __init__(self, config):
         self.cfg = config
 
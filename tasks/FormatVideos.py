@@ -5,35 +5,96 @@ import pandas as pd
 import multiprocessing as mp
 from more_itertools import chunked
 
+import resources
+import checkpoint
 from utils import accuracy, write
 from preproc import video as vid
 
 class FormatVideos(object):
+    # one process per video, up to the whole CPU budget
+    cpus = mp.cpu_count()
+    memory = 2048
+
     def __init__(self, config):
         self.cfg = config
 
 
-    def run(self):
-        df = pd.read_csv(self.cfg.video_csv, header=0, sep='\t')
-        v = vid.Video()
-        res = mp.Manager().dict()
+    '''
+    Resize one video
+
+    inputs:
+    video (str)  Embed file name
+    res   (dict) Dictionary mapping file name to True if no frames were written
+    '''
+    def resize(self, video, res):
+        vid.Video().resize(self.cfg.video_height,
+                           self.cfg.video_width,
+                           os.path.join(self.cfg.video_src, video),
+                           os.path.join(self.cfg.output_dir, video),
+                           res)
+
 
-        for block in chunked(df.iterrows(), mp.cpu_count()):
-            procs = []
+    '''
+    outputs:
+    units (list) Embed file name of each video for the task farm
+    '''
+    def units(self):
+        return list(pd.read_csv(self.cfg.video_csv, header=0, sep='\t')['embed'])
 
-            for row in block:
-                video = row[1]['embed']
-                args = (self.cfg.video_height, 
-                        self.cfg.video_width, 
-                        os.path.join(self.cfg.video_src, video), 
-                        os.path.join(self.cfg.output_dir, video),
-                        res)
-                procs.append(mp.Process(target=v.resize, args=args))
 
-            for p in procs: p.start()
-            for p in procs: p.join()
+    '''
+    inputs:
+    video (str) Embed file name
 
+    outputs:
+    res (dict) Result of resize()
+    '''
+    def process(self, video):
+        res = {}
+        self.resize(video, res)
+        return res
+
+
+    '''
+    inputs:
+    records (list) Results of resize()
+    '''
+    def collect(self, records):
+        res = {k: v for r in records for k, v in r.items()}
         failed = list(filter(lambda x: not x, res.values()))
         accuracy(failed, res)
-        write('format_video.json', dict(res))
+        write('format_video.json', res)
+
+
+    '''
+    inputs:
+    video (str) Embed file name
+
+    outputs:
+    path (str) Path of resized video
+    '''
+    def output(self, video):
+        path = os.path.join(self.cfg.output_dir, video)
+        return path if path.endswith('.mp4') else f'{path}.mp4'
+
+
+    def run(self):
+        res = mp.Manager().dict()
+
+        with checkpoint.journal(self) as journal:
+            done = journal.completed()
+            for record in done.values(): res.update(record)
+
+            todo = [v for v in self.units() if str(v) not in done]
+
+            for block in chunked(todo, resources.cpus(self)):
+                procs = [mp.Process(target=self.resize, args=(video, res)) for video in block]
+
+                for p in procs: p.start()
+                for p in procs: p.join()
+
+                # True means no frames were written, so failed videos are not journaled and are retried on resume
+                for video in block:
+                    if res.get(video) is False: journal.append(video, {video: res[video]}, outputs=[self.output(video)])
 
+            self.collect([dict(res)])
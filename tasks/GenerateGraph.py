@@ -1,11 +1,14 @@
 '''
-Generate graph and save.
+Generate graph and save. If the graph was generated before, only the rows that changed since then are applied to it.
 '''
 import os
-import json
 import pandas as pd
 import networkx as nx
+
+import artifacts
 from preproc import relational as rel
+from preproc import diff
+from preproc import tables
 
 class GenerateGraph(object):
 	def __init__(self, config):
@@ -13,10 +16,27 @@ class GenerateGraph(object):
 
 
 	def run(self):
-		moves = pd.read_csv(self.cfg.move_csv, header=0, sep='\t')
-		G = rel.dataframe_to_graph(moves)
+		moves = tables.read(self.cfg.move_csv)
+		adj_path = os.path.join(self.cfg.output_dir, self.cfg.graph)
+		base = diff.load_snapshot(adj_path)
+
+		# rows are matched by id, so a table with duplicate ids is rebuilt instead of diffed
+		if base is not None and not (diff.diffable(base) and diff.diffable(moves)): base = None
+
+		self.cache = {'hits': int(base is not None), 'misses': int(base is None)}
+
+		if base is None:
+			G = rel.dataframe_to_graph(moves)
+		else:
+			delta = diff.table_diff(base, moves)
+			if diff.is_empty(delta): return
+
+			G = diff.apply_delta(nx.Graph(artifacts.read_json(adj_path)), delta)
 
 		assert len(moves) == len(G.nodes())
 
-		with open(os.path.join(self.cfg.output_dir, 'adjlist.json'), 'w') as file:
-			json.dump(nx.to_dict_of_lists(G), file, ensure_ascii=False, indent=4)
+		# replace the graph in one step so readers such as the query server never see a partial file
+		with artifacts.stream_json(adj_path) as out:
+			for node, nbrs in G.adjacency(): out.item(node, list(nbrs))
+
+		diff.save_snapshot(adj_path, moves)
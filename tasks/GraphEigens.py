@@ -8,6 +8,7 @@ from numpy import linalg as la
 
 import matplotlib.pyplot as plt
 from preproc import relational as rel
+from preproc import tables
 
 class GraphEigens(object):
 	def __init__(self, config):
@@ -15,9 +16,7 @@ class GraphEigens(object):
 
 
 	def run(self):
-		moves = pd.read_csv(self.cfg.move_csv, header=0, sep='\t')
-
-		G = rel.dataframe_to_graph(moves)
+		G = tables.graph(self.cfg.move_csv)
 		adj = nx.to_numpy_matrix(G)
 		vals = la.eigvals(adj)
 
@@ -1,8 +1,10 @@
 '''
 '''
 import pandas as pd
-from validate import datacheck as dck
+from validate import engine as eng
+from validate import stream as st
 from utils import write
+from preproc import tables
 
 class Incomplete(object):
 
@@ -19,11 +21,14 @@ class Incomplete(object):
         
         # check over move table
         src = self.cfg.move_csv
-        df = pd.read_csv(src, header=0, sep='\t')
 
-        dc = dck.DataCheck(whitelist=self.cfg.whitelist)
+        # stream large tables in chunks instead of loading them whole
+        if self.cfg.move_chunksize:
+            validator = st.StreamValidator(src, self.cfg.move_chunksize, whitelist=self.cfg.whitelist, workers=self.cfg.move_workers)
+        else:
+            validator = eng.Validator(tables.read(src), whitelist=self.cfg.whitelist)
 
-        cols = ['id', 'name', 'type', 'description']
-        log['incomplete'] = dc.find_all_empty(df, cols)
+        report = validator.run(['incomplete'])
+        log['incomplete'] = report['results']['incomplete']
 
         write('incomplete.json', log)
\ No newline at end of file
@@ -10,6 +10,8 @@ from utils import write, make_dir
 
 import matplotlib.pyplot as plt
 from preproc import relational as rel
+from preproc import labels as lbl
+from preproc import tables
 
 class LabelDistribution(object):
 	def __init__(self, config):
@@ -20,7 +22,13 @@ class LabelDistribution(object):
 	def run(self):
 		make_dir(self.task_dir)
 
-		moves = pd.read_csv(self.cfg.move_csv, header=0, sep='\t')
+		moves = tables.read(self.cfg.move_csv)
+
+		labels = lbl.LabelCache(self.cfg.label_cache)
+		moves['type'] = labels.canonical(moves['type'])
+		labels.save()
+		self.cache = labels.stats()
+
 		multi_hot = label_dist(moves, multihot=True)
 		one_hot = label_dist(moves, multihot=False)
 		multi_hot_percentages = label_percentages(multi_hot)
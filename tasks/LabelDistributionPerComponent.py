@@ -15,6 +15,7 @@ import matplotlib.pyplot as plt
 
 from utils import make_dir
 from preproc import relational as rel
+from preproc import tables
 
 
 class LabelDistributionPerComponent(object):
@@ -26,7 +27,7 @@ class LabelDistributionPerComponent(object):
 	def run(self):
 		make_dir(self.task_dir)
 		
-		moves = pd.read_csv(self.cfg.move_csv, header=0, sep='\t')
+		moves = tables.read(self.cfg.move_csv)
 		G = rel.dataframe_to_graph(moves)
 
 		aggregated = defaultdict(dict)
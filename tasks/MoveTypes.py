@@ -1,7 +1,10 @@
 '''
 '''
 import pandas as pd
-from validate import datacheck as dck
+from validate import engine as eng
+from validate import stream as st
+from preproc import labels as lbl
+from preproc import tables
 from utils import write
 
 class MoveTypes(object):
@@ -19,11 +22,17 @@ class MoveTypes(object):
         
         # check over move table
         src = self.cfg.move_csv
-        df = pd.read_csv(src, header=0, sep='\t')
+        labels = lbl.LabelCache(self.cfg.label_cache)
 
-        dc = dck.DataCheck(whitelist=self.cfg.whitelist)
+        # stream large tables in chunks instead of loading them whole
+        if self.cfg.move_chunksize:
+            validator = st.StreamValidator(src, self.cfg.move_chunksize, whitelist=self.cfg.whitelist, labels=labels, workers=self.cfg.move_workers)
+        else:
+            validator = eng.Validator(tables.read(src), whitelist=self.cfg.whitelist, labels=labels)
 
-        errs = dc.check_type(df)
-        log['move_types'] = errs
+        report = validator.run(['move_types'])
+        log['move_types'] = report['results']['move_types']
+        labels.save()
+        self.cache = labels.stats()
 
         write('move_types.json', log)
\ No newline at end of file
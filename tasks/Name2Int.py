@@ -8,9 +8,10 @@ If need to convert int id to node string name, when converting from DGL to Netwo
 invert the dictionary.
 '''
 import os
-import json
 import pandas as pd
 
+import artifacts
+
 class Name2Int(object):
 	def __init__(self, config):
 		self.cfg = config
@@ -23,5 +24,4 @@ class Name2Int(object):
 		
 		name2int = {n:i for i, n in enumerate(df['name'].tolist())}
 
-		with open(os.path.join(self.cfg.output_dir, 'name2int.json'), 'w') as file:
-			json.dump(name2int, file, ensure_ascii=False, indent=4)
+		artifacts.write_json(os.path.join(self.cfg.output_dir, self.cfg.node_map), name2int)
@@ -0,0 +1,25 @@
+'''
+Precompute topological order, strongly connected components, and reachability of the directed move graph
+so prerequisite queries do not need a traversal per request. Load with preproc.reachability.load().
+'''
+import os
+import pandas as pd
+
+import artifacts
+from preproc import relational as rel
+from preproc import reachability as rch
+from preproc import tables
+
+class PrereqIndex(object):
+	def __init__(self, config):
+		self.cfg = config
+
+
+	def run(self):
+		G = tables.graph(self.cfg.move_csv, directed=True)
+
+		index = rch.build_index(G)
+
+		assert len(index['nodes']) == len(G.nodes())
+
+		artifacts.write_json(os.path.join(self.cfg.output_dir, 'prereq_index.json'), index)
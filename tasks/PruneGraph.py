@@ -3,54 +3,55 @@ Prune knowledge graph
 '''
 import os
 import sys
-import json
 import math
 import pandas as pd
 import networkx as nx
 from networkx.readwrite import json_graph
 
-from tqdm import tqdm
+import artifacts
 from preproc import relational as rel
+from preproc import diff
+from preproc import tables
 
 class PruneGraph(object):
 	def __init__(self, config):
 		self.cfg = config
 
 
-	def remove_from_edge(self, df, move, edge, tgt):
-		row = df[df['name'] == move]
-		rel = row[edge].squeeze()
-
-		if isinstance(rel, str):
-			rel = rel.split(', ')
-			if tgt in rel:
-				rel.pop(rel.index(tgt))
-				df.loc[df['name'] == move, [edge]] = ', '.join(rel) if len(rel) > 0 else math.nan 
-
-
 	def run(self):
-		videos = pd.read_csv(self.cfg.video_csv, header=0, sep='\t')
-		moves = pd.read_csv(self.cfg.move_csv, header=0, sep='\t')
+		videos = tables.read(self.cfg.video_csv)
+		moves = tables.read(self.cfg.move_csv)
 		start_len = len(moves)
-		G = rel.dataframe_to_graph(moves)
 
 		df = pd.merge(moves, videos, on='id')
 		df = df[df['embed'].isnull()]
 		missing_moves = list(df['name'])
 
-		for move in tqdm(missing_moves):
-			for neighbor in G.neighbors(move):
-				self.remove_from_edge(moves, neighbor, 'prereq', move)
-				self.remove_from_edge(moves, neighbor, 'subseq', move)
-
-			index = moves[moves['name'] == move].index
-			moves.drop(index=index, inplace=True)
-			videos.drop(index=index, inplace=True)
+		# remove all missing moves and their edges at once, and drop videos by id rather than by position
+		moves = rel.remove_moves(moves, missing_moves)
+		videos = videos[~videos['id'].isin(df['id'])]
 
 		end_len = len(moves)
 
-		# create new graph of moves from pruned dataframes
-		G = rel.dataframe_to_graph(moves, validate=True)
+		# create new graph of moves from pruned dataframes, or update the previous graph if it was built from an earlier table
+		adj_path = os.path.join(self.cfg.output_dir, 'adjlist')
+		base = diff.load_snapshot(adj_path)
+
+		# rows are matched by id, so a table with duplicate ids is rebuilt instead of diffed
+		if base is not None and not (diff.diffable(base) and diff.diffable(moves)): base = None
+
+		self.cache = {'hits': int(base is not None), 'misses': int(base is None)}
+
+		if base is None:
+			G = rel.dataframe_to_graph(moves, validate=True)
+		else:
+			delta = diff.table_diff(base, moves)
+
+			G = diff.apply_delta(nx.Graph(artifacts.read_json(adj_path)), delta)
+
+			# only the edges of changed moves need to be compared against the table
+			changed = moves.loc[moves['id'].isin(delta['added'] + delta['modified']), 'name']
+			rel.validate_graph(G, moves, moves=changed)
 
 		# check that missing moves are not in the graph to validate pruning worked
 		errors = []
@@ -66,9 +67,10 @@ class PruneGraph(object):
 			nodes: {len(G.nodes())}\
 			components: {nx.number_connected_components(G)}')
 	
-		moves.to_csv(os.path.join(self.cfg.output_dir, 'pruned_moves.tsv'), sep='\t', index=False)
-		videos.to_csv(os.path.join(self.cfg.output_dir, 'pruned_videos.tsv'), sep='\t', index=False)
+		artifacts.write_table(moves, os.path.join(self.cfg.output_dir, 'pruned_moves.tsv'))
+		artifacts.write_table(videos, os.path.join(self.cfg.output_dir, 'pruned_videos.tsv'))
 
-	
-		with open(os.path.join(self.cfg.output_dir, 'adjlist'), 'w') as file:
-			json.dump(nx.to_dict_of_lists(G), file, ensure_ascii=False, indent=4)
+		with artifacts.stream_json(adj_path) as out:
+			for node, nbrs in G.adjacency(): out.item(node, list(nbrs))
+
+		diff.save_snapshot(adj_path, moves)
@@ -3,18 +3,22 @@ Generate training mask for moves with videos, and validation and testing for nod
 Only need for training if using video features.
 '''
 import os
+import numpy as np
 import pandas as pd
 
 from tqdm import tqdm
 
+import artifacts
+from preproc import tables
+
 class PruneGraphMask(object):
 	def __init__(self, config):
 		self.cfg = config
 
 
 	def run(self):
-		videos = pd.read_csv(self.cfg.video_csv, header=0, sep='\t')
-		moves = pd.read_csv(self.cfg.move_csv, header=0, sep='\t')
+		videos = tables.read(self.cfg.video_csv)
+		moves = tables.read(self.cfg.move_csv)
 
 		df = pd.merge(moves, videos, on='id')
 		train_mask = df['link'].notnull()
@@ -41,6 +45,6 @@ class PruneGraphMask(object):
 		assert total == len(df)
 		print(f'train mask: {train_size}\tvalidation mask: {val_size}\ttest mask: {test_size}\ttotal: {total}')
 
-		train_mask.to_csv(os.path.join(self.cfg.output_dir, 'train_mask.tsv'), sep='\t', index=False)
-		validation_mask.to_csv(os.path.join(self.cfg.output_dir, 'validation_mask.tsv'), sep='\t', index=False)
-		test_mask.to_csv(os.path.join(self.cfg.output_dir, 'test_mask.tsv'), sep='\t', index=False)
\ No newline at end of file
+		artifacts.write_table(train_mask, os.path.join(self.cfg.output_dir, self.cfg.train_mask))
+		artifacts.write_table(validation_mask, os.path.join(self.cfg.output_dir, self.cfg.val_mask))
+		artifacts.write_table(test_mask, os.path.join(self.cfg.output_dir, self.cfg.test_mask))
\ No newline at end of file
@@ -5,7 +5,11 @@ import os
 import numpy as np
 import networkx as nx
 
+import artifacts
+
 class RandomMasks(object):
+	requires = ('PruneGraph',)
+
 	def __init__(self, config):
 		self.cfg = config
 
@@ -49,16 +53,14 @@ class RandomMasks(object):
 
 
 	def save(self, data, save_path):
-		with open(save_path, 'w') as file:
-			json.dump(data, file, ensure_ascii=False, indent=4)
+		artifacts.write_json(save_path, data)
 
 
 	def run(self):
-		with open(os.path.join(self.cfg.output_dir, 'adjlist'), 'r') as file:
-			G = nx.Graph(json.load(file))
-
-			train_mask, val_mask, test_mask = self.get_random_mask(len(G), self.train_split, self.val_split, self.test_split)
-			
-			self.save(train_mask, os.path.join(self.cfg.output_dir, 'train_mask.json'))
-			self.save(val_mask, os.path.join(self.cfg.output_dir, 'val_mask.json'))
-			self.save(test_mask, os.path.join(self.cfg.output_dir, 'test_mask.json'))
\ No newline at end of file
+		G = nx.Graph(artifacts.read_json(os.path.join(self.cfg.output_dir, 'adjlist')))
+
+		train_mask, val_mask, test_mask = self.get_random_mask(len(G), self.train_split, self.val_split, self.test_split)
+		
+		self.save(train_mask, os.path.join(self.cfg.output_dir, 'train_mask.json'))
+		self.save(val_mask, os.path.join(self.cfg.output_dir, 'val_mask.json'))
+		self.save(test_mask, os.path.join(self.cfg.output_dir, 'test_mask.json'))
\ No newline at end of file
@@ -2,20 +2,26 @@
 '''
 import os
 import pandas as pd
+
+import artifacts
 from collect import collector as clt
 from utils import write
+from preproc import tables
 
 class RenameVideos(object):
+    executor = 'thread'
+    writes = ('video_csv',)
+
     def __init__(self, config):
         self.cfg = config
 
 
     def run(self):
-        moves = pd.read_csv(self.cfg.move_csv, header=0, sep='\t')
-        videos = pd.read_csv(self.cfg.video_csv, header=0, sep='\t')
+        moves = tables.read(self.cfg.move_csv)
+        videos = tables.read(self.cfg.video_csv)
         df = pd.merge(moves, videos, on='id')
 
         df, err = clt.update_embed(df, self.cfg.video_src)
         df = df.drop(list(moves)[1:], axis=1)
-        df.to_csv(self.cfg.video_csv, index=False, sep='\t')
+        artifacts.write_table(df, self.cfg.video_csv)
         write('no_videos_rename.txt', err)
\ No newline at end of file
@@ -8,6 +8,7 @@ import pandas as pd
 
 from sitemap import sitemap
 from utils import write
+from preproc import tables
 
 class SiteMap(object):
 	def __init__(self, config):
@@ -15,7 +16,7 @@ class SiteMap(object):
 
 
 	def run(self):
-		moves = pd.read_csv(self.cfg.move_csv, sep='\t')
+		moves = tables.read(self.cfg.move_csv)
 		data = ['/m/'+m for m in moves['name'].tolist()]
 		
 		with open('sitemap/sites.json') as file:
@@ -1,10 +1,14 @@
 '''
 '''
 import pandas as pd
+
+import artifacts
 from validate import datacheck as dck
 from utils import write
+from preproc import tables
 
 class SortEdges(object):
+    writes = ('move_csv',)
 
     '''
     inputs:
@@ -19,12 +23,16 @@ class SortEdges(object):
         
         # check over move table
         src = self.cfg.move_csv
-        df = pd.read_csv(src, header=0, sep='\t')
+        df = tables.read(src)
 
         dc = dck.DataCheck(whitelist=self.cfg.whitelist)
 
-        df = dc.sort_edges(df)
-        df = dc.remove_unnamed(df)
-        df.to_csv(src, index=False, sep='\t')
+        log['changed'] = dc.unsorted_edges(df)
+        cleaned = dc.remove_unnamed(df)
+        log['rewritten'] = len(log['changed']) > 0 or len(cleaned.columns) != len(df.columns)
+
+        # only rewrite when the table is not already canonical
+        if log['rewritten']:
+            artifacts.write_table(dc.sort_edges(cleaned.copy()), src)
 
-        write('sort_edges.json', log)
\ No newline at end of file
+        write('sort_edges.json', log)
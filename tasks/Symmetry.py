@@ -1,8 +1,9 @@
 '''
 '''
 import pandas as pd
-from validate import datacheck as dck
+from validate import engine as eng
 from utils import write
+from preproc import tables
 
 class Symmetry(object):
 
@@ -19,11 +20,9 @@ class Symmetry(object):
         
         # check over move table
         src = self.cfg.move_csv
-        df = pd.read_csv(src, header=0, sep='\t')
+        df = tables.read(src)
 
-        dc = dck.DataCheck(whitelist=self.cfg.whitelist)
-
-        err = dc.check_symmetry(df)
-        log['symmetry'] = err.tolist()
+        report = eng.Validator(df, whitelist=self.cfg.whitelist).run(['symmetry'])
+        log['symmetry'] = report['results']['symmetry']
 
         write('symmetry.json', log)
\ No newline at end of file
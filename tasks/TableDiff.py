@@ -0,0 +1,25 @@
+'''
+Log the rows, nodes, and edges of the move table that changed since the last run of this task.
+The first run reports every move as added.
+'''
+import os
+import pandas as pd
+
+from utils import write
+from preproc import diff
+from preproc import tables
+
+class TableDiff(object):
+	def __init__(self, config):
+		self.cfg = config
+
+
+	def run(self):
+		moves = tables.read(self.cfg.move_csv)
+		log_path = os.path.join('logs', 'table_diff.json')
+
+		base = diff.load_snapshot(log_path)
+		if base is None: base = moves.iloc[:0]
+
+		write('table_diff.json', diff.table_diff(base, moves))
+		diff.save_snapshot(log_path, moves)
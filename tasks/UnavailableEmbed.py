@@ -5,17 +5,21 @@ Basically the reverse of FixEmbed task.
 import os
 import pandas as pd
 
+import artifacts
+from preproc import tables
+
 class UnavailableEmbed(object):
+	executor = 'thread'
+
 	def __init__(self, config):
 		self.cfg = config
 
 
 	def run(self):
-		df = pd.read_csv(self.cfg.video_csv, header=0, sep='\t')
+		df = tables.read(self.cfg.video_csv)
 
 		for i, row in df.iterrows():
 			if not os.path.exists(os.path.join(self.cfg.video_src, row['embed'])):
 				df.loc[i, 'embed'] = 'unavailable.mp4'
 
-		file = os.path.join(self.cfg.output_dir, 'video.tsv')
-		df.to_csv(file, index=False, sep='\t')
\ No newline at end of file
+		artifacts.write_table(df, os.path.join(self.cfg.output_dir, 'video.tsv'))
\ No newline at end of file
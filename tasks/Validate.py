@@ -0,0 +1,33 @@
+'''
+Run every registered check over the move table in a single pass and write one report
+'''
+import pandas as pd
+from validate import engine as eng
+from validate import stream as st
+from utils import write
+from preproc import tables
+
+class Validate(object):
+
+    '''
+    inputs:
+    config (Configuration) Object containing parsed configuration values
+    '''
+    def __init__(self, config):
+        self.cfg = config
+        
+
+    def run(self):
+        # check over move table
+        src = self.cfg.move_csv
+
+        # stream large tables in chunks. only row-local checks can be streamed, the rest are skipped.
+        if self.cfg.move_chunksize:
+            validator = st.StreamValidator(src, self.cfg.move_chunksize, whitelist=self.cfg.whitelist, workers=self.cfg.move_workers)
+            report = validator.run()
+            report['skipped'] = [name for name in eng.CHECKS if name not in st.ACCUMULATORS]
+        else:
+            df = tables.read(src)
+            report = eng.Validator(df, whitelist=self.cfg.whitelist).run()
+
+        write('validate.json', report)
@@ -0,0 +1,26 @@
+'''
+Apply the declarative rules in configs/rules.ini to the move and video tables
+'''
+import pandas as pd
+from validate import rules as rls
+from utils import write, is_config
+from preproc import tables
+
+class ValidateRules(object):
+
+    '''
+    inputs:
+    config (Configuration) Object containing parsed configuration values
+    '''
+    def __init__(self, config):
+        self.cfg = config
+        
+
+    def run(self):
+        dfs = {
+            'moves': tables.read(self.cfg.move_csv),
+            'videos': tables.read(self.cfg.video_csv)
+        }
+
+        rules = rls.RuleSet(is_config('rules'), whitelist=self.cfg.whitelist)
+        write('validate_rules.json', rules.validate(dfs))
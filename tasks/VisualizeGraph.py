@@ -12,8 +12,12 @@ from tqdm import tqdm
 
 from utils import make_dir
 from preproc import relational as rel
+from preproc import tables
 
 class VisualizeGraph(object):
+	# 100x100 inch figures at 100 dpi
+	memory = 4096
+
 	def __init__(self, config):
 		self.cfg = config
 		self.task_dir = os.path.join(self.cfg.output_tasks_dir, 'visualize_graph')
@@ -22,7 +26,7 @@ class VisualizeGraph(object):
 	def run(self):
 		make_dir(self.task_dir)
 
-		moves = pd.read_csv(self.cfg.move_csv, header=0, sep='\t')
+		moves = tables.read(self.cfg.move_csv)
 		G = rel.dataframe_to_graph(moves)
 		# self.plot(G, 'Parkour Theory')
 		
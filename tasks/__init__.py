@@ -1,7 +1,7 @@
 '''
-Module for dynamically importing <task>.py files when the tasks module is imported
-Importing class must import all
-i.e. from tasks import *
+Registry of <task>.py files. Task names are discovered from file names without importing them, and each
+task module is only imported when it is first accessed, so unused tasks and their dependencies are never loaded.
+i.e. tasks.load('InvalidIDs') or tasks.InvalidIDs
 
 Instructions for creating a new task:
 1. All <task>.py files should be named using camelcase and with the same name as the class
@@ -9,8 +9,53 @@ Instructions for creating a new task:
         class CheckMoves(object):
 2. Each task should take a Configuration object via constructor
 3. Each task should have a run()
+4. Tasks may set class attributes used by the pipeline:
+   requires (tuple) Names of tasks whose outputs it reads. It runs after them and is cancelled if they fail.
+   timeout  (float) Seconds before the task is terminated in parallel mode
+   executor (str)   'thread' for I/O bound tasks in parallel mode, else each task runs in its own process
+   cpus     (int)   CPUs the task keeps busy. Inner pools should be sized with resources.cpus(self).
+   memory   (int)   Peak memory in MB. Either is learned from the run history if not set.
+   inputs   (tuple) Configuration inputs re-run on by main.py --watch: move_csv, video_csv, video_src. Found in the source if not set.
+   writes   (tuple) Configuration inputs the task rewrites itself, which main.py --watch does not treat as edits.
+5. Tasks that can be split across machines by farm.coordinator also define units(), process(unit), and collect(records)
+6. Outputs should be written with artifacts.write_json(), write_table(), or stream_json() so they are atomic and compressed by extension
 '''
 from os import listdir
 from os.path import dirname, basename
+from inspect import getmembers, isclass
+from importlib import import_module
 
-__all__ = [basename(f)[:-3] for f in listdir(dirname(__file__)) if f[-3:] == ".py" and not f.endswith("__init__.py")]
\ No newline at end of file
+TASKS = sorted(basename(f)[:-3] for f in listdir(dirname(__file__)) if f[-3:] == ".py" and not f.endswith("__init__.py"))
+
+
+'''
+Import a task module on first access e.g. tasks.InvalidIDs
+'''
+def __getattr__(name):
+    if name in TASKS: return import_module(f'.{name}', __name__)
+    raise AttributeError(f'module {__name__} has no attribute {name}')
+
+
+'''
+inputs:
+name (str) Task name
+
+outputs:
+task (class) Task class of the same name as its module
+'''
+def load(name):
+    if name not in TASKS:
+        raise Exception(f'{name} is not a task')
+
+    try:
+        module = import_module(f'.{name}', __name__)
+    except ImportError as e:
+        raise Exception(f'{name} could not be imported: {e}') from e
+
+    if hasattr(module, name): return getattr(module, name)
+
+    # fall back to the first class defined in the module for tasks whose class name differs from the file name
+    classes = [c for _, c in getmembers(module, isclass) if c.__module__ == module.__name__]
+    if not classes: raise Exception(f'{name} does not define a task class')
+
+    return classes[0]
@@ -1,9 +1,11 @@
 import os
 import time
-import json
+import shutil
 import functools
 from collections import defaultdict
 
+from artifacts import open_artifact, write_json, write_lines
+
 def format_time(t):
     h, r = divmod(t, 3600)
     m, s = divmod(r, 60)
@@ -35,6 +37,9 @@ def make_dir(path):
 
 
 '''
+Write a log atomically. Dictionaries are written as json, lists one item per line, and anything else as a string.
+Compressed if dst ends with .gz or .zst.
+
 inputs:
 dst  (str)  Log file name
 data (dict) Log data
@@ -46,34 +51,35 @@ def write(dst, data):
         data = dict(data)
 
     if type(data) is dict:
-        with open(dst, 'w') as file:
-            json.dump(data, file)
+        write_json(dst, data)
 
     elif type(data) is list:
-        with open(dst, 'w') as file:
-            for i in data:
-                file.write(f'{i}\n')
+        write_lines(dst, data)
     else:
-        with open(dst, 'w') as file:
+        with open_artifact(dst) as file:
             file.write(data)
 
+
 '''
 Remove all logs
 '''
 def clean_logs():
     for f in os.listdir('./logs'):
-        os.remove(os.path.join('./logs',f))
+        path = os.path.join('./logs',f)
+        if os.path.isdir(path): shutil.rmtree(path)
+        else: os.remove(path)
         
 
 '''
 Display pipeline completion accuracy
 inputs:
-log   (dict)     Failure log
+log   (iterable) Failures, or dict of results of all tasks with a status
 total (iterable) Iterable object of all tasks
 '''
 def accuracy(log, total):
     total = len(total)
-    failed = len(log)
+    results = log.values() if isinstance(log, dict) else log
+    failed = len([r for r in results if not isinstance(r, dict) or r.get('status') != 'succeeded'])
     completed = total - failed
     
     print(f'completed: {completed} ({completed/total:.2%})')
@@ -7,12 +7,23 @@ Date: 5/9/2020
 '''
 
 import numpy as np
+import pandas as pd
 from pandas import isnull
 from itertools import zip_longest
 
+from preproc import edges as edg
+from preproc import labels as lbl
+
 class DataCheck(object):
-    def __init__(self, whitelist=None):
-        self.whitelist = whitelist if whitelist is not None else []
+
+    '''
+    inputs:
+    whitelist (list, optional)       Row ids to ignore when looking for empty cells
+    labels    (LabelCache, optional) Cache of canonical move types
+    '''
+    def __init__(self, whitelist=None, labels=None):
+        self.whitelist = set(whitelist) if whitelist is not None else set()
+        self.labels = labels if labels is not None else lbl.LabelCache()
 
 
     '''
@@ -115,8 +126,8 @@ class DataCheck(object):
     list of row indices with missing values for column
     '''
     def find_empty(self, df, col):
-        return [i+1 for i in df[df[col].isnull()].index.tolist() \
-                    if not i+1 in self.whitelist]
+        rows = df.index[df[col].isnull().to_numpy()] + 1
+        return rows[~rows.isin(self.whitelist)].tolist()
 
 
     '''
@@ -134,7 +145,8 @@ class DataCheck(object):
 
 
     '''
-    Sort edges alphabetically and update by reference
+    Sort edges alphabetically and update by reference. Edges are exploded, sorted within each row,
+    and joined back in one pass.
 
     inputs:
     df (pd.DataFrame) Table of moves
@@ -143,22 +155,33 @@ class DataCheck(object):
     df (pd.DataFrame) Sorted table of moves
     '''
     def sort_edges(self, df):
-        for i, row in df.iterrows():
-            if isinstance(row['prereq'], str):
-                edge = row['prereq'].split(', ')
-                edge.sort()
-                row['prereq'] = edge
-                df.at[i, 'prereq'] = ', '.join(row['prereq'])
-            
-            if isinstance(row['subseq'], str):
-                edge = row['subseq'].split(', ')
-                edge.sort()
-                row['subseq'] = edge
-                df.at[i, 'subseq'] = ', '.join(row['subseq'])
+        for col in ('prereq', 'subseq'):
+            edges = edg.explode_edges(df[col])
+            if edges.empty: continue
+
+            edges = pd.DataFrame({'row': edges.index, 'tgt': edges.to_numpy()})
+            edges = edges.sort_values(['row', 'tgt'], kind='mergesort')
+            joined = edges.groupby('row', sort=False)['tgt'].agg(', '.join)
+            df.loc[joined.index, col] = joined.to_numpy()
 
         return df
 
 
+    '''
+    Find rows whose edges are not sorted
+
+    inputs:
+    df (pd.DataFrame) Table of moves
+
+    outputs:
+    rows (list) Ids of moves that sort_edges() would change
+    '''
+    def unsorted_edges(self, df):
+        cols = ['prereq', 'subseq']
+        changed = (self.sort_edges(df[cols].copy()) != df[cols]) & df[cols].notnull()
+        return df.loc[changed.any(axis=1), 'id'].tolist()
+
+
     '''
     Remove unnamed column from DataFrame
 
@@ -183,9 +206,7 @@ class DataCheck(object):
     clean (str) Clean and sorted move type
     '''
     def clean_label(self, types):
-        clean = [t[:-1].rstrip() if t.endswith('s') else t.rstrip() for t in types.split('/') if len(t) > 0]
-        clean.sort()
-        return '/'.join(clean)
+        return self.labels.get(types)
 
 
     '''
@@ -215,7 +236,7 @@ class DataCheck(object):
                 if labels[i] not in unique:
                     unique.add(labels[i])
                 else:
-                    errors.append(labels)
+                    errors.add(types)
             except Exception:
                 # check for empty, None, or NaN
                 errors.add(types)
@@ -237,23 +258,12 @@ class DataCheck(object):
     output (list) Empty list if no errors else a list of errors
     '''
     def check_type(self, df):
-        labels = df['type'].tolist()
-        unique, errors = self.unique_labels(labels)
-        
-        label_map = {k: set() for k in unique}
-        
-        for l in labels:
-            
-            if not isinstance(l, str): 
-                continue
-                
-            k = self.clean_label(l)
-
-            if k in label_map:
-                label_map[k].add(l)
-
+        raw = df['type']
+        valid = raw.map(lambda t: isinstance(t, str) and len(t) > 0).to_numpy(dtype=bool)
+        labels = pd.DataFrame({'raw': raw[valid], 'clean': self.labels.canonical(raw[valid])}).drop_duplicates()
 
-        # check if any errors, return empty list if none
-        errs = [list(s) for s in label_map.values() if len(s) > 1]
+        # canonical labels with more than one raw spelling
+        unique = labels['clean'].nunique()
+        errs = [list(group) for _, group in labels.groupby('clean', sort=True)['raw'] if len(group) > 1]
 
-        return [] if len(unique) == sum([len(s) for s in errs]) else errs
\ No newline at end of file
+        return [] if unique == sum([len(s) for s in errs]) else errs
\ No newline at end of file
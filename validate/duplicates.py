@@ -0,0 +1,184 @@
+'''
+Near-duplicate move detection with MinHash and locality-sensitive hashing
+
+Each move is shingled into name and alias trigrams and description words. MinHash signatures are split
+into bands, and only moves that share a band bucket are compared, which avoids comparing every pair.
+
+Author: Justin Chen
+'''
+import re
+import zlib
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+
+from preproc import edges as edg
+from validate.resolve import ngrams
+
+PRIME = (1 << 31) - 1
+
+
+'''
+inputs:
+text (str) Text to normalize
+
+outputs:
+text (str) Lowercased text with punctuation removed and whitespace collapsed
+'''
+def normalize(text):
+    if not isinstance(text, str): return ''
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+
+'''
+inputs:
+name        (str) Move name
+alias       (str) Move aliases
+description (str) Move description
+
+outputs:
+shingles (set) Hashed shingles of the move
+'''
+def shingle(name, alias, description):
+    shingles = set()
+
+    for text in (normalize(name), normalize(alias)):
+        if text: shingles.update('n' + g for g in ngrams(text))
+
+    words = normalize(description).split()
+    shingles.update('d' + ' '.join(words[i:i+2]) for i in range(len(words)-1))
+
+    return {zlib.crc32(s.encode('utf-8')) % PRIME for s in shingles}
+
+
+'''
+Compute MinHash signatures in blocks of rows to bound memory
+
+inputs:
+shingles  (list)          List of sets of hashed shingles
+num_perm  (int, optional) Number of hash functions
+seed      (int, optional) Random seed for hash functions
+block     (int, optional) Number of rows per block
+
+outputs:
+signatures (ndarray) Array of shape (rows, num_perm)
+'''
+def minhash(shingles, num_perm=64, seed=0, block=2048):
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, PRIME, size=num_perm).astype(np.int64)
+    b = rng.randint(0, PRIME, size=num_perm).astype(np.int64)
+
+    signatures = np.full((len(shingles), num_perm), PRIME, dtype=np.int64)
+
+    for start in range(0, len(shingles), block):
+        rows = shingles[start:start+block]
+        sizes = np.array([len(s) for s in rows])
+        if sizes.sum() == 0: continue
+
+        values = np.fromiter((h for s in rows for h in s), dtype=np.int64, count=sizes.sum())
+        hashed = (a[:, None] * values[None, :] + b[:, None]) % PRIME
+
+        # minimum per row over the shingles of each row
+        nonempty = np.flatnonzero(sizes)
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])[nonempty]
+        signatures[start + nonempty] = np.minimum.reduceat(hashed, offsets, axis=1).T
+
+    return signatures
+
+
+'''
+Candidate pairs of rows sharing at least one band bucket
+
+inputs:
+signatures (ndarray)       MinHash signatures
+bands      (int, optional) Number of bands. Must divide the number of hash functions.
+max_bucket (int, optional) Skip buckets larger than this, which are too generic to be informative
+
+outputs:
+pairs (ndarray) Array of shape (pairs, 2) of row indices with the smaller index first
+'''
+def lsh_pairs(signatures, bands=16, max_bucket=50):
+    rows = signatures.shape[1] // bands
+    valid = np.flatnonzero((signatures != PRIME).any(axis=1))
+    n = len(signatures)
+    pairs = []
+
+    for band in range(bands):
+        keys = np.ascontiguousarray(signatures[valid, band*rows:(band+1)*rows])
+        keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * rows))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+
+        shared = (counts > 1) & (counts <= max_bucket)
+        members = np.flatnonzero(shared[inverse])
+        if len(members) == 0: continue
+
+        # rows of a bucket are adjacent after sorting, so pair each row with the rows d positions after it
+        order = members[np.argsort(inverse[members], kind='mergesort')]
+        buckets = inverse[order]
+        rows_ = valid[order]
+
+        for d in range(1, int(counts[shared].max())):
+            same = np.flatnonzero(buckets[:-d] == buckets[d:])
+            if len(same) == 0: break
+
+            a, b = rows_[same], rows_[same + d]
+            pairs.append(np.minimum(a, b) * n + np.maximum(a, b))
+
+    if not pairs: return np.empty((0, 2), dtype=np.int64)
+
+    pairs = np.unique(np.concatenate(pairs))
+    return np.stack([pairs // n, pairs % n], axis=1)
+
+
+'''
+Rank near-duplicate moves
+
+inputs:
+df           (pd.DataFrame)    Table of moves
+threshold    (float, optional) Minimum score of returned pairs
+graph_weight (float, optional) Weight of the Jaccard similarity of prereq and subseq sets. 0 to ignore the graph.
+num_perm     (int, optional)   Number of MinHash functions
+bands        (int, optional)   Number of LSH bands
+
+outputs:
+candidates (list) List of dicts of move ids, names, and scores sorted by descending score
+'''
+def near_duplicates(df, threshold=0.5, graph_weight=0.2, num_perm=64, bands=16):
+    shingles = [shingle(*row) for row in zip(df['name'], df['alias'], df['description'])]
+    signatures = minhash(shingles, num_perm)
+    pairs = lsh_pairs(signatures, bands)
+
+    if len(pairs) == 0: return []
+
+    text = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+
+    # drop pairs that cannot reach threshold even with identical neighborhoods
+    possible = np.flatnonzero((1-graph_weight) * text + graph_weight >= threshold)
+    pairs, text = pairs[possible], text[possible]
+    graph = np.zeros(len(pairs))
+
+    if graph_weight:
+        neighbors = defaultdict(set)
+        for col in ('prereq', 'subseq'):
+            for i, tgt in edg.explode_edges(df[col]).items(): neighbors[i].add(tgt)
+
+        index = df.index.to_numpy()
+        for k, (a, b) in enumerate(pairs):
+            na, nb = neighbors[index[a]], neighbors[index[b]]
+            if na or nb: graph[k] = len(na & nb) / len(na | nb)
+
+    score = (1-graph_weight) * text + graph_weight * graph
+    keep = np.flatnonzero(score >= threshold)
+    keep = keep[np.argsort(-score[keep], kind='mergesort')]
+
+    ids = df['id'].to_numpy()
+    names = df['name'].to_numpy()
+
+    return [{
+        'ids': [int(ids[pairs[k, 0]]), int(ids[pairs[k, 1]])],
+        'names': [names[pairs[k, 0]], names[pairs[k, 1]]],
+        'score': round(float(score[k]), 4),
+        'text': round(float(text[k]), 4),
+        'graph': round(float(graph[k]), 4)
+    } for k in keep]
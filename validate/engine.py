@@ -0,0 +1,184 @@
+'''
+Single pass validation engine for the move table
+
+The table is parsed once into shared columnar structures, which every registered check reads from.
+
+Author: Justin Chen
+'''
+import time
+import numpy as np
+import pandas as pd
+from collections import Counter, OrderedDict
+
+from preproc import edges as edg
+from preproc import labels as lbl
+from validate import resolve as rsv
+
+CHECKS = OrderedDict()
+
+
+'''
+Decorator to register a check. A check takes a Validator and returns a json serializable result.
+
+inputs:
+name (str) Name of check used as key in the report
+'''
+def check(name):
+    def register(func):
+        CHECKS[name] = func
+        return func
+    return register
+
+
+class Validator(object):
+
+    '''
+    inputs:
+    df        (pd.DataFrame)         Table of moves
+    whitelist (list, optional)       Row ids to ignore when looking for empty cells
+    labels    (LabelCache, optional) Cache of canonical move types
+    '''
+    def __init__(self, df, whitelist=None, labels=None):
+        start = time.perf_counter()
+
+        self.df = df
+        self.whitelist = set(whitelist) if whitelist is not None else set()
+
+        # name -> id index
+        self.name2id = dict(zip(df['name'], df['id']))
+
+        # one row per edge with the row index of its source move
+        self.edges = OrderedDict((col, edg.explode_edges(df[col])) for col in ('prereq', 'subseq'))
+
+        # clean each distinct type once and map back onto the rows
+        self.labels = labels if labels is not None else lbl.LabelCache()
+        self.types = self.labels.canonical(df['type'])
+
+        self.parse_time = time.perf_counter() - start
+
+
+    '''
+    Run checks over the parsed table
+
+    inputs:
+    checks (list, optional) Names of checks to run. Runs all registered checks if None.
+
+    outputs:
+    report (dict) Result and time in seconds of each check
+    '''
+    def run(self, checks=None):
+        checks = list(CHECKS) if checks is None else checks
+        report = {'parse_time': self.parse_time, 'results': {}, 'timings': {}}
+
+        for name in checks:
+            start = time.perf_counter()
+            report['results'][name] = CHECKS[name](self)
+            report['timings'][name] = time.perf_counter() - start
+
+        return report
+
+
+'''
+Same output as DataCheck.find_all_empty()
+'''
+@check('incomplete')
+def incomplete(v, columns=('id', 'name', 'type', 'description')):
+    empty = []
+
+    for col in columns:
+        rows = v.df.index[v.df[col].isnull().to_numpy()] + 1
+        empty.append({col: [int(i) for i in rows if i not in v.whitelist]})
+
+    return empty
+
+
+'''
+Same output as DataCheck.invalid_ids()
+'''
+@check('invalid_ids')
+def invalid_ids(v):
+    ids = v.df['id'].to_numpy()
+    correct = np.arange(1, len(ids)+1)
+    wrong = np.flatnonzero(ids.astype(int) != correct)
+
+    return [(ids[i].item(), int(correct[i])) for i in wrong]
+
+
+'''
+Same output as DataCheck.check_type()
+'''
+@check('move_types')
+def move_types(v):
+    raw = v.df['type']
+    valid = raw.map(lambda t: isinstance(t, str) and len(t) > 0).to_numpy(dtype=bool)
+    labels = pd.DataFrame({'raw': raw[valid], 'clean': v.types[valid]}).drop_duplicates()
+
+    unique = labels['clean'].nunique()
+    errs = [list(group) for _, group in labels.groupby('clean', sort=True)['raw'] if len(group) > 1]
+
+    return [] if unique == sum([len(s) for s in errs]) else errs
+
+
+'''
+Edge targets that do not match any move, with the closest move names as candidates for manual correction
+'''
+@check('dangling_edges')
+def dangling_edges(v, k=5):
+    dangling = []
+
+    for edges in v.edges.values():
+        missing = edges[~edges.isin(v.name2id)]
+        ids = v.df['id'].to_numpy()[v.df.index.get_indexer(missing.index)]
+        dangling.extend({'src': int(a), 'tgt': b} for a, b in zip(ids, missing))
+
+    if dangling:
+        index = rsv.NameIndex(v.name2id)
+        candidates = index.batch([d['tgt'] for d in dangling], k)
+
+        for d in dangling:
+            d['candidates'] = candidates[d['tgt']]
+
+    return dangling
+
+
+'''
+Pairs of move ids that are connected in only one direction. Same output as DataCheck.check_symmetry().
+'''
+@check('symmetry')
+def symmetry(v):
+    ids = v.df['id'].to_numpy()
+    src, tgt = [], []
+
+    for edges in v.edges.values():
+        edges = edges[edges.isin(v.name2id)]
+        src.append(ids[v.df.index.get_indexer(edges.index)].astype(int))
+        tgt.append(edges.map(v.name2id).to_numpy(dtype=int))
+
+    src, tgt = np.concatenate(src), np.concatenate(tgt)
+    pairs = pd.DataFrame({'lo': np.minimum(src, tgt), 'hi': np.maximum(src, tgt)})
+    pairs = pairs[pairs['lo'] != pairs['hi']]
+    counts = pairs.groupby(['lo', 'hi']).size()
+
+    return [[int(a), int(b)] for a, b in counts[counts == 1].index]
+
+
+'''
+Number of unique edges and moves with duplicate edges. Same output as relational.count_edges().
+'''
+@check('duplicate_edges')
+def duplicate_edges(v):
+    count = 0
+    dups = []
+
+    for col, edges in v.edges.items():
+        frame = pd.DataFrame({'row': edges.index, 'tgt': edges.to_numpy()})
+        duplicated = frame.duplicated(keep='first')
+        count += int((~duplicated).sum())
+
+        for row in frame.loc[duplicated, 'row'].unique():
+            counts = dict(Counter(edges.loc[[row]]))
+            dups.append((row, col, f"\n{v.df.at[row, 'id']} {v.df.at[row, 'name']} {col}\n{counts}"))
+
+    dups.sort(key=lambda x: (x[0], x[1] == 'subseq'))
+
+    return {'edges': count, 'duplicates': [d[-1] for d in dups]}
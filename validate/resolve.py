@@ -0,0 +1,81 @@
+'''
+Resolve misspelled move names with a character n-gram inverted index
+
+Author: Justin Chen
+'''
+import numpy as np
+from collections import defaultdict
+
+
+'''
+inputs:
+text (str)           Text to split
+n    (int, optional) Length of n-grams
+
+outputs:
+grams (set) Character n-grams of the lowercased text padded with spaces
+'''
+def ngrams(text, n=3):
+    text = f"{' ' * (n-1)}{text.lower().strip()} "
+    return {text[i:i+n] for i in range(len(text)-n+1)}
+
+
+class NameIndex(object):
+
+    '''
+    inputs:
+    names (iterable)      Move names to index
+    n     (int, optional) Length of n-grams
+    '''
+    def __init__(self, names, n=3):
+        self.n = n
+        self.names = list(names)
+        self.sizes = np.zeros(len(self.names), dtype=np.int32)
+        postings = defaultdict(list)
+
+        for i, name in enumerate(self.names):
+            grams = ngrams(str(name), n)
+            self.sizes[i] = len(grams)
+            for g in grams: postings[g].append(i)
+
+        self.postings = {g: np.array(ids, dtype=np.int32) for g, ids in postings.items()}
+
+
+    '''
+    Top k names by Jaccard similarity of n-grams
+
+    inputs:
+    name (str)           Name to resolve
+    k    (int, optional) Number of candidates
+
+    outputs:
+    candidates (list) List of (name, score) tuples sorted by descending score
+    '''
+    def query(self, name, k=5):
+        grams = ngrams(str(name), self.n)
+        hits = [self.postings[g] for g in grams if g in self.postings]
+        if not hits: return []
+
+        # shared n-grams with every indexed name in one bincount
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.names))
+        scores = shared / (len(grams) + self.sizes - shared)
+
+        k = min(k, np.count_nonzero(shared))
+        top = np.argpartition(-scores, k-1)[:k]
+        top = top[np.argsort(-scores[top], kind='mergesort')]
+
+        return [(self.names[i], round(float(scores[i]), 4)) for i in top]
+
+
+    '''
+    Resolve many names at once. Each distinct name is queried once.
+
+    inputs:
+    names (iterable)      Names to resolve
+    k     (int, optional) Number of candidates per name
+
+    outputs:
+    candidates (dict) Dictionary mapping name to list of (name, score) tuples
+    '''
+    def batch(self, names, k=5):
+        return {name: self.query(name, k) for name in set(names)}
@@ -0,0 +1,138 @@
+'''
+Declarative validation rules for the move and video tables
+
+Rules are loaded from configs/rules.ini. Each section is named <table>.<column> and each key is a rule.
+Every rule compiles to a vectorized boolean mask of the rows that violate it, so adding a rule never
+adds a loop over rows.
+
+Supported rules:
+required   = yes                   Cell must not be empty
+dtype      = int | float | str     Cell must have this type
+regex      = <pattern>             Cell must match the pattern
+unique     = yes                   Cell must not be repeated in the column
+references = <table>.<column>      Cell must exist in the other column
+edges      = <table>.<column>      Every value-separated edge must exist in the other column
+whitelist  = yes                   Ignore whitelisted rows for the rules of this column
+
+A [<table>] section with a columns key lists required column headers.
+
+Author: Justin Chen
+'''
+import time
+import configparser
+import numpy as np
+import pandas as pd
+
+from preproc import edges as edg
+
+RULES = ('required', 'dtype', 'regex', 'unique', 'references', 'edges')
+
+
+'''
+inputs:
+df   (pd.DataFrame) Table
+col  (str)          Column to check
+rule (str)          Rule name
+arg  (str)          Rule argument from config
+tables (dict)       Dictionary mapping table name to DataFrame for rules that reference other tables
+
+outputs:
+mask (ndarray) True for rows that violate the rule
+'''
+def violations(df, col, rule, arg, tables):
+    values = df[col]
+    present = values.notnull()
+
+    if rule == 'required':
+        return (~present).to_numpy()
+
+    if rule == 'dtype':
+        if arg == 'str':
+            return (present & values.map(type).ne(str)).to_numpy()
+
+        numeric = pd.to_numeric(values, errors='coerce')
+        bad = present & numeric.isnull()
+        if arg == 'int': bad |= present & numeric.notnull() & (numeric % 1 != 0)
+        return bad.to_numpy()
+
+    if rule == 'regex':
+        return (present & ~values.astype(str).str.match(arg)).to_numpy()
+
+    if rule == 'unique':
+        return (present & values.duplicated(keep=False)).to_numpy()
+
+    table, column = arg.split('.')
+    targets = tables[table][column]
+
+    if rule == 'references':
+        return (present & ~values.isin(targets)).to_numpy()
+
+    if rule == 'edges':
+        edges = edg.explode_edges(values)
+        dangling = edges.index[~edges.isin(targets)].unique()
+        return df.index.isin(dangling)
+
+    raise Exception(f'Invalid rule: {rule}')
+
+
+class RuleSet(object):
+
+    '''
+    inputs:
+    path      (str)            Path to rules ini file
+    whitelist (list, optional) Row ids to ignore for columns with whitelist = yes
+    '''
+    def __init__(self, path, whitelist=None):
+        cfg = configparser.ConfigParser(interpolation=None)
+        cfg.read(path)
+
+        self.whitelist = set(whitelist) if whitelist is not None else set()
+        self.columns = {}
+        self.rules = []
+
+        for section in cfg.sections():
+            if '.' not in section:
+                self.columns[section] = [c.strip() for c in cfg[section]['columns'].split(',')]
+                continue
+
+            table, col = section.split('.', 1)
+            skip = cfg[section].getboolean('whitelist', fallback=False)
+
+            for rule in RULES:
+                if rule in cfg[section] and cfg[section][rule] not in ('no', ''):
+                    self.rules.append((table, col, rule, cfg[section][rule], skip))
+
+
+    '''
+    Apply all rules to the tables
+
+    inputs:
+    tables (dict) Dictionary mapping table name e.g. moves or videos to DataFrame
+
+    outputs:
+    report (dict) Missing columns, row ids (1-indexed) violating each rule, and time in seconds of each rule
+    '''
+    def validate(self, tables):
+        report = {'missing_columns': {}, 'violations': {}, 'timings': {}}
+
+        for table, cols in self.columns.items():
+            missing = [c for c in cols if c not in tables[table]]
+            if missing: report['missing_columns'][table] = missing
+
+        for table, col, rule, arg, skip in self.rules:
+            df = tables[table]
+            name = f'{table}.{col}.{rule}'
+
+            if col not in df: continue
+
+            start = time.perf_counter()
+            mask = violations(df, col, rule, arg, tables)
+            rows = np.flatnonzero(mask) + 1
+
+            if skip and self.whitelist:
+                rows = rows[~np.isin(rows, list(self.whitelist))]
+
+            report['violations'][name] = rows.tolist()
+            report['timings'][name] = time.perf_counter() - start
+
+        return report
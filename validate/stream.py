@@ -0,0 +1,393 @@
+'''
+Streaming validation of the move table in fixed size chunks
+
+Row-local checks are computed per chunk into accumulators that can be merged in any order, so a table of
+any size is validated in bounded memory. Chunks are read ahead on a background thread while the previous
+chunk is checked, or checked in worker processes. Results have the same format as the validation engine.
+
+Author: Justin Chen
+'''
+import time
+import queue
+import threading
+import numpy as np
+import pandas as pd
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from preproc import edges as edg
+from preproc import labels as lbl
+from validate import resolve as rsv
+
+ACCUMULATORS = OrderedDict()
+
+
+'''
+Decorator to register an accumulator class under the name of the engine check it streams
+
+inputs:
+name (str) Name of check used as key in the report
+'''
+def accumulator(name):
+    def register(cls):
+        ACCUMULATORS[name] = cls
+        return cls
+    return register
+
+
+class Accumulator(object):
+
+    def __init__(self):
+        self.time = 0.0
+
+
+    '''
+    inputs:
+    chunk (pd.DataFrame) Rows of the move table indexed by row position
+    edges (OrderedDict)  Exploded prereq and subseq columns of the chunk
+    '''
+    def update(self, chunk, edges):
+        raise NotImplementedError
+
+
+    '''
+    Combine the partial result of another chunk into this one
+
+    inputs:
+    other (Accumulator) Accumulator of the same type
+
+    outputs:
+    self (Accumulator) Merged accumulator
+    '''
+    def merge(self, other):
+        raise NotImplementedError
+
+
+    '''
+    merge() another accumulator and add its time, so timings cover every chunk
+
+    inputs:
+    other (Accumulator) Accumulator of the same type
+
+    outputs:
+    self (Accumulator) Merged accumulator
+    '''
+    def combine(self, other):
+        self.time += other.time
+        return self.merge(other)
+
+
+    '''
+    inputs:
+    v (StreamValidator) Validator with the whitelist and label cache
+
+    outputs:
+    result (list, dict) Same result as the engine check
+    '''
+    def result(self, v):
+        raise NotImplementedError
+
+
+@accumulator('incomplete')
+class Incomplete(Accumulator):
+
+    def __init__(self, columns=('id', 'name', 'type', 'description')):
+        super().__init__()
+        self.empty = OrderedDict((col, []) for col in columns)
+
+
+    def update(self, chunk, edges):
+        for col, rows in self.empty.items():
+            rows.extend(int(i) for i in chunk.index[chunk[col].isnull().to_numpy()] + 1)
+
+
+    def merge(self, other):
+        for col, rows in other.empty.items():
+            self.empty[col].extend(rows)
+
+        return self
+
+
+    def result(self, v):
+        return [{col: [i for i in sorted(rows) if i not in v.whitelist]} for col, rows in self.empty.items()]
+
+
+@accumulator('invalid_ids')
+class InvalidIDs(Accumulator):
+
+    def __init__(self):
+        super().__init__()
+        self.wrong = []
+
+
+    def update(self, chunk, edges):
+        ids = chunk['id'].to_numpy()
+        correct = chunk.index.to_numpy() + 1
+        wrong = np.flatnonzero(ids.astype(int) != correct)
+
+        self.wrong.extend((ids[i].item(), int(correct[i])) for i in wrong)
+
+
+    def merge(self, other):
+        self.wrong.extend(other.wrong)
+        return self
+
+
+    def result(self, v):
+        return sorted(self.wrong, key=lambda x: x[1])
+
+
+'''
+Only the distinct raw labels are kept, and they are cleaned once with the label cache of the validator
+'''
+@accumulator('move_types')
+class MoveTypes(Accumulator):
+
+    def __init__(self):
+        super().__init__()
+        self.raw = set()
+
+
+    def update(self, chunk, edges):
+        self.raw.update(t for t in chunk['type'].unique() if isinstance(t, str) and len(t) > 0)
+
+
+    def merge(self, other):
+        self.raw |= other.raw
+        return self
+
+
+    def result(self, v):
+        labels = pd.DataFrame({'raw': sorted(self.raw)})
+        labels['clean'] = [v.labels.get(t) for t in labels['raw']]
+
+        unique = labels['clean'].nunique()
+        errs = [list(group) for _, group in labels.groupby('clean', sort=True)['raw'] if len(group) > 1]
+
+        return [] if unique == sum([len(s) for s in errs]) else errs
+
+
+'''
+Edges are kept only until a chunk defines their target, so memory is bounded by the unresolved edges
+'''
+@accumulator('dangling_edges')
+class DanglingEdges(Accumulator):
+
+    def __init__(self):
+        super().__init__()
+        self.names = {}
+        self.pending = []
+
+
+    def update(self, chunk, edges):
+        self.names.update(zip(chunk['name'], chunk.index))
+        ids = chunk['id'].to_numpy()
+
+        for k, targets in enumerate(edges.values()):
+            src = ids[chunk.index.get_indexer(targets.index)]
+            self.pending.extend((k, i, int(a), b) for i, a, b in zip(targets.index, src, targets))
+
+        self.resolve()
+
+
+    def resolve(self):
+        self.pending = [p for p in self.pending if p[-1] not in self.names]
+
+
+    def merge(self, other):
+        self.names.update(other.names)
+        self.pending.extend(other.pending)
+        self.resolve()
+
+        return self
+
+
+    def result(self, v, k=5):
+        dangling = [{'src': src, 'tgt': tgt} for _, _, src, tgt in sorted(self.pending, key=lambda p: p[:2])]
+
+        if dangling:
+            # index names in table order so ties rank the same as in the engine
+            index = rsv.NameIndex(sorted(self.names, key=self.names.get))
+            candidates = index.batch([d['tgt'] for d in dangling], k)
+
+            for d in dangling:
+                d['candidates'] = candidates[d['tgt']]
+
+        return dangling
+
+
+'''
+Every edge of a move is on the row of the move, so counts and duplicates are local to a chunk
+'''
+@accumulator('duplicate_edges')
+class DuplicateEdges(Accumulator):
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+        self.dups = []
+
+
+    def update(self, chunk, edges):
+        for col, targets in edges.items():
+            frame = pd.DataFrame({'row': targets.index, 'tgt': targets.to_numpy()})
+            duplicated = frame.duplicated(keep='first')
+            self.count += int((~duplicated).sum())
+
+            for row in frame.loc[duplicated, 'row'].unique():
+                counts = dict(Counter(targets.loc[[row]]))
+                self.dups.append((int(row), col, f"\n{chunk.at[row, 'id']} {chunk.at[row, 'name']} {col}\n{counts}"))
+
+
+    def merge(self, other):
+        self.count += other.count
+        self.dups.extend(other.dups)
+
+        return self
+
+
+    def result(self, v):
+        dups = sorted(self.dups, key=lambda x: (x[0], x[1] == 'subseq'))
+        return {'edges': self.count, 'duplicates': [d[-1] for d in dups]}
+
+
+'''
+Parse one chunk and update a fresh accumulator for each check. Runs in worker processes.
+
+inputs:
+chunk  (pd.DataFrame) Rows of the move table
+checks (list)         Names of checks
+
+outputs:
+accumulators (dict) Accumulator of each check
+'''
+def check_chunk(chunk, checks):
+    edges = OrderedDict((col, edg.explode_edges(chunk[col])) for col in ('prereq', 'subseq'))
+    accumulators = OrderedDict()
+
+    for name in checks:
+        start = time.perf_counter()
+        accumulators[name] = ACCUMULATORS[name]()
+        accumulators[name].update(chunk, edges)
+        accumulators[name].time += time.perf_counter() - start
+
+    return accumulators
+
+
+'''
+Read a table in chunks on a background thread
+
+inputs:
+path      (str)           Path to tsv
+chunksize (int)           Number of rows per chunk
+prefetch  (int, optional) Number of chunks to read ahead
+
+outputs:
+chunk (pd.DataFrame) Generator of chunks. Row indices continue across chunks.
+'''
+def read_chunks(path, chunksize, prefetch=2):
+    chunks = queue.Queue(maxsize=prefetch)
+    done = object()
+
+    def read():
+        try:
+            for chunk in pd.read_csv(path, header=0, sep='\t', chunksize=chunksize):
+                chunks.put(chunk)
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(done)
+
+    threading.Thread(target=read, daemon=True).start()
+
+    while True:
+        chunk = chunks.get()
+        if chunk is done: return
+        if isinstance(chunk, Exception): raise chunk
+        yield chunk
+
+
+class StreamValidator(object):
+
+    '''
+    inputs:
+    path      (str)                  Path to move table
+    chunksize (int)                  Number of rows per chunk
+    whitelist (list, optional)       Row ids to ignore when looking for empty cells
+    labels    (LabelCache, optional) Cache of canonical move types
+    workers   (int, optional)        Number of worker processes. Chunks are checked in this process if 0.
+    '''
+    def __init__(self, path, chunksize, whitelist=None, labels=None, workers=0):
+        self.path = path
+        self.chunksize = chunksize
+        self.whitelist = set(whitelist) if whitelist is not None else set()
+        self.labels = labels if labels is not None else lbl.LabelCache()
+        self.workers = workers
+
+
+    '''
+    Merge the accumulators of each chunk as they finish. At most two chunks per worker are in flight.
+
+    inputs:
+    checks (list) Names of checks
+
+    outputs:
+    merged (dict) Accumulator of each check over the whole table
+    '''
+    def parallel(self, checks):
+        merged = None
+        pending = set()
+
+        def collect(futures):
+            nonlocal merged
+            for future in futures:
+                result = future.result()
+                merged = result if merged is None else {n: merged[n].combine(a) for n, a in result.items()}
+
+        with ProcessPoolExecutor(self.workers) as pool:
+            for chunk in read_chunks(self.path, self.chunksize):
+                pending.add(pool.submit(check_chunk, chunk, checks))
+
+                if len(pending) >= 2*self.workers:
+                    finished = [f for f in pending if f.done()] or [next(iter(pending))]
+                    collect(finished)
+                    pending.difference_update(finished)
+
+            collect(pending)
+
+        return merged
+
+
+    '''
+    Stream the table through the accumulators of each check
+
+    inputs:
+    checks (list, optional) Names of checks to run. Runs all streamable checks if None.
+
+    outputs:
+    report (dict) Result and time in seconds of each check
+    '''
+    def run(self, checks=None):
+        checks = list(ACCUMULATORS) if checks is None else checks
+        start = time.perf_counter()
+
+        if self.workers:
+            merged = self.parallel(checks)
+        else:
+            merged = None
+            for chunk in read_chunks(self.path, self.chunksize):
+                result = check_chunk(chunk, checks)
+                merged = result if merged is None else {n: merged[n].combine(a) for n, a in result.items()}
+
+        if merged is None: merged = {name: ACCUMULATORS[name]() for name in checks}
+
+        report = {'parse_time': 0.0, 'results': {}, 'timings': {}}
+
+        for name in checks:
+            finish = time.perf_counter()
+            report['results'][name] = merged[name].result(self)
+            report['timings'][name] = merged[name].time + time.perf_counter() - finish
+
+        report['parse_time'] = max(0.0, time.perf_counter() - start - sum(report['timings'].values()))
+
+        return report
@@ -0,0 +1,182 @@
+'''
+Watch mode
+
+Keeps one process alive and polls the modification times of the move table, the video table, and the video directory.
+When an input changes, only the tasks that read it and the tasks that require them are run again, in this process, so
+tables and the move graph stay loaded in preproc.tables and are updated from row-level deltas instead of reloaded.
+'''
+import os
+import time
+import inspect
+
+from colorama import Fore, Style
+
+import history
+from pipeline import sequential
+from preproc import tables, diff
+from utils import write
+
+INPUTS = ('move_csv', 'video_csv', 'video_src')
+
+
+'''
+inputs:
+path (str) Path to file or directory
+
+outputs:
+stamp (tuple) Modification time and size of a file, or modification time and number of entries of a directory.
+              None if the path does not exist.
+'''
+def stamp(path):
+    if not path or not os.path.exists(path): return None
+    if os.path.isdir(path): return (os.stat(path).st_mtime_ns, len(os.listdir(path)))
+    return tables.stamp(path)
+
+
+'''
+Configuration inputs a task reads, from its inputs class attribute, else from the configuration attributes its
+source refers to
+
+inputs:
+task (object) Task instance
+
+outputs:
+inputs (set) Names of configuration attributes in INPUTS
+'''
+def task_inputs(task):
+    declared = getattr(task, 'inputs', None)
+    if declared is not None: return set(declared)
+
+    try:
+        source = inspect.getsource(type(task))
+    except (OSError, TypeError):
+        return set(INPUTS)
+
+    return set(i for i in INPUTS if f'cfg.{i}' in source)
+
+
+class Watcher(object):
+
+    '''
+    inputs:
+    cfg      (config.Configuration) Configuration of the run
+    path     (str)                  Path to config file
+    pipe     (list)                 Tasks to execute
+    interval (float, optional)      Seconds between polls
+    verbose  (bool, optional)       Print stack trace of failed tasks
+    '''
+    def __init__(self, cfg, path, pipe, interval=0.5, verbose=False):
+        self.cfg = cfg
+        self.path = path
+        self.pipe = pipe
+        self.interval = interval
+        self.verbose = verbose
+        self.inputs = {type(t).__name__: task_inputs(t) for t in pipe}
+        self.stamps = self.poll()
+        self.moves = None
+
+
+    '''
+    outputs:
+    stamps (dict) Stamp of each watched input
+    '''
+    def poll(self):
+        return {i: stamp(getattr(self.cfg, i)) for i in INPUTS}
+
+
+    '''
+    Tasks that read a changed input and the tasks that require them, in pipe order
+
+    inputs:
+    changed (set) Names of changed inputs
+
+    outputs:
+    pipe (list) Tasks to run again
+    '''
+    def affected(self, changed):
+        names = set(n for n, inputs in self.inputs.items() if inputs & changed)
+        grew = True
+
+        while grew:
+            grew = False
+            for t in self.pipe:
+                name = type(t).__name__
+                if name not in names and names.intersection(getattr(t, 'requires', ())):
+                    names.add(name)
+                    grew = True
+
+        return [t for t in self.pipe if type(t).__name__ in names]
+
+
+    '''
+    Print the rows of the move table that changed since the last run
+    '''
+    def summarize(self):
+        if not os.path.isfile(self.cfg.move_csv): return
+
+        moves = tables.read(self.cfg.move_csv)
+
+        if self.moves is not None and not (diff.diffable(self.moves) and diff.diffable(moves)):
+            print(f'{Fore.RED}ids of {os.path.basename(self.cfg.move_csv)} are not unique{Style.RESET_ALL}')
+        elif self.moves is not None:
+            delta = diff.table_diff(self.moves, moves)
+            print(f'{os.path.basename(self.cfg.move_csv)}: {len(delta["added"])} added, {len(delta["removed"])} removed, '
+                  f'{len(delta["modified"])} modified rows')
+
+        self.moves = moves
+
+
+    '''
+    Run tasks in this process and log their results
+
+    inputs:
+    pipe (list) Tasks to run
+    '''
+    def execute(self, pipe):
+        before = self.poll()
+        run_id = history.start_run(self.cfg, self.path)
+        log = {}
+
+        sequential(pipe, log, run_id, verbose=self.verbose)
+        write('datapipe.json', log)
+
+        # inputs the tasks rewrite themselves, such as FixEmbed updating the video table, are not edits. Every other
+        # input keeps its stamp from before the run, so edits saved while the tasks ran are picked up by the next poll.
+        after = self.poll()
+        written = set(i for t in pipe for i in getattr(t, 'writes', ()))
+        self.stamps = {i: after[i] if i in written else before[i] for i in INPUTS}
+
+
+    '''
+    Run the pipe once, then run affected tasks after every change until interrupted
+    '''
+    def run(self):
+        self.summarize()
+        self.execute(self.pipe)
+        print(f'{Fore.BLUE}watching{Style.RESET_ALL} {", ".join(getattr(self.cfg, i) for i in INPUTS)}')
+
+        try:
+            while True:
+                time.sleep(self.interval)
+                current = self.poll()
+                if current == self.stamps: continue
+
+                # wait for the editor to finish writing
+                while True:
+                    time.sleep(min(self.interval, 0.1))
+                    settled = self.poll()
+                    if settled == current: break
+                    current = settled
+
+                changed = set(i for i in INPUTS if current[i] != self.stamps[i])
+                pipe = self.affected(changed)
+                self.stamps = current
+
+                print(f'\n{Fore.BLUE}changed:{Style.RESET_ALL} {", ".join(sorted(changed))}')
+                if 'move_csv' in changed: self.summarize()
+
+                if pipe: self.execute(pipe)
+                else: print('no tasks read the changed inputs')
+
+        except KeyboardInterrupt:
+            print('stopped watching')